@@ -3,90 +3,31 @@
 #You will use the starting code below and build the program "BB8 Attack" as you go through Chapter 15.
 
 
-import random
 import arcade
 
+from engine import bb8_attack
+from engine.bb8_attack import BB8World
+from engine.assets import assets
+from engine.atlas import EXPLOSION_CACHE, EXPLOSION_FRAMES
+from engine.hud import Hud
+from engine.loader import Prefetcher
+from engine.net import SERVER, join
+from engine.overlay import PerfOverlay
+from engine.profiler import Profiler, entity_counts, pool_counts
+from engine.render import (KEY_NAMES, DrawCounter, SpriteSync, draw_loading_bar, load_frames, make_mixer,
+                           preload_sprites)
+from engine.replay import record
+from engine.scores import ScoreStore
+from engine.timestep import FixedTimestep
+
 # --- Constants ---
-BB8_scale = 0.3
-trooper_scale = 0.1
-trooper_count = 40
-bullet_scale = 1
 SW = 800
 SH = 600
-speed = 4
+GAME_OVER_PANEL = (0, SW, SH, 0, arcade.color.BLACK)
 
 explosion_texture_count = 50
 
 
-# -------Explosion---------
-class Explosion(arcade.Sprite):
-    def __init__(self, texture_list):
-        super().__init__("Images/explosions/explosion0000.png")
-
-        self.current_texture = 0
-        self.textures = texture_list
-        self.explosion_sound = arcade.load_sound("sounds/explosion.mp3")
-
-    def update(self):
-        self.current_texture += 1
-        if self.current_texture < len(self.textures):
-            self.set_texture(self.current_texture)
-        else:
-            self.kill()
-
-
-# -------Player/BB8--------
-class Player(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/bb8.png", BB8_scale)
-        self.laser_sound = arcade.load_sound("sounds/laser.mp3")
-        self.explosion_sound = arcade.load_sound("sounds/explosion.mp3")
-
-    def update(self):
-        self.center_x += self.change_x
-        if self.right < 0:
-            self.right = SW
-        elif self.left > SW:
-            self.left = 0
-
-
-# --------Enemy Bullet-----
-class EnemyBullet(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/rbullet.png", bullet_scale)
-
-    def update(self):
-        self.center_y -= 10
-        self.angle = -90
-        if self.top < 0:
-            self.kill()
-
-
-# --------Trooper----------
-class Trooper(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/stormtrooper.png", trooper_scale)
-        self.w = int(self.width)
-        self.h = int(self.height)
-
-    def update(self):
-        self.center_y -= 2
-        if self.top < 0:
-            self.center_x = random.randrange(self.w, SW - self.w)
-            self.center_y = random.randrange(SH + self.h, SH * 2)
-
-
-# -------Bullet-----------
-class Bullet(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/bullet.png", bullet_scale)
-
-    def update(self):
-        self.center_y += 10
-        if self.bottom > SH:
-            self.kill()
-
-
 # ------MyGame Class--------------
 class MyGame(arcade.Window):
     def __init__(self, SW, SH, title):
@@ -94,124 +35,116 @@ class MyGame(arcade.Window):
         arcade.set_background_color(arcade.color.SKY_BLUE)
         self.set_mouse_visible(False)
 
-        self.explosion_texture_list = []
-        for i in range (explosion_texture_count):
-            texture_name = f"Images/explosions/explosion{i:04}.png"
-            self.explosion_texture_list.append(arcade.load_texture(texture_name))
+        # decode the explosion frames on worker threads so the window opens right away
+        self.prefetcher = Prefetcher()
+        self.explosion_frames = load_frames(self.prefetcher, EXPLOSION_FRAMES[:explosion_texture_count], EXPLOSION_CACHE)
+        self.explosion_texture_list = self.explosion_frames.items
+
+        self.mixer = make_mixer({"laser": "sounds/laser.mp3", "explosion": "sounds/explosion.mp3"})
+        preload_sprites(bb8_attack.Player, bb8_attack.Trooper, bb8_attack.Bullet, bb8_attack.EnemyBullet)
+
+        # the game itself runs in the world, the window only draws it; with
+        # SERVER=host:port the world is on a server (python -m engine.net) and two can play
+        self.world = join(SERVER, BB8World) if SERVER else BB8World()
+        self.sprites = SpriteSync(self.explosion_texture_list)
+        self.inputs = []
+        self.stepper = FixedTimestep(self.world if SERVER else record(self.world))
+
+        # the all-time high scores are read on a worker thread, the first game over needs them
+        self.high_scores = self.prefetcher.executor.submit(ScoreStore)
+        self.scored = False     # the game that ended is on the leaderboard
+
+        # F3 shows how long each part of a frame takes
+        self.profiler = Profiler()
+        self.world.profiler = self.profiler
+        self.overlay = PerfOverlay(self.profiler)
+        self.draws = DrawCounter()
+
+        # text is laid out once and again only when it changes
+        self.hud = Hud()
+        self.hud.add("score", "Score: 0", 10, 20, arcade.color.BLACK)
+        self.game_over_hud = Hud()
+        self.game_over_hud.add("message", "Game over! Press 'P' to play again!", SW / 2 - 150, SH / 2, arcade.color.WHITE)
+        self.game_over_hud.add("score", "Score: 0", SW / 2 - 50, SH / 2 - 20, arcade.color.WHITE)
+        self.game_over_hud.add("best", "", SW / 2 - 150, SH / 2 - 50, arcade.color.WHITE)
+        self.game_over_hud.add("rank", "", SW / 2 - 150, SH / 2 - 70, arcade.color.WHITE)
 
     def reset(self):   # reset the game
-        self.gameover = False
-
-        # sprite lists
-        self.player_list = arcade.SpriteList()
-        self.trooper_list = arcade.SpriteList()
-        self.bullet_list = arcade.SpriteList()
-        self.explosions = arcade.SpriteList()
-        self.ebullets = arcade.SpriteList()
-
-        self.score = 0
-
-        # create the player
-        self.BB8 = Player()
-        self.BB8.center_x = SW/2
-        self.BB8.bottom = 2
-        self.player_list.append(self.BB8)
-
-        # create the troopers
-        for i in range(trooper_count):
-            trooper = Trooper()
-            trooper.center_x = random.randrange(trooper.w, SW - trooper.w)
-            trooper.center_y = random.randrange(SH / 2, SH * 2)
-            self.trooper_list.append(trooper)
+        self.world.reset()
 
     def on_draw(self):
-        arcade.start_render()
-        self.trooper_list.draw()
-        self.player_list.draw()
-        self.bullet_list.draw()
-        self.explosions.draw()
-        self.ebullets.draw()
-
-        output = f"Score: {self.score}"
-        arcade.draw_text(output, 10, 20, arcade.color.BLACK, 14)
-
-        if self.gameover is True:
-            arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
-            arcade.draw_text("Game over! Press 'P' to play again!", SW / 2 - 150, SH / 2, arcade.color.WHITE, 14)
-            arcade.draw_text(output, SW / 2 - 50, SH / 2 - 20, arcade.color.WHITE, 14)
+        self.draws.start()
+        with self.profiler.phase("draw"):
+            arcade.start_render()
+            world = self.world
+            # the game over screen covers the game, in the same batch
+            panels = [GAME_OVER_PANEL] if world.gameover else []
+            self.sprites.draw(world.trooper_list, world.player_list, world.bullet_list,
+                              world.explosions, world.ebullets, tick=world.tick, alpha=self.stepper.alpha,
+                              panels=panels)
+
+            output = f"Score: {world.score}"
+            if world.gameover is True:
+                self.game_over_hud.set("score", output)
+                self.game_over_hud.draw()
+            else:
+                self.hud.set("score", output)
+                self.hud.draw()
+                if not self.explosion_frames.done():
+                    draw_loading_bar(self.explosion_frames.progress())
+
+        self.profiler.end_frame({**entity_counts(self.world), **pool_counts(self.world), **self.draws.counts(),
+                                 **assets.counts(), **self.mixer.counts()})
+        self.overlay.draw()
 
     def on_key_press(self, key, modifiers: int):
-        if key == arcade.key.LEFT:
-            self.BB8.change_x -= speed
-        elif key == arcade.key.RIGHT:
-            self.BB8.change_x += speed
-        elif key == arcade.key.P:
-            self.reset()
-        elif key == arcade.key.SPACE and self.gameover is False:
-            self.bullet = Bullet()
-            self.bullet.center_x = self.BB8.center_x
-            self.bullet.bottom = self.BB8.top
-            self.bullet.angle = 90
-            self.bullet_list.append(self.bullet)
-            arcade.play_sound(self.BB8.laser_sound)
-            self.score -= 1
+        if key == arcade.key.F3:
+            self.overlay.toggle()
+            # draws are only counted while the overlay shows them
+            self.draws.enable(self.overlay.visible)
+        elif key in KEY_NAMES:
+            self.inputs.append(("press", KEY_NAMES[key]))
 
     def on_key_release(self, key, modifiers: int):
-        if key == arcade.key.LEFT or key == arcade.key.RIGHT:
-            self.BB8.change_x = 0
+        if key in KEY_NAMES:
+            self.inputs.append(("release", KEY_NAMES[key]))
 
     def on_update(self, dt):
-        self.player_list.update()
-        self.trooper_list.update()
-        self.bullet_list.update()
-        self.explosions.update()
-        self.ebullets.update()
-
-        if len(self.trooper_list) == 0:
-            self.gameover = True
-
-        self.bb8_hit = arcade.check_for_collision_with_list(self.BB8, self.trooper_list)
-        # check if bb8 is colliding with a trooper
-        if len(self.bb8_hit) > 0:
-            self.BB8.kill()
-            self.gameover = True
-
-        for trooper in self.trooper_list:
-            if random.randrange(800) == 0 and self.gameover is False:
-                ebullet = EnemyBullet()
-                ebullet.center_x = trooper.center_x
-                ebullet.top = trooper.bottom
-                self.ebullets.append(ebullet)
-
-        for bullet in self.bullet_list:
-            # check if a bullet and trooper are colliding
-            hit_list = arcade.check_for_collision_with_list(bullet, self.trooper_list)
-
-            if len(hit_list) > 0:
-                explosion = Explosion(self.explosion_texture_list)
-                explosion.center_x = hit_list[0].center_x
-                explosion.center_y = hit_list[0].center_y
-                self.explosions.append(explosion)
-                arcade.play_sound(explosion.explosion_sound)
-                bullet.kill()
-
-            for trooper in hit_list:
-                trooper.kill()
-                self.score += 2
-
-        bb8_hit = arcade.check_for_collision_with_list(self.BB8, self.ebullets)
-        if len(bb8_hit) > 0:
-            arcade.play_sound(self.BB8.explosion_sound)
-            self.BB8.kill()
-            bb8_hit[0].kill()
-            self.gameover = True
+        with self.profiler.phase("loading"):
+            self.explosion_frames.poll()
+
+        with self.profiler.phase("sim"):
+            sounds = self.stepper.advance(dt, self.inputs)
+        with self.profiler.phase("sound"):
+            self.mixer.play(sounds)
+        self.inputs = []
+
+        # a game that just ended goes on the leaderboard
+        if not self.world.gameover:
+            self.scored = False
+        elif not self.scored:
+            self.add_high_score("bb8", 1)
+            self.scored = True
+        # scores are written in batches, a full one or a minute after the first (and on close)
+        if self.high_scores.done():
+            self.high_scores.result().flush_if_due()
+
+    def add_high_score(self, game, level):
+        store = self.high_scores.result()
+        score = self.world.score
+        rank = store.add(game, level, score)
+        best = store.best(game, level)
+        self.game_over_hud.set("best", f"Best: {best.score} by {best.player}")
+        self.game_over_hud.set("rank", f"Your score is #{rank} of {store.count(game, level)}")
 
 
 # -----Main Function--------
 def main():
     window = MyGame(SW, SH, "BB8 Attack")
-    window.reset()
     arcade.run()
+    window.high_scores.result().close()
+    if SERVER:
+        window.world.close()
 
 
 # ------Run Main Function-----
@@ -15,96 +15,33 @@ learn more in upcoming chapters. Below are some ideas that you could include:
 
 '''
 
-import random
 import arcade
-import math
+
+from engine import fighter
+from engine.fighter import FighterWorld
+from engine.assets import assets
+from engine.atlas import EXPLOSION_CACHE, EXPLOSION_FRAMES
+from engine.hud import Hud
+from engine.loader import Prefetcher
+from engine.net import SERVER, join
+from engine.overlay import PerfOverlay
+from engine.profiler import Profiler, entity_counts, pool_counts
+from engine.render import (KEY_NAMES, DrawCounter, SpriteSync, draw_loading_bar, load_frames, make_mixer,
+                           preload_sprites)
+from engine.replay import record
+from engine.scores import ScoreStore
+from engine.timestep import FixedTimestep
 
 # --- Constants ---
 SW = 800
 SH = 600
-FIGHTER_SCALE = 0.3
-ENEMY_PLANE_SCALE = 0.1
-BULLET_SCALE = 1
-
-# Movement Constants
-ANGLE_SPEED = 4
-MIN_PLANE_SPEED = 2
-MAX_PLANE_SPEED = 5
-BULLET_SPEED = 20
-ENEMY_PLANE_SPEED = 2.5
+HUD_PANEL = (SW - 95, SW, SH, SH - 55, arcade.color.WHITE)    # under the level, score and speed
 
 EXPLOSION_TEXTURE_LIST = 50
 
-
-# ------Fighter Jet/Player------------
-class Player(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/fighter1.png", FIGHTER_SCALE)
-        self.laser_sound = arcade.load_sound("sounds/laser.mp3")
-        self.explosion_sound = arcade.load_sound("sounds/explosion.mp3")
-        self.speed = 0
-        self.change_angle = 0
-
-    def update(self):
-        self.angle += self.change_angle
-        angle_rad = math.radians(self.angle)
-
-        # trig to figure out distance change based on speed and angle
-        self.center_x += -self.speed * math.sin(angle_rad)
-        self.center_y += self.speed * math.cos(angle_rad)
-        # use if statements to keep bb8 in walls
-        if self.left < 0:
-            self.left = 0
-        if self.right > SW:
-            self.right = SW
-        if self.top > SH:
-            self.top = SH
-        if self.bottom < 0:
-            self.bottom = 0
-
-
-# ---------Bullet/Laser-------------
-class Bullet(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/bullet.png", BULLET_SCALE)
-
-    def update(self):
-        angle_shoot = math.radians(self.angle - 90)
-        self.center_x += -self.speed * math.sin(angle_shoot)
-        self.center_y += self.speed * math.cos(angle_shoot)
-        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
-            self.kill()
-
-
-# -------Explosion---------
-class Explosion(arcade.Sprite):
-    def __init__(self, texture_list):
-        super().__init__("Images/explosions/explosion0000.png")
-
-        self.current_texture = 0
-        self.textures = texture_list
-        self.explosion_sound = arcade.load_sound("sounds/explosion.mp3")
-
-    def update(self):
-        self.current_texture += 1
-        if self.current_texture < len(self.textures):
-            self.set_texture(self.current_texture)
-        else:
-            self.kill()
-
-
-# ---------Enemy Plane------------
-class EnemyPlane(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/enemy_plane.png", ENEMY_PLANE_SCALE)
-        self.speed = ENEMY_PLANE_SPEED
-
-    def update(self):
-        angle_shoot = math.radians(self.angle - 45)
-        self.center_x += -self.speed * math.sin(angle_shoot)
-        self.center_y += self.speed * math.cos(angle_shoot)
-        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
-            self.kill()
+LEVEL_COLORS = {1: arcade.color.SKY_BLUE,
+                2: arcade.color.BLUE_GRAY,
+                3: arcade.color.BLUE_GREEN}
 
 
 # ------MyGame Class--------------
@@ -114,178 +51,128 @@ class MyGame(arcade.Window):
 
         self.set_mouse_visible(False)
 
-        self.current_state = 0
-        self.game_running = False
-
-        self.explosion_texture_list = []
-        for i in range(EXPLOSION_TEXTURE_LIST):
-            texture_name = f"Images/explosions/explosion{i:04}.png"
-            self.explosion_texture_list.append(arcade.load_texture(texture_name))
-
-    def setup(self):   # setup the game
-        if self.current_state == 1:     # check which level is active and set variables accordingly
-            arcade.set_background_color(arcade.color.SKY_BLUE)
-            self.enemy_count = 1
-
-        elif self.current_state == 2:
-            arcade.set_background_color(arcade.color.BLUE_GRAY)
-            self.enemy_count = 2
-
-        elif self.current_state == 3:
-            arcade.set_background_color(arcade.color.BLUE_GREEN)
-            self.enemy_count = 3
-
-        # sprite lists
-        self.player_list = arcade.SpriteList()
-        self.bullet_list = arcade.SpriteList()
-        self.enemy_plane_list = arcade.SpriteList()
-        # enemy bullet list
-        self.explosion_list = arcade.SpriteList()
-
-        # create the player
-        self.fighter = Player()
-        self.fighter.center_x = SW / 2
-        self.fighter.center_y = SH / 2
-        self.fighter.speed = 2
-        self.player_list.append(self.fighter)
-
-        for i in range(self.enemy_count):
-            eplane = EnemyPlane()
-            # depending on which number the plane is in the list, it will determine the direction
-            if i % 4 == 0:
-                eplane.center_x = random.randrange(int(SW/3), int(SW * 2/3))
-                eplane.center_y = 0     # from the bottom of the screen
-                eplane.angle = random.randrange(5, 85)
-
-            elif i % 4 == 1:
-                eplane.center_x = random.randrange(int(SW/3), int(SW * 2/3))
-                eplane.center_y = SH        # from the top
-                eplane.angle = random.randrange(160, 280)
-
-            elif i % 4 == 2:
-                eplane.center_x = 0     # from the left
-                eplane.center_y = random.randrange(int(SH/3), int(SH * 2/3))
-                eplane.angle = random.randrange(-90, 0)
-
-            else:           # from the right
-                pass        # only used in a 4th level so its not done
-            # eplane.angle = 0            # 0 deg is 45 deg in the picture
-            self.enemy_plane_list.append(eplane)
+        # decode the explosion frames on worker threads so the window opens right away
+        self.prefetcher = Prefetcher()
+        self.explosion_frames = load_frames(self.prefetcher, EXPLOSION_FRAMES[:EXPLOSION_TEXTURE_LIST], EXPLOSION_CACHE)
+        self.explosion_texture_list = self.explosion_frames.items
+
+        self.mixer = make_mixer({"laser": "sounds/laser.mp3", "explosion": "sounds/explosion.mp3"})
+        preload_sprites(fighter.Player, fighter.Bullet, fighter.EnemyPlane)
+
+        # the game itself runs in the world, the window only draws it; with
+        # SERVER=host:port the world is on a server (python -m engine.net) and two can play
+        self.world = join(SERVER, FighterWorld) if SERVER else FighterWorld()
+        self.sprites = SpriteSync(self.explosion_texture_list)
+        self.inputs = []
+        self.stepper = FixedTimestep(self.world if SERVER else record(self.world))
+
+        # the all-time high scores are read on a worker thread, the first game over needs them
+        self.high_scores = self.prefetcher.executor.submit(ScoreStore)
+        self.level = None       # the level the game being played started on
+
+        # F3 shows how long each part of a frame takes
+        self.profiler = Profiler()
+        self.world.profiler = self.profiler
+        self.overlay = PerfOverlay(self.profiler)
+        self.draws = DrawCounter()
+
+        # text is laid out once and again only when it changes
+        self.instructions_hud = Hud()
+        self.instructions_hud.add("message", "Use W, A, S, and D to move the plane and use SPACE to shoot.  Choose level 1, 2, or 3.",
+                                  SW / 2 - 290, SH / 2, (0, 255, 0))
+        self.hud = Hud()
+        self.hud.add("level", "Level: 0", SW - 90, SH - 15, arcade.color.BLACK)
+        self.hud.add("score", "Score: 0", SW - 90, SH - 35, arcade.color.BLACK)
+        self.hud.add("speed", "Speed: 0", SW - 90, SH - 55, arcade.color.BLACK)
+        self.game_over_hud = Hud()
+        self.game_over_hud.add("message", "Game over! Choose level 1, 2, or 3 to play again!", SW / 2 - 150, SH / 2, (0, 255, 0))
+        self.game_over_hud.add("help", "Press I for instructions.", SW / 2 - 90, SH / 2 - 20, (0, 255, 0))
+        self.game_over_hud.add("score", "Score: 0", SW / 2 - 35, SH / 2 - 40, arcade.color.WHITE)
+        self.game_over_hud.add("best", "", SW / 2 - 150, SH / 2 - 70, arcade.color.WHITE)
+        self.game_over_hud.add("rank", "", SW / 2 - 150, SH / 2 - 90, arcade.color.WHITE)
 
     def on_draw(self):
-        arcade.start_render()
-        if self.current_state == 0:
-            arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
-            arcade.draw_text("Use W, A, S, and D to move the plane and use SPACE to shoot.  Choose level 1, 2, or 3.",
-                             SW / 2 - 290, SH / 2, (0, 255, 0), 14)
-
-        elif self.game_running is True:
-            self.player_list.draw()
-            self.bullet_list.draw()
-            self.enemy_plane_list.draw()
-            self.explosion_list.draw()
-
-            arcade.draw_lrtb_rectangle_filled(SW - 95, SW, SH, SH - 55, arcade.color.WHITE)
-            output = f"Level: {self.current_state}"
-            arcade.draw_text(output, SW - 90, SH - 15, arcade.color.BLACK, 14)
-            output = f"Score: {self.score}"
-            arcade.draw_text(output, SW - 90, SH - 35, arcade.color.BLACK, 14)
-            output = f"Speed: {self.fighter.speed}"
-            arcade.draw_text(output, SW - 90, SH - 55, arcade.color.BLACK, 14)
-
-        else:       # draw game over screen
-            output = f"Score: {self.score}"
-            arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
-            arcade.draw_text("Game over! Choose level 1, 2, or 3 to play again!", SW / 2 - 150, SH / 2, (0, 255, 0), 14)
-            arcade.draw_text("Press I for instructions.", SW / 2 - 90, SH / 2 - 20, (0, 255, 0), 14)
-            arcade.draw_text(output, SW / 2 - 35, SH / 2 - 40, arcade.color.WHITE, 14)
+        self.draws.start()
+        with self.profiler.phase("draw"):
+            arcade.start_render()
+            world = self.world
+            if world.current_state == 0:
+                arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
+                self.instructions_hud.draw()
+                if not self.explosion_frames.done():
+                    draw_loading_bar(self.explosion_frames.progress())
+
+            elif world.game_running is True:
+                self.sprites.draw(world.player_list, world.bullet_list, world.enemy_plane_list, world.explosion_list,
+                                  tick=world.tick, alpha=self.stepper.alpha, panels=[HUD_PANEL])
+
+                self.hud.set("level", f"Level: {world.current_state}")
+                self.hud.set("score", f"Score: {world.score}")
+                self.hud.set("speed", f"Speed: {world.fighter.speed}")
+                self.hud.draw()
+
+            else:       # draw game over screen
+                arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
+                self.game_over_hud.set("score", f"Score: {world.score}")
+                self.game_over_hud.draw()
+
+        self.profiler.end_frame({**entity_counts(self.world), **pool_counts(self.world), **self.draws.counts(),
+                                 **assets.counts(), **self.mixer.counts()})
+        self.overlay.draw()
 
     def on_update(self, dt):
-        if self.current_state > 0 and self.current_state < 4:
-            self.game_running = True
-
-        else:
-            self.game_running = False
-
-        if self.game_running is True:
-            self.player_list.update()
-            self.bullet_list.update()
-            self.explosion_list.update()
-            self.enemy_plane_list.update()
-
-            if len(self.enemy_plane_list) == 0:
-                self.current_state += 1
-                self.setup()
-
-            self.plane_hit = arcade.check_for_collision_with_list(self.fighter, self.enemy_plane_list)
-            # check if fighter is colliding with another plane
-            if len(self.plane_hit) > 0:
-                self.fighter.kill()
-                self.current_state = 4
-
-            for bullet in self.bullet_list:
-                # check if a bullet and trooper are colliding
-                hit_list = arcade.check_for_collision_with_list(bullet, self.enemy_plane_list)
-
-                # create the explosion
-                if len(hit_list) > 0:
-                    explosion = Explosion(self.explosion_texture_list)
-                    explosion.center_x = hit_list[0].center_x
-                    explosion.center_y = hit_list[0].center_y
-                    self.explosion_list.append(explosion)
-                    arcade.play_sound(explosion.explosion_sound)
-
-                for eplane in hit_list:
-                    eplane.kill()
-                    self.score += 1
+        with self.profiler.phase("loading"):
+            self.explosion_frames.poll()
+
+        with self.profiler.phase("sim"):
+            sounds = self.stepper.advance(dt, self.inputs)
+        with self.profiler.phase("sound"):
+            self.mixer.play(sounds)
+        self.inputs = []
+
+        # a game that just ended goes on the leaderboard of the level it started on
+        if self.world.game_running:
+            if self.level is None:
+                self.level = self.world.current_state
+        elif self.level is not None:
+            self.add_high_score("fighter", self.level)
+            self.level = None
+        # scores are written in batches, a full one or a minute after the first (and on close)
+        if self.high_scores.done():
+            self.high_scores.result().flush_if_due()
+
+        # each level has its own sky
+        if self.world.current_state in LEVEL_COLORS:
+            arcade.set_background_color(LEVEL_COLORS[self.world.current_state])
+
+    def add_high_score(self, game, level):
+        store = self.high_scores.result()
+        score = self.world.score
+        rank = store.add(game, level, score)
+        best = store.best(game, level)
+        self.game_over_hud.set("best", f"Best on level {level}: {best.score} by {best.player}")
+        self.game_over_hud.set("rank", f"Your score is #{rank} of {store.count(game, level)}")
 
     def on_key_press(self, key, modifiers: int):
-        if key == arcade.key.A and self.game_running:
-            self.fighter.change_angle = ANGLE_SPEED
-
-        elif key == arcade.key.D and self.game_running:
-            self.fighter.change_angle = -ANGLE_SPEED
-
-        elif key == arcade.key.W and self.game_running and self.fighter.speed < MAX_PLANE_SPEED:
-            self.fighter.speed += 1
-
-        elif key == arcade.key.S and self.game_running and self.fighter.speed > MIN_PLANE_SPEED:
-            self.fighter.speed -= 1
-
-        elif key == arcade.key.SPACE and self.game_running:
-            self.bullet = Bullet()
-            self.bullet.center_x = self.fighter.center_x
-            self.bullet.center_y = self.fighter.center_y
-            self.bullet.angle = self.fighter.angle + 90
-            self.bullet.speed = BULLET_SPEED
-            self.bullet_list.append(self.bullet)
-            arcade.play_sound(self.fighter.laser_sound)
-
-        # level selector
-        elif key == arcade.key.I and not self.game_running:
-            self.current_state = 0
-        elif key == arcade.key.KEY_1 and not self.game_running:
-            self.current_state = 1
-            self.score = 0
-            self.setup()
-        elif key == arcade.key.KEY_2 and not self.game_running:
-            self.current_state = 2
-            self.score = 0
-            self.setup()
-        elif key == arcade.key.KEY_3 and not self.game_running:
-            self.current_state = 3
-            self.score = 0
-            self.setup()
+        if key == arcade.key.F3:
+            self.overlay.toggle()
+            # draws are only counted while the overlay shows them
+            self.draws.enable(self.overlay.visible)
+        elif key in KEY_NAMES:
+            self.inputs.append(("press", KEY_NAMES[key]))
 
     def on_key_release(self, key, modifiers: int):
-        if (key == arcade.key.A or key == arcade.key.D) and self.game_running is True:
-            self.fighter.change_angle = 0
+        if key in KEY_NAMES:
+            self.inputs.append(("release", KEY_NAMES[key]))
 
 
 # -----Main Function--------
 def main():
     window = MyGame(SW, SH, "Fighter go brrrr")
     arcade.run()
+    window.high_scores.result().close()
+    if SERVER:
+        window.world.close()
 
 
 # ------Run Main Function-----
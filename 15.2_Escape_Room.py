@@ -2,14 +2,24 @@
 Escape Room
 -----------
 Attempt to create an Escape Room Game.
+Click on things to pick them up and use them, the rooms are in rooms/.
+R starts the room over. Progress is saved to escape.sav as you play and
+picked up again the next time the game starts.
 '''
 
-import random
 import arcade
 
+from engine import replay, snapshot
+from engine.escape_room import EscapeWorld
+from engine.hud import Hud
+from engine.loader import Prefetcher
+from engine.render import KEY_NAMES
+from engine.timestep import FixedTimestep
+
 # --- Constants ---
 SW = 800
 SH = 600
+SAVE_PATH = "escape.sav"
 
 
 # ------MyGame Class--------------
@@ -19,20 +29,111 @@ class MyGame(arcade.Window):
         super().__init__(SW, SH, title)
         arcade.set_background_color(arcade.color.WHITE)
 
+        # the rules and the rooms live in the world, the window only draws them
+        self.world = EscapeWorld()
+        # carry on from the last session, unless this one is recorded (a replay
+        # starts from the seed alone, and must not touch the player's save)
+        self.autosaver = None
+        if not replay.RECORD:
+            saved = snapshot.load(SAVE_PATH, EscapeWorld.required_sections)
+            if saved:
+                self.world.restore_sections(saved)
+            self.autosaver = snapshot.AutoSaver(SAVE_PATH, saved)
+        self.inputs = []
+        self.stepper = FixedTimestep(replay.record(self.world))
+
+        # textures of the room and the rooms next to it are decoded on worker threads
+        self.prefetcher = Prefetcher()
+        self.resident = set()
+        self.room_name = None
+        self.load_room()
+
+        self.hud = Hud()
+        self.hud.add("message", "", 10, 40, arcade.color.BLACK)
+        self.hud.add("inventory", "Inventory:", 10, 15, arcade.color.BLACK)
+        self.hud.add("score", "Score: 0", SW - 110, SH - 25, arcade.color.BLACK)
+
+    def load_room(self):
+        world = self.world
+        images = world.resident_images()
+        for path in images - self.resident:
+            self.prefetcher.prefetch("texture", path)
+        # rooms the player can't reach in one click don't keep their textures
+        for path in self.resident - images:
+            self.prefetcher.cache.drop("texture", path)
+        self.resident = images
+
+        self.room_name = world.room_name
+        room = world.current
+        # the background, the objects and the panel under the text are one
+        # SpriteList, so a room is drawn in one call
+        self.room_sprites = arcade.SpriteList()
+        self.object_sprites = []
+        if room.background is not None:
+            background = arcade.Sprite(texture=self.prefetcher.take("texture", room.background),
+                                       center_x=SW / 2, center_y=SH / 2)
+            background.width = SW
+            background.height = SH
+            self.room_sprites.append(background)
+        for obj in room.objects:
+            if obj.image is not None:
+                sprite = arcade.Sprite(texture=self.prefetcher.take("texture", obj.image),
+                                       center_x=obj.center_x, center_y=obj.center_y)
+                sprite.width = obj.width
+                sprite.height = obj.height
+                sprite.object = obj
+                self.object_sprites.append(sprite)
+                self.room_sprites.append(sprite)
+        panel = arcade.SpriteSolidColor(SW, 60, arcade.color.WHITE)
+        panel.center_x = SW / 2
+        panel.center_y = 30
+        self.room_sprites.append(panel)
+        self.show_objects()
+
+    def show_objects(self):
+        for sprite in self.object_sprites:
+            sprite.visible = self.world.visible(sprite.object)
+
     def on_draw(self):
         arcade.start_render()
+        self.room_sprites.draw()
+        self.hud.draw()
+
+    def on_key_press(self, key, modifiers):
+        if key in KEY_NAMES:
+            self.inputs.append(("press", KEY_NAMES[key]))
+
+    def on_mouse_press(self, x, y, button, modifiers):
+        self.inputs.append(("click", (x, y)))
 
     def on_update(self, dt):
-        pass
+        tick = self.world.tick
+        self.stepper.advance(dt, self.inputs)
+        self.inputs = []
+        self.prefetcher.poll()
+        # only what changed, written on the autosave thread
+        if self.autosaver is not None:
+            self.autosaver.save(self.world)
+
+        world = self.world
+        if world.room_name != self.room_name:
+            self.load_room()
+        elif world.tick != tick:
+            self.show_objects()
+
+        self.hud.set("message", world.message)
+        self.hud.set("inventory", "Inventory: " + ", ".join(world.inventory))
+        self.hud.set("score", f"Score: {world.score}")
 
 
 # -----Main Function--------
 def main():
     window = MyGame(SW,SH,"My Escape Room")
     arcade.run()
+    if window.autosaver is not None:
+        window.autosaver.close()
 
 
 # ------Run Main Function-----
 if __name__ == "__main__":
     main()
-
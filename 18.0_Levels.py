@@ -1,309 +1,178 @@
-
-
-import random
 import arcade
-import math
+
+from engine import levels
+from engine.levels import LEVELS, LevelsWorld, Instructions
+from engine.assets import assets
+from engine.atlas import EXPLOSION_CACHE, EXPLOSION_FRAMES
+from engine.hud import Hud
+from engine.loader import Prefetcher
+from engine.overlay import PerfOverlay
+from engine.profiler import Profiler, entity_counts, pool_counts
+from engine.render import (KEY_NAMES, DrawCounter, SpriteSync, draw_loading_bar, load_frames, make_mixer,
+                           preload_sprites)
+from engine.replay import record
+from engine.scores import ScoreStore
+from engine.timestep import FixedTimestep
 
 # --- Constants ---
-BB8_scale = 0.3
-trooper_scale = 0.1
-bullet_scale = 1
 SW = 800
 SH = 600
-speed = 4
-Bullet_Points = -1
-Trooper_Points = 5
+HUD_PANEL = (SW - 95, SW, SH, SH - 35, arcade.color.WHITE)    # under the level and score
 
 explosion_texture_count = 50
 
-# game states
-Instructions = 0
-Level_1 = 1
-Level_2 = 2
-Level_3 = 3
-Finished = 4
-
-# speed constants
-Movement_Speed = 5
-Angle_Speed = 5
-Bullet_Speed = 10
-E_Bullet_Speed = 8
-
-
-# -------Explosion---------
-class Explosion(arcade.Sprite):
-    def __init__(self, texture_list):
-        super().__init__("Images/explosions/explosion0000.png")
-
-        self.current_texture = 0
-        self.textures = texture_list
-        self.explosion_sound = arcade.load_sound("sounds/explosion.mp3")
-
-    def update(self):
-        self.current_texture += 1
-        if self.current_texture < len(self.textures):
-            self.set_texture(self.current_texture)
-        else:
-            self.kill()
-
-
-# -------Player/BB8--------
-class Player(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/bb8.png", BB8_scale)
-        self.laser_sound = arcade.load_sound("sounds/laser.mp3")
-        self.explosion_sound = arcade.load_sound("sounds/explosion.mp3")
-        self.speed = 0
-        self.change_angle = 0
-
-    def update(self):
-        self.angle += self.change_angle
-        angle_rad = math.radians(self.angle)
-
-        # trig to figure out distance change based on speed and angle
-        self.center_x += -self.speed * math.sin(angle_rad)
-        self.center_y += self.speed * math.cos(angle_rad)
-        # use if statements to keep bb8 in walls
-        if self.left < 0:
-            self.left = 0
-        if self.right > SW:
-            self.right = SW
-        if self.top > SH:
-            self.top = SH
-        if self.bottom < 0:
-            self.bottom = 0
-
-
-# --------Enemy Bullet-----
-class EnemyBullet(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/rbullet.png", bullet_scale)
-        self.angle_list = [0, 90, 180, 270]
-        self.angle = random.choice(self.angle_list)
-
-    def update(self):
-        angle_shoot = math.radians(self.angle - 90)
-        self.center_x += -E_Bullet_Speed * math.sin(angle_shoot)
-        self.center_y += E_Bullet_Speed * math.cos(angle_shoot)
-        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
-            self.kill()
-
-
-# --------Trooper----------
-class Trooper(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/stormtrooper.png", trooper_scale)
-        self.w = int(self.width)
-        self.h = int(self.height)
-        self.dx = random.randrange(-1, 2, 2)
-        self.dy = random.randrange(-1, 2, 2)
-
-    def update(self):
-        self.center_x += self.dx
-        self.center_y += self.dy
-        if self.bottom < 0 or self.top > SH:
-            self.dy *= -1
-        elif self.left < 0 or self.right > SW:
-            self.dx *= -1
-
-
-# -------Bullet-----------
-class Bullet(arcade.Sprite):
-    def __init__(self):
-        super().__init__("Images/bullet.png", bullet_scale)
-
-    def update(self):
-        angle_shoot = math.radians(self.angle - 90)
-        self.center_x += -self.speed * math.sin(angle_shoot)
-        self.center_y += self.speed * math.cos(angle_shoot)
-        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
-            self.kill()
+LEVEL_COLORS = {1: arcade.color.SKY_BLUE,
+                2: arcade.color.WHITE_SMOKE,
+                3: arcade.color.ROSE_RED}
 
 
 # ------MyGame Class--------------
 class MyGame(arcade.Window):
     def __init__(self, SW, SH, title):
         super().__init__(SW, SH, title)
-        # set game state
-        self.current_state = 0
-        self.game_running = False
 
         self.set_mouse_visible(False)
 
-        self.explosion_texture_list = []
-        for i in range (explosion_texture_count):
-            texture_name = f"Images/explosions/explosion{i:04}.png"
-            self.explosion_texture_list.append(arcade.load_texture(texture_name))
-
-    def setup(self):   # setup the game
-        if self.current_state == 1:     # check which level is active and set variables accordingly
-            arcade.set_background_color(arcade.color.SKY_BLUE)
-            self.background = arcade.load_texture("Images/sky1.png")
-            self.trooper_count = 1
-
-        elif self.current_state == 2:
-            arcade.set_background_color(arcade.color.WHITE_SMOKE)
-            self.background = arcade.load_texture("Images/sky2.png")
-            self.trooper_count = 2
-
-        elif self.current_state == 3:
-            arcade.set_background_color(arcade.color.ROSE_RED)
-            self.background = arcade.load_texture("Images/sky3.png")
-            self.trooper_count = 3
-
-        # sprite lists
-        self.player_list = arcade.SpriteList()
-        self.trooper_list = arcade.SpriteList()
-        self.bullet_list = arcade.SpriteList()
-        self.explosions = arcade.SpriteList()
-        self.ebullets = arcade.SpriteList()
-
-        # create the player
-        self.BB8 = Player()
-        self.BB8.center_x = SW/2
-        self.BB8.center_y = SH/2
-        self.player_list.append(self.BB8)
-
-        # create the troopers
-        for i in range(self.trooper_count):
-            trooper = Trooper()
-            if i % 2 == 0:
-                trooper.center_x = random.randrange(trooper.w, int(SW / 3))
-            else:
-                trooper.center_x = random.randrange(int(SW * 2 / 3), SW - trooper.w)
-            trooper.center_y = random.randrange(trooper.h, SH - trooper.h)
-            self.trooper_list.append(trooper)
+        # decode the skies and explosion frames on worker threads so the window
+        # opens right away, skies first since a level can start any time
+        self.prefetcher = Prefetcher()
+        for level in LEVELS:
+            self.prefetcher.prefetch("texture", LEVELS[level][0])
+        self.explosion_frames = load_frames(self.prefetcher, EXPLOSION_FRAMES[:explosion_texture_count], EXPLOSION_CACHE)
+        self.explosion_texture_list = self.explosion_frames.items
+
+        self.mixer = make_mixer({"laser": "sounds/laser.mp3", "explosion": "sounds/explosion.mp3"})
+        preload_sprites(levels.Player, levels.Trooper, levels.Bullet, levels.EnemyBullet)
+
+        # the game itself runs in the world, the window only draws it
+        self.world = LevelsWorld()
+        self.sprites = SpriteSync(self.explosion_texture_list)
+        self.inputs = []
+        self.stepper = FixedTimestep(record(self.world))
+
+        # the all-time high scores are read on a worker thread, the first game over needs them
+        self.high_scores = self.prefetcher.executor.submit(ScoreStore)
+        self.level = None       # the level the game being played started on
+
+        # F3 shows how long each part of a frame takes
+        self.profiler = Profiler()
+        self.world.profiler = self.profiler
+        self.overlay = PerfOverlay(self.profiler)
+        self.draws = DrawCounter()
+
+        self.background = None
+        self.background_name = None
+
+        # text is laid out once and again only when it changes
+        self.instructions_hud = Hud()
+        self.instructions_hud.add("message", "Use arrow keys to move BB8 and use SPACE to shoot.  Choose level 1, 2, or 3.",
+                                  SW / 2 - 290, SH / 2, (0, 255, 0))
+        self.hud = Hud()
+        self.hud.add("level", "Level: 0", SW - 90, SH - 15, arcade.color.BLACK)
+        self.hud.add("score", "Score: 0", SW - 90, SH - 30, arcade.color.BLACK)
+        self.game_over_hud = Hud()
+        self.game_over_hud.add("message", "Game over! Choose level 1, 2, or 3 to play again!", SW / 2 - 150, SH / 2, (0, 255, 0))
+        self.game_over_hud.add("help", "Press I for instructions.", SW / 2 - 90, SH / 2 - 20, (0, 255, 0))
+        self.game_over_hud.add("score", "Score: 0", SW / 2 - 35, SH / 2 - 40, arcade.color.WHITE)
+        self.game_over_hud.add("best", "", SW / 2 - 150, SH / 2 - 70, arcade.color.WHITE)
+        self.game_over_hud.add("rank", "", SW / 2 - 150, SH / 2 - 90, arcade.color.WHITE)
 
     def on_draw(self):
-        arcade.start_render()
-        if self.current_state == 0:
-            arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
-            arcade.draw_text("Use arrow keys to move BB8 and use SPACE to shoot.  Choose level 1, 2, or 3.",
-                             SW / 2 - 290, SH / 2, (0, 255, 0), 14)
-
-        elif self.game_running is True:
-            arcade.draw_texture_rectangle(SW // 2, SH // 2, SW, SH, self.background)
-            self.trooper_list.draw()
-            self.player_list.draw()
-            self.bullet_list.draw()
-            self.explosions.draw()
-            self.ebullets.draw()
-
-            arcade.draw_lrtb_rectangle_filled(SW - 95, SW, SH, SH - 35, arcade.color.WHITE)
-            output = f"Level: {self.current_state}"
-            arcade.draw_text(output, SW - 90, SH - 15, arcade.color.BLACK, 14)
-            output = f"Score: {self.score}"
-            arcade.draw_text(output, SW - 90, SH - 30, arcade.color.BLACK, 14)
-
-        else:       # draw game over screen
-            output = f"Score: {self.score}"
-            arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
-            arcade.draw_text("Game over! Choose level 1, 2, or 3 to play again!", SW / 2 - 150, SH / 2, (0, 255, 0), 14)
-            arcade.draw_text("Press I for instructions.", SW / 2 - 90, SH / 2 - 20, (0, 255, 0), 14)
-            arcade.draw_text(output, SW / 2 - 35, SH / 2 - 40, arcade.color.WHITE, 14)
+        self.draws.start()
+        with self.profiler.phase("draw"):
+            arcade.start_render()
+            world = self.world
+            if world.current_state == Instructions:
+                arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
+                self.instructions_hud.draw()
+                if not self.explosion_frames.done():
+                    draw_loading_bar(self.explosion_frames.progress())
+
+            elif world.game_running is True:
+                self.sprites.draw(world.trooper_list, world.player_list, world.bullet_list,
+                                  world.explosions, world.ebullets, tick=world.tick, alpha=self.stepper.alpha,
+                                  background=self.background, panels=[HUD_PANEL])
+
+                self.hud.set("level", f"Level: {world.current_state}")
+                self.hud.set("score", f"Score: {world.score}")
+                self.hud.draw()
+
+            else:       # draw game over screen
+                arcade.draw_rectangle_filled(SW // 2, SH // 2, SW, SH, arcade.color.BLACK)
+                self.game_over_hud.set("score", f"Score: {world.score}")
+                self.game_over_hud.draw()
+
+        # the counts include how long the game waited for the sky of the last level it started
+        self.profiler.end_frame({**entity_counts(self.world), **pool_counts(self.world), **self.draws.counts(),
+                                 **assets.counts(), **self.mixer.counts(), **self.prefetcher.counts()})
+        self.overlay.draw()
+
+    def add_high_score(self, game, level):
+        store = self.high_scores.result()
+        score = self.world.score
+        rank = store.add(game, level, score)
+        best = store.best(game, level)
+        self.game_over_hud.set("best", f"Best on level {level}: {best.score} by {best.player}")
+        self.game_over_hud.set("rank", f"Your score is #{rank} of {store.count(game, level)}")
 
     def on_key_press(self, key, modifiers: int):
-        if key == arcade.key.LEFT and self.game_running:
-            self.BB8.change_angle = Angle_Speed
-        elif key == arcade.key.RIGHT and self.game_running:
-            self.BB8.change_angle = -Angle_Speed
-        elif key == arcade.key.UP and self.game_running:
-            self.BB8.speed = Movement_Speed
-        elif key == arcade.key.DOWN and self.game_running:
-            self.BB8.speed = -Movement_Speed
-        elif key == arcade.key.SPACE and self.game_running:
-            self.bullet = Bullet()
-            self.bullet.center_x = self.BB8.center_x
-            self.bullet.center_y = self.BB8.center_y
-            self.bullet.angle = self.BB8.angle + 90
-            self.bullet.speed = Bullet_Speed
-            self.bullet_list.append(self.bullet)
-            arcade.play_sound(self.BB8.laser_sound)
-            self.score += Bullet_Points
-
-        # level selector
-        elif key == arcade.key.I and not self.game_running:
-            self.current_state = 0
-        elif key == arcade.key.KEY_1 and not self.game_running:
-            self.current_state = 1
-            self.score = 0
-            self.setup()
-        elif key == arcade.key.KEY_2 and not self.game_running:
-            self.current_state = 2
-            self.score = 0
-            self.setup()
-        elif key == arcade.key.KEY_3 and not self.game_running:
-            self.current_state = 3
-            self.score = 0
-            self.setup()
+        if key == arcade.key.F3:
+            self.overlay.toggle()
+            # draws are only counted while the overlay shows them
+            self.draws.enable(self.overlay.visible)
+        elif key in KEY_NAMES:
+            self.inputs.append(("press", KEY_NAMES[key]))
 
     def on_key_release(self, key, modifiers: int):
-        if (key == arcade.key.LEFT or key == arcade.key.RIGHT) and self.game_running:
-            self.BB8.change_angle = 0
-        if (key == arcade.key.UP or key == arcade.key.DOWN) and self.game_running:
-            self.BB8.speed = 0
+        if key in KEY_NAMES:
+            self.inputs.append(("release", KEY_NAMES[key]))
 
     def on_update(self, dt):
-        if self.current_state > 0 and self.current_state < 4:
-            self.game_running = True
-
-        else:
-            self.game_running = False
-
-        if self.game_running is True:
-
-            self.player_list.update()
-            self.trooper_list.update()
-            self.bullet_list.update()
-            self.explosions.update()
-            self.ebullets.update()
-
-            if len(self.trooper_list) == 0:
-                self.current_state += 1
-                self.setup()
-
-            self.bb8_hit = arcade.check_for_collision_with_list(self.BB8, self.trooper_list)
-            # check if bb8 is colliding with a trooper
-            if len(self.bb8_hit) > 0:
-                self.BB8.kill()
-                self.current_state = 4
-
-            # randomly make the troopers shoot
-            for trooper in self.trooper_list:
-                if random.randrange(800) == 0:
-                    ebullet = EnemyBullet()
-                    ebullet.center_x = trooper.center_x
-                    ebullet.center_y = trooper.center_y
-                    self.ebullets.append(ebullet)
-
-            for bullet in self.bullet_list:
-                # check if a bullet and trooper are colliding
-                hit_list = arcade.check_for_collision_with_list(bullet, self.trooper_list)
-
-                if len(hit_list) > 0:
-                    explosion = Explosion(self.explosion_texture_list)
-                    explosion.center_x = hit_list[0].center_x
-                    explosion.center_y = hit_list[0].center_y
-                    self.explosions.append(explosion)
-                    arcade.play_sound(explosion.explosion_sound)
-                    bullet.kill()
-
-                for trooper in hit_list:
-                    trooper.kill()
-                    self.score += Trooper_Points
-
-            bb8_hit = arcade.check_for_collision_with_list(self.BB8, self.ebullets)
-            if len(bb8_hit) > 0:
-                arcade.play_sound(self.BB8.explosion_sound)
-                self.BB8.kill()
-                bb8_hit[0].kill()
-                self.current_state = 4
+        with self.profiler.phase("loading"):
+            self.explosion_frames.poll()
+
+        with self.profiler.phase("sim"):
+            sounds = self.stepper.advance(dt, self.inputs)
+        with self.profiler.phase("sound"):
+            self.mixer.play(sounds)
+        self.inputs = []
+
+        # a game that just ended goes on the leaderboard of the level it started on
+        if self.world.game_running:
+            if self.level is None:
+                self.level = self.world.current_state
+        elif self.level is not None:
+            self.add_high_score("levels", self.level)
+            self.level = None
+        # scores are written in batches, a full one or a minute after the first (and on close)
+        if self.high_scores.done():
+            self.high_scores.result().flush_if_due()
+
+        with self.profiler.phase("loading"):
+            # pick up the sky when the world moves to another level, it should
+            # already be decoded by the prefetcher
+            if self.world.background != self.background_name:
+                self.background_name = self.world.background
+                self.background = self.prefetcher.take("texture", self.background_name)
+
+            # decode the skies the player can go to next while this screen is up
+            if self.world.game_running:
+                upcoming = [self.world.current_state + 1]
+            else:
+                upcoming = LEVELS
+            for level in upcoming:
+                if level in LEVELS:
+                    self.prefetcher.prefetch("texture", LEVELS[level][0])
+
+        if self.world.current_state in LEVEL_COLORS:
+            arcade.set_background_color(LEVEL_COLORS[self.world.current_state])
 
 
 # -----Main Function--------
 def main():
     window = MyGame(SW, SH, "BB8 Attack")
     arcade.run()
+    window.high_scores.result().close()
 
 
 # ------Run Main Function-----
@@ -0,0 +1,71 @@
+'''
+Collision Benchmark
+-------------------
+Bullets against troopers, checked the old way (every bullet against the whole
+trooper list) and through the spatial hash. Run from the repository root:
+
+    python benchmarks/bench_collisions.py
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import SW, SH, check_for_collision_with_list
+from engine.levels import Bullet, Trooper
+from engine.spatial import SpatialHash
+
+COUNTS = [40, 200, 1000, 2000, 5000]
+BULLETS = 100
+
+
+def make_world(rng, count):
+    troopers = []
+    for i in range(count):
+        trooper = Trooper(rng)
+        trooper.center_x = rng.uniform(0, SW)
+        trooper.center_y = rng.uniform(0, SH)
+        troopers.append(trooper)
+    bullets = []
+    for i in range(BULLETS):
+        bullet = Bullet()
+        bullet.center_x = rng.uniform(0, SW)
+        bullet.center_y = rng.uniform(0, SH)
+        bullet.angle = 90
+        bullets.append(bullet)
+    return troopers, bullets
+
+
+def brute_force(troopers, bullets):
+    return sum(len(check_for_collision_with_list(bullet, troopers)) for bullet in bullets)
+
+
+def hashed(troopers, bullets):
+    spatial_hash = SpatialHash()
+    spatial_hash.build(troopers)
+    return sum(len(spatial_hash.check_for_collision(bullet)) for bullet in bullets)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{BULLETS} bullets per tick")
+    print(f"{'troopers':>9} {'list ms':>9} {'hash ms':>9} {'speedup':>8}")
+    for count in COUNTS:
+        troopers, bullets = make_world(rng, count)
+        hits, list_ms = timed(brute_force, troopers, bullets)
+        hash_hits, hash_ms = timed(hashed, troopers, bullets)
+        assert hits == hash_hits
+        print(f"{count:>9} {list_ms:>9.2f} {hash_ms:>9.2f} {list_ms / hash_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
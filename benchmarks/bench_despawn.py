@@ -0,0 +1,70 @@
+'''
+Despawn Benchmark
+-----------------
+A bomb goes off and kills every trooper on screen in one frame (or every other
+one). Compares kill() taking each trooper out of its list right away with the
+world's DespawnQueue doing it once at the end of the tick. Run from the
+repository root:
+
+    python benchmarks/bench_despawn.py
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import DespawnQueue, EntityList
+from engine.levels import Trooper
+from engine.pools import Pool
+
+COUNTS = [100, 1000, 5000]
+RUNS = 5
+
+
+def make_troopers(rng, count):
+    pool = Pool(Trooper)
+    troopers = EntityList()
+    for i in range(count):
+        troopers.append(pool.acquire(rng))
+    return troopers
+
+
+def bomb(troopers, rng, share, deferred):
+    victims = [trooper for i, trooper in enumerate(troopers) if i % share == 0]
+    rng.shuffle(victims)    # in whatever order the blast reaches them
+    queue = DespawnQueue()
+    start = time.perf_counter()
+    if deferred:
+        DespawnQueue.active = queue
+    for trooper in victims:
+        trooper.kill()
+    DespawnQueue.active = None
+    queue.flush()
+    return time.perf_counter() - start
+
+
+def best_ms(count, share, deferred):
+    times = []
+    for run in range(RUNS):
+        rng = random.Random(run)
+        troopers = make_troopers(rng, count)
+        times.append(bomb(troopers, rng, share, deferred))
+        assert len(troopers) == count - (count + share - 1) // share
+    return min(times) * 1000
+
+
+def main():
+    print(f"{'troopers':>8} {'killed':>7} {'kill() ms':>10} {'queue ms':>9} {'speedup':>8}")
+    for count in COUNTS:
+        for share in (1, 2):
+            now = best_ms(count, share, False)
+            later = best_ms(count, share, True)
+            killed = "all" if share == 1 else "half"
+            print(f"{count:>8} {killed:>7} {now:>10.3f} {later:>9.3f} {now / later:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+'''
+Draw Benchmark
+--------------
+Draws a game of the levels world, a level with more troopers in it and bots
+firing, once the way the windows used to (a SpriteList and a draw() for each
+entity list, the sky with draw_texture_rectangle, the HUD panel with
+draw_lrtb_rectangle_filled and an arcade.Text for each HUD line) and once
+through one layered SpriteSync and a Hud. A DrawCounter counts the draw calls
+and vertices of each frame. Needs an OpenGL context; on a machine without a
+display run it headless:
+
+    ARCADE_HEADLESS=1 python benchmarks/bench_draw.py
+'''
+
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import arcade
+
+from engine.assets import assets
+from engine.atlas import EXPLOSION_FRAMES
+from engine.core import TICK
+from engine.hud import Hud
+from engine.levels import LEVELS, LevelsWorld, Trooper
+from engine.render import DrawCounter, SpriteSync
+
+SW = 800
+SH = 600
+FRAMES = 600
+TROOPERS = 300
+HUD_PANEL = (SW - 95, SW, SH, SH - 35, arcade.color.WHITE)
+KEYS = ["LEFT", "RIGHT", "SPACE"]
+
+
+class CrowdedLevel(LevelsWorld):
+    '''Level 1 with TROOPERS troopers in the top half, started again when BB8 is hit.'''
+
+    def setup(self):
+        super().setup()
+        for i in range(TROOPERS - len(self.trooper_list)):
+            trooper = Trooper(self.rng)
+            trooper.center_x = self.rng.randrange(trooper.w, SW - trooper.w)
+            trooper.center_y = self.rng.randrange(SH // 2 + trooper.h, SH - trooper.h)
+            self.trooper_list.append(trooper)
+            self.schedule_fire(trooper)
+
+    def update(self, frames=1):
+        if not self.game_running and self.tick > 0:
+            self.current_state = 1
+            self.setup()
+        super().update(frames)
+
+
+def play(world, rng):
+    inputs = []
+    if rng.random() < 0.3:
+        inputs.append(("press", rng.choice(KEYS)))
+    if rng.random() < 0.1:
+        inputs.append(("release", rng.choice(KEYS[:2])))
+    world.step(TICK, inputs)
+
+
+def entity_lists(world):
+    return world.trooper_list, world.player_list, world.bullet_list, world.explosions, world.ebullets
+
+
+def make_per_list_frame(frames, background):
+    # one SpriteSync for each list is one SpriteList and one draw() each, like before
+    syncs = [SpriteSync(frames) for _ in range(5)]
+    labels = [arcade.Text("Level: 1", SW - 90, SH - 15, arcade.color.BLACK, 14),
+              arcade.Text("Score: 0", SW - 90, SH - 30, arcade.color.BLACK, 14)]
+
+    def per_list_frame(world):
+        arcade.draw_texture_rectangle(SW // 2, SH // 2, SW, SH, background)
+        for sync, entity_list in zip(syncs, entity_lists(world)):
+            sync.draw(entity_list, tick=world.tick)
+        arcade.draw_lrtb_rectangle_filled(*HUD_PANEL)
+        labels[1].text = f"Score: {world.score}"
+        for label in labels:
+            label.draw()
+
+    return per_list_frame
+
+
+def make_batched_frame(frames, background):
+    sprites = SpriteSync(frames)
+    hud = Hud()
+    hud.add("level", "Level: 1", SW - 90, SH - 15, arcade.color.BLACK)
+    hud.add("score", "Score: 0", SW - 90, SH - 30, arcade.color.BLACK)
+
+    def batched_frame(world):
+        sprites.draw(*entity_lists(world), tick=world.tick, background=background, panels=[HUD_PANEL])
+        hud.set("score", f"Score: {world.score}")
+        hud.draw()
+
+    return batched_frame
+
+
+def run(window, draw_frame, counter):
+    world = CrowdedLevel(seed=1)
+    world.step(TICK, [("press", "1")])
+    rng = random.Random(2)
+    times = []
+    calls = vertices = 0
+    for frame in range(FRAMES):
+        play(world, rng)
+        start = time.perf_counter()
+        counter.start()
+        window.clear()
+        draw_frame(world)
+        window.ctx.finish()
+        times.append(time.perf_counter() - start)
+        calls += counter.calls
+        vertices += counter.vertices
+    times.sort()
+    return calls / FRAMES, vertices / FRAMES, sum(times) * 1000 / FRAMES, times[len(times) * 99 // 100] * 1000
+
+
+def main():
+    window = arcade.Window(SW, SH, "Draw Benchmark", visible=False)
+    counter = DrawCounter()
+    counter.install()
+    frames = [assets.texture(path) for path in EXPLOSION_FRAMES]
+    background = assets.texture(LEVELS[1][0])
+    for name, make_frame in (("per list", make_per_list_frame), ("batched", make_batched_frame)):
+        calls, vertices, mean, p99 = run(window, make_frame(frames, background), counter)
+        print(f"{name:>10}: {calls:.1f} draw calls, {vertices:.0f} vertices a frame, "
+              f"{mean:.3f} ms/frame mean, {p99:.3f} ms p99")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+'''
+Entity Store Benchmark
+----------------------
+Moves a screen full of Levels bullets (random angles, culled when they leave
+the screen and topped back up) with one update() per bullet and with the NumPy
+entity store. Run from the repository root:
+
+    python benchmarks/bench_entity_store.py
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import SW, SH, TICK, EntityList
+from engine.entity_store import EntityStore
+from engine.levels import Bullet, Bullet_Speed
+
+COUNTS = [1000, 10000, 20000]
+TICKS = 30
+
+
+def spawn(rng, bullets, count):
+    while len(bullets) < count:
+        bullet = Bullet()
+        bullet.center_x = rng.uniform(0, SW)
+        bullet.center_y = rng.uniform(0, SH)
+        bullet.angle = rng.uniform(0, 360)
+        bullet.speed = Bullet_Speed
+        bullets.append(bullet)
+
+
+def run(count, arrays):
+    rng = random.Random(1)
+    bullets = EntityList()
+    if arrays:
+        EntityStore(bullets, Bullet)
+    spawn(rng, bullets, count)
+    total = 0
+    for tick in range(TICKS):
+        start = time.perf_counter()
+        bullets.update()
+        total += time.perf_counter() - start
+        spawn(rng, bullets, count)
+    return total * 1000 / TICKS
+
+
+def main():
+    print(f"{'bullets':>8} {'objects ms':>11} {'arrays ms':>10} {'speedup':>8}   (budget {TICK * 1000:.1f} ms)")
+    for count in COUNTS:
+        object_ms = run(count, False)
+        array_ms = run(count, True)
+        print(f"{count:>8} {object_ms:>11.2f} {array_ms:>10.2f} {object_ms / array_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
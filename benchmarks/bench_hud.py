@@ -0,0 +1,72 @@
+'''
+HUD Benchmark
+-------------
+Draws the Level/Score/Speed lines of the Fighter game for a few hundred frames
+with arcade.draw_text() and with a Hud, changing the score every tenth frame
+like a player firing steadily. Needs an OpenGL context; on a machine without a
+display run it headless:
+
+    ARCADE_HEADLESS=1 python benchmarks/bench_hud.py
+'''
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import arcade
+
+from engine.hud import Hud
+
+SW = 800
+SH = 600
+FRAMES = 600
+
+
+def draw_text_frame(frame):
+    arcade.draw_lrtb_rectangle_filled(SW - 95, SW, SH, SH - 55, arcade.color.WHITE)
+    arcade.draw_text(f"Level: {1}", SW - 90, SH - 15, arcade.color.BLACK, 14)
+    arcade.draw_text(f"Score: {frame // 10}", SW - 90, SH - 35, arcade.color.BLACK, 14)
+    arcade.draw_text(f"Speed: {2}", SW - 90, SH - 55, arcade.color.BLACK, 14)
+
+
+def make_hud_frame():
+    hud = Hud()
+    hud.add("level", "Level: 0", SW - 90, SH - 15, arcade.color.BLACK)
+    hud.add("score", "Score: 0", SW - 90, SH - 35, arcade.color.BLACK)
+    hud.add("speed", "Speed: 0", SW - 90, SH - 55, arcade.color.BLACK)
+
+    def hud_frame(frame):
+        arcade.draw_lrtb_rectangle_filled(SW - 95, SW, SH, SH - 55, arcade.color.WHITE)
+        hud.set("level", f"Level: {1}")
+        hud.set("score", f"Score: {frame // 10}")
+        hud.set("speed", f"Speed: {2}")
+        hud.draw()
+
+    return hud, hud_frame
+
+
+def run(window, draw_frame):
+    times = []
+    for frame in range(FRAMES):
+        start = time.perf_counter()
+        window.clear()
+        draw_frame(frame)
+        window.ctx.finish()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return sum(times) * 1000 / FRAMES, times[len(times) * 99 // 100] * 1000
+
+
+def main():
+    window = arcade.Window(SW, SH, "HUD Benchmark", visible=False)
+    hud, hud_frame = make_hud_frame()
+    for name, draw_frame in (("draw_text", draw_text_frame), ("Hud", hud_frame)):
+        mean, p99 = run(window, draw_frame)
+        print(f"{name:>10}: {mean:.3f} ms/frame mean, {p99:.3f} ms p99")
+    print(f"Hud laid out {hud.rebuilds()} lines in {FRAMES} frames")
+
+
+if __name__ == "__main__":
+    main()
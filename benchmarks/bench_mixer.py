@@ -0,0 +1,84 @@
+'''
+Mixer Benchmark
+---------------
+Plays a minute of Levels with SPACE hammered every step and the window drawing
+at 30 frames a second, so every frame carries two steps of sounds. Voices are
+fake ones that last as long as the real sounds roughly do (no audio device
+needed). Compares starting every sound as it comes with going through a Mixer.
+
+    python benchmarks/bench_mixer.py
+'''
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.levels import LevelsWorld
+from engine.mixer import Mixer
+from engine.timestep import FixedTimestep
+
+SECONDS = 60
+FPS = 30
+LENGTHS = {"laser": 0.4, "explosion": 1.2}     # seconds
+
+
+class Voice:
+    def __init__(self, clock, name):
+        self.clock = clock
+        self.end = clock.now + LENGTHS[name]
+        self.stopped = False
+
+    @property
+    def playing(self):
+        return not self.stopped and self.clock.now < self.end
+
+
+class Clock:
+    now = 0.0
+
+
+def run(use_mixer):
+    clock = Clock()
+    world = LevelsWorld(seed=1)
+    stepper = FixedTimestep(world)
+    voices = []
+
+    def play(name):
+        voices.append(Voice(clock, name))
+        return voices[-1]
+
+    def stop(voice):
+        voice.stopped = True
+
+    mixer = Mixer({name: name for name in LENGTHS}, play, stop, lambda voice: voice.playing)
+
+    peak = 0
+    inputs = [("press", "1")]
+    for frame in range(SECONDS * FPS):
+        clock.now = frame / FPS
+        inputs += [("press", "SPACE"), ("release", "SPACE")] * 2
+        sounds = stepper.advance(1 / FPS, inputs)
+        inputs = []
+        if use_mixer:
+            mixer.play(sounds)
+        else:
+            for name in sounds:
+                play(name)
+        peak = max(peak, sum(1 for voice in voices if voice.playing))
+    return len(voices), peak, mixer
+
+
+def main():
+    for name, use_mixer in (("direct", False), ("Mixer", True)):
+        started, peak, mixer = run(use_mixer)
+        line = f"{name:>7}: {started} voices started, at most {peak} at once"
+        if use_mixer:
+            stats = mixer.stats()
+            line += (f" ({stats['coalesced']} coalesced, {stats['stolen']} stolen, "
+                     f"{stats['max_latency_ms']:.3f} ms max per frame)")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+'''
+Network Benchmark
+-----------------
+Plays networked games over localhost: a server and two clients in one event
+loop, with bots pressing keys. Run from the repository root:
+
+    python benchmarks/bench_net.py
+
+- Both games on a bad network (latency, jitter and packet loss on everything
+  the server sends and receives): the bytes a client gets per tick, how far
+  off the predicted player was when the server's state came in, and that each
+  client's copy of the newest state is exactly the server's, and that it
+  keeps no more than HISTORY old states when some never arrive.
+- 500 entities in each game at 60 ticks a second: the bytes per tick, then the
+  ticks a second the server manages when it runs as fast as it can.
+'''
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.bb8_attack import BB8World
+from engine.core import TICK
+from engine.fighter import FighterWorld
+from engine.net import HISTORY, Client, Link, Server
+
+TICKS = 300
+CROWD = 500
+UDP_HEADERS = 28    # IPv4 and UDP, on top of each packet
+BAD_NETWORK = {"latency": 0.040, "jitter": 0.010, "loss": 0.05}
+BOT_KEYS = {BB8World: ["LEFT", "RIGHT", "SPACE"], FighterWorld: ["A", "D", "W", "S", "SPACE"]}
+START_KEYS = {BB8World: [], FighterWorld: ["1"]}
+
+
+class CrowdedSky(FighterWorld):
+    '''A fighter level that always has CROWD planes in it and starts again when both players are down.'''
+
+    def update(self, frames=1):
+        if self.current_state == 4:
+            self.current_state = 1
+            self.setup()
+        if self.game_running:
+            while len(self.enemy_plane_list) < CROWD:
+                self.spawn_plane(self.rng.choice(["top", "bottom", "left", "right"]))
+        super().update(frames)
+
+
+def crowded_bb8(seed):
+    world = BB8World(seed=seed, players=2)
+    world.trooper_count = CROWD
+    world.reset()
+    return world
+
+
+def bot(world_class, rng):
+    held = set()
+    while True:
+        inputs = []
+        if rng.random() < 0.1:
+            key = rng.choice(BOT_KEYS[world_class])
+            if key in held:
+                held.discard(key)
+                inputs.append(("release", key))
+            else:
+                held.add(key)
+                inputs.append(("press", key))
+        yield inputs
+
+
+async def session(world, ticks, period=TICK, link=None):
+    loop = asyncio.get_running_loop()
+    server = Server(world, link)
+    transport, _ = await loop.create_datagram_endpoint(lambda: server, local_addr=("127.0.0.1", 0))
+    port = transport.get_extra_info("sockname")[1]
+    clients = []
+    for n in range(2):
+        _, client = await loop.create_datagram_endpoint(lambda: Client(net_class(world)),
+                                                        remote_addr=("127.0.0.1", port))
+        await client.join()
+        clients.append(client)
+    running = asyncio.ensure_future(server.run(ticks, period))
+
+    async def play(client, seed):
+        world_class = net_class(world)
+        keys = bot(world_class, random.Random(seed))
+        client.step(TICK, [("press", key) for key in START_KEYS[world_class]])
+        while not running.done():
+            client.step(TICK, next(keys))
+            await asyncio.sleep(period)
+
+    await asyncio.gather(running, *(play(client, n) for n, client in enumerate(clients)))
+    # let the last states arrive
+    await asyncio.sleep(0.2)
+    for client in clients:
+        client.step(TICK)
+    transport.close()
+    return server, clients
+
+
+def net_class(world):
+    # the game a world plays, what the clients are made for
+    return FighterWorld if isinstance(world, FighterWorld) else BB8World
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, len(values) * p // 100)] if values else 0.0
+
+
+def report(name, server, clients):
+    for n, client in enumerate(clients):
+        peer = next(peer for peer in server.clients.values() if peer.player == client.player)
+        same = client.states[client.server_tick] == server.history[client.server_tick]
+        print(f"{name} client {n}: {peer.sent_bytes / peer.states:6.1f} bytes/tick "
+              f"(+{UDP_HEADERS} headers, largest {peer.largest}), "
+              f"{len(client.states[client.server_tick])} entities, prediction off "
+              f"p50 {percentile(client.corrections, 50):.2f} p99 {percentile(client.corrections, 99):.2f} px, "
+              f"newest state {'matches' if same else 'DIFFERS'}, {len(client.states)} states kept")
+        assert same
+        # lost states must not stay in the history
+        assert len(client.states) <= HISTORY
+
+
+async def main():
+    for world in (BB8World(seed=1, players=2), FighterWorld(seed=1, players=2)):
+        link = Link(seed=2, **BAD_NETWORK)
+        server, clients = await session(world, TICKS, link=link)
+        lost = link.lost / (link.sent + link.lost + sum(client.link.sent for client in clients))
+        report(f"{type(world).__name__} 40 ms, 5% loss", server, clients)
+        print(f"    {link.lost} packets lost ({lost:.1%} of all)")
+
+    for crowded in (crowded_bb8, lambda seed: CrowdedSky(seed=seed, players=2)):
+        world = crowded(1)
+        server, clients = await session(world, TICKS)
+        report(f"{net_class(world).__name__} {CROWD} entities", server, clients)
+
+        server, clients = await session(crowded(1), TICKS, period=0)
+        print(f"    as fast as it goes: {server.ticks / (server.step_seconds + server.send_seconds):.0f} ticks/s "
+              f"(step {server.step_seconds / server.ticks * 1000:.2f} ms, "
+              f"states {server.send_seconds / server.ticks * 1000:.2f} ms a tick)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
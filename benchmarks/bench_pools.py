@@ -0,0 +1,63 @@
+'''
+Pool Benchmark
+--------------
+Sustained fire: every tick a burst of Levels bullets is fired from the middle
+of the screen and flies off the edge about a second later. Compares making a
+new Bullet per shot with taking it from a Pool. Run from the repository root:
+
+    python benchmarks/bench_pools.py
+'''
+
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import SW, SH, EntityList
+from engine.levels import Bullet, Bullet_Speed
+from engine.pools import Pool
+
+TICKS = 600
+SHOTS_PER_TICK = [1, 10, 50]
+
+
+def run(shots, pooled):
+    pool = Pool(Bullet)
+    bullets = EntityList()
+    made = 0
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        for i in range(shots):
+            if pooled:
+                bullet = pool.acquire()
+            else:
+                bullet = Bullet()
+                made += 1
+            bullet.center_x = SW / 2
+            bullet.center_y = SH / 2
+            bullet.angle = (tick * 7 + i * 360 / shots) % 360
+            bullet.speed = Bullet_Speed
+            bullets.append(bullet)
+        bullets.update()
+    seconds = time.perf_counter() - start
+    collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+    if pooled:
+        made = pool.created
+    return made, seconds, collections
+
+
+def main():
+    print(f"{'shots/tick':>10} {'':>7} {'allocs':>7} {'allocs/s':>10} {'ms/tick':>8} {'gc runs':>8}")
+    for shots in SHOTS_PER_TICK:
+        for pooled in (False, True):
+            made, seconds, collections = run(shots, pooled)
+            name = "pool" if pooled else "new"
+            print(f"{shots:>10} {name:>7} {made:>7} {made / seconds:>10.0f} "
+                  f"{seconds * 1000 / TICKS:>8.3f} {collections:>8}")
+
+
+if __name__ == "__main__":
+    main()
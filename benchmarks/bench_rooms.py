@@ -0,0 +1,104 @@
+'''
+Escape Room Benchmark
+---------------------
+Writes a corridor of rooms with 1,000 clickable objects each to a temporary
+directory and walks through it. Reports:
+
+- how long entering a room takes (reading the next room's file and gridding it),
+- how many rooms are loaded at once,
+- the time to find the object under a click with the room's grid and by looking
+  at every object, which must find the same object.
+
+Run from the repository root:
+
+    python benchmarks/bench_rooms.py
+'''
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import SW, SH
+from engine.escape_room import EscapeWorld
+
+ROOMS = 30
+OBJECTS = 1000
+CLICKS = 20000
+
+
+def write_rooms(rooms_dir, rng):
+    for i in range(ROOMS):
+        objects = []
+        for j in range(OBJECTS):
+            objects.append({"id": f"thing{j}", "x": rng.uniform(0, SW), "y": rng.uniform(0, SH),
+                            "width": rng.uniform(10, 60), "height": rng.uniform(10, 60),
+                            "image": "Images/wall.png", "message": f"thing {j}"})
+        # doors back and forth along the corridor
+        if i > 0:
+            objects.append({"id": "back", "x": 20, "y": SH / 2, "width": 40, "height": SH, "goes": f"room{i - 1}"})
+        if i < ROOMS - 1:
+            objects.append({"id": "next", "x": SW - 20, "y": SH / 2, "width": 40, "height": SH, "goes": f"room{i + 1}"})
+        with open(os.path.join(rooms_dir, f"room{i}.json"), "w") as f:
+            json.dump({"background": "Images/sky1.png", "objects": objects}, f)
+
+
+def scan(world, x, y):
+    # what a click did without the grid: look at every object, the top one first
+    for obj in reversed(world.objects):
+        if obj.contains(x, y) and world.visible(obj):
+            return obj
+    return None
+
+
+def percentiles(times):
+    times = sorted(times)
+    return times[len(times) // 2] * 1e6, times[len(times) * 99 // 100] * 1e6
+
+
+def main():
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as rooms_dir:
+        write_rooms(rooms_dir, rng)
+
+        start = time.perf_counter()
+        world = EscapeWorld(seed=1, rooms_dir=rooms_dir, start="room0")
+        first = time.perf_counter() - start
+
+        enters = []
+        most_loaded = len(world.rooms)
+        for i in range(1, ROOMS):
+            start = time.perf_counter()
+            world.on_mouse_press(SW - 20, SH / 2)
+            enters.append(time.perf_counter() - start)
+            most_loaded = max(most_loaded, len(world.rooms))
+        assert world.room_name == f"room{ROOMS - 1}"
+
+        clicks = [(rng.uniform(0, SW), rng.uniform(0, SH)) for i in range(CLICKS)]
+        grid = []
+        every = []
+        for x, y in clicks:
+            start = time.perf_counter()
+            found = world.object_at(x, y)
+            grid.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            scanned = scan(world, x, y)
+            every.append(time.perf_counter() - start)
+            assert found is scanned
+
+    print(f"{ROOMS} rooms of {OBJECTS} objects, at most {most_loaded} loaded at once, "
+          f"{world.room_loads} room files read")
+    print(f"first room and its neighbour {first * 1000:.1f} ms, entering a room p50 "
+          f"{percentiles(enters)[0] / 1000:.1f} ms, max {max(enters) * 1000:.1f} ms")
+    print(f"{'click':<8} {'p50 us':>8} {'p99 us':>8}")
+    for name, times in (("grid", grid), ("scan", every)):
+        p50, p99 = percentiles(times)
+        print(f"{name:<8} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+'''
+High Score Benchmark
+--------------------
+Fills a score log with a million games (three games, three levels, a thousand
+players) and measures what the game-over screen needs from a ScoreStore:
+opening the file, adding a score and getting its rank, the top 10, and
+writing a batch. Then cuts the file off in the middle of a batch, the way a
+crash would leave it, and opens it again, once while another session is
+still writing that batch (it must be left alone) and once after. Last, two
+sessions on one file where one writes between the other's refresh() and
+write, which must not count anything twice, and a batch going out on its
+timer. Run from the repository root:
+
+    python benchmarks/bench_scores.py
+'''
+
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.scores import ALL, BATCH, BATCH_SIZE, ENTRY, FLUSH_SECONDS, ScoreStore, fcntl
+
+ENTRIES = 1000000
+GAMES = ["bb8", "fighter", "levels"]
+RUNS = 1000
+
+
+def fill(path, rng):
+    # written the way ScoreStore.flush() writes, a batch at a time
+    start = time.time() - ENTRIES
+    with open(path, "wb") as f:
+        for first in range(0, ENTRIES, BATCH_SIZE):
+            entries = b"".join(ENTRY.pack(start + i, rng.choice(GAMES).encode(), rng.randint(1, 3),
+                                          int(rng.expovariate(1 / 200)), f"player{rng.randrange(1000)}".encode())
+                               for i in range(first, min(first + BATCH_SIZE, ENTRIES)))
+            f.write(BATCH.pack(len(entries) // ENTRY.size, zlib.crc32(entries)) + entries)
+
+
+def timed_us(run):
+    times = []
+    for i in range(RUNS):
+        start = time.perf_counter()
+        run(i)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return times[len(times) // 2] * 1e6, times[len(times) * 99 // 100] * 1e6
+
+
+def main():
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "scores.log")
+        fill(path, rng)
+        print(f"{ENTRIES} entries, {os.path.getsize(path) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        store = ScoreStore(path)
+        print(f"open and index   {(time.perf_counter() - start) * 1000:8.1f} ms")
+        assert sum(store.count(game) for game in GAMES) == ENTRIES
+
+        # one finished game at a time, as the game-over screen does (batched to disk)
+        p50, p99 = timed_us(lambda i: store.add("fighter", 2, rng.randrange(1000), "bench"))
+        print(f"add and rank     p50 {p50:7.1f} us  p99 {p99:7.1f} us")
+        p50, p99 = timed_us(lambda i: store.top("fighter", ALL, 10))
+        print(f"top 10           p50 {p50:7.1f} us  p99 {p99:7.1f} us")
+        p50, p99 = timed_us(lambda i: store.rank("levels", 3, i))
+        print(f"rank of a score  p50 {p50:7.1f} us  p99 {p99:7.1f} us")
+        for i in range(BATCH_SIZE - 1):
+            store.add("bb8", 1, i, "bench")
+        start = time.perf_counter()
+        store.add("bb8", 1, 0, "bench")     # fills the batch, which is written
+        print(f"write a batch    {(time.perf_counter() - start) * 1000:8.2f} ms ({BATCH_SIZE} entries and fsync)")
+        store.close()
+
+        # a crash in the middle of writing the last batch
+        size = os.path.getsize(path)
+        with open(path, "ab") as f:
+            f.write(BATCH.pack(BATCH_SIZE, 0) + b"\0" * (ENTRY.size * 10))
+        if fcntl is not None:
+            # while the session writing it still has the file locked, the batch is on its way
+            writer = os.open(path, os.O_RDONLY)
+            fcntl.flock(writer, fcntl.LOCK_SH)
+            store = ScoreStore(path)
+            assert store.recovered == 0 and os.path.getsize(path) > size
+            store.close()
+            os.close(writer)
+        start = time.perf_counter()
+        store = ScoreStore(path)
+        print(f"open after crash {(time.perf_counter() - start) * 1000:8.1f} ms, "
+              f"cut off {store.recovered} bytes")
+        assert os.path.getsize(path) == size
+        store.close()
+
+        two_sessions(os.path.join(folder, "shared.log"))
+        timed_flush(os.path.join(folder, "timed.log"))
+
+
+def two_sessions(path):
+    first = ScoreStore(path)
+    second = ScoreStore(path)
+    first.add("bb8", 1, 10, "a")
+    second.add("bb8", 1, 5, "b")
+
+    # the second session writes its batch right after the first one looked at the file
+    refresh = first.refresh
+
+    def refresh_then_second_writes(repair=False):
+        cut = refresh(repair)
+        second.flush()
+        return cut
+
+    first.refresh = refresh_then_second_writes
+    first.flush()
+    del first.refresh
+
+    first.refresh()
+    second.refresh()
+    fresh = ScoreStore(path)
+    counts = [store.count("bb8", 1) for store in (first, second, fresh)]
+    print(f"two sessions     {counts} entries in each store")
+    assert counts == [2, 2, 2]
+    assert first.top("bb8", 1) == fresh.top("bb8", 1)
+    for store in (first, second, fresh):
+        store.close()
+
+
+def timed_flush(path):
+    store = ScoreStore(path)
+    store.add("bb8", 1, 10, "a")
+    store.flush_if_due(store.pending_since + FLUSH_SECONDS - 1)
+    waited = os.path.getsize(path)
+    store.flush_if_due(store.pending_since + FLUSH_SECONDS)
+    print(f"timed flush      {waited} bytes before {FLUSH_SECONDS} s, {os.path.getsize(path)} after")
+    assert waited == 0 and os.path.getsize(path) == BATCH.size + ENTRY.size
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+'''
+Collision Shapes Benchmark
+--------------------------
+Puts pairs of sprites from Levels (bullets, troopers, BB8) at random places and
+angles near each other and tests them with every combination of shapes. The
+polygon outline of the images (what arcade's hit boxes in the chapter scripts
+test) is taken as the truth, aabb/aabb is what the engine did before shapes.
+For each combination it reports how often it agrees, how many hits it makes up
+(false) or misses, and how long one test takes. Run from the repository root:
+
+    python benchmarks/bench_shapes.py
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import check_for_collision
+from engine.levels import Bullet, EnemyBullet, Player, Trooper
+
+PAIRS = [(Bullet, Trooper), (Bullet, Player), (EnemyBullet, Player), (Trooper, Player)]
+SHAPES = ["aabb", "circle", "polygon"]
+PLACEMENTS = 20000
+
+
+def make(cls, rng):
+    # troopers and enemy bullets pick a direction when they are made
+    return cls(rng) if cls in (Trooper, EnemyBullet) else cls()
+
+
+def placements(first, second, rng):
+    # close enough that the boxes overlap about half the time
+    a = make(first, rng)
+    b = make(second, rng)
+    reach = (max(a.width, a.height) + max(b.width, b.height)) / 2
+    pairs = []
+    for i in range(PLACEMENTS):
+        a = make(first, rng)
+        b = make(second, rng)
+        a.center_x = a.center_y = 0.0
+        a.angle = rng.uniform(0, 360)
+        b.angle = rng.uniform(0, 360)
+        b.center_x = rng.uniform(-reach, reach)
+        b.center_y = rng.uniform(-reach, reach)
+        pairs.append((a, b))
+    return pairs
+
+
+def test(pairs, shape_a, shape_b):
+    for a, b in pairs:
+        a.shape = shape_a
+        b.shape = shape_b
+    start = time.perf_counter()
+    hits = [check_for_collision(a, b) for a, b in pairs]
+    return hits, (time.perf_counter() - start) / len(pairs)
+
+
+def main():
+    rng = random.Random(1)
+    for first, second in PAIRS:
+        pairs = placements(first, second, rng)
+        test(pairs, "polygon", "polygon")      # outlines read and turned once, like in a game
+        truth, _ = test(pairs, "polygon", "polygon")
+        print(f"\n{first.__name__} ({first.image}) vs {second.__name__} ({second.image}), "
+              f"{sum(truth)} hits in {len(pairs)}")
+        print(f"{'shapes':<18} {'agree':>7} {'false':>7} {'missed':>7} {'us/test':>8}")
+        for shape_a in SHAPES:
+            for shape_b in SHAPES:
+                hits, seconds = test(pairs, shape_a, shape_b)
+                false = sum(1 for hit, real in zip(hits, truth) if hit and not real)
+                missed = sum(1 for hit, real in zip(hits, truth) if real and not hit)
+                agree = 1 - (false + missed) / len(pairs)
+                print(f"{shape_a + '/' + shape_b:<18} {agree:>7.1%} {false:>7} {missed:>7} {seconds * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
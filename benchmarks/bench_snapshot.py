@@ -0,0 +1,111 @@
+'''
+Snapshot Benchmark
+------------------
+Gives an Escape Room session a lot of progress (100 items, 500 flags, 100 used
+objects in each of 50 rooms) and measures:
+
+- the size of a whole snapshot, next to the same state as JSON,
+- how long dumps() and a restore (the R key) take,
+- what an autosave costs the frame it is called from, next to appending the
+  same sections to the file right there, and how big the file gets.
+
+Run from the repository root:
+
+    python benchmarks/bench_snapshot.py
+'''
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import snapshot
+from engine.core import TICK
+from engine.escape_room import EscapeWorld
+
+RUNS = 200
+SAVES = 2000
+
+
+def busy_world():
+    world = EscapeWorld(seed=1)
+    world.inventory = [f"item{i}" for i in range(100)]
+    world.flags = {f"puzzle{i}_solved" for i in range(500)}
+    world.used = {f"room{r}": {f"thing{i}" for i in range(100)} for r in range(50)}
+    world.message = "BB8 beeps and drops a keycard."
+    return world
+
+
+def best_us(run):
+    times = []
+    for i in range(RUNS):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1e6
+
+
+def click(world, i):
+    # what one click changes: the message and the objects used up in a room
+    world.message = f"click {i}"
+    world.used[f"room{i % 50}"].add(f"extra{i}")
+    world.dirty |= {"world", f"used/room{i % 50}"}
+
+
+def main():
+    world = busy_world()
+    data = snapshot.dumps(world)
+    as_json = json.dumps({"room": world.room_name, "message": world.message, "score": world.score,
+                          "escaped": world.escaped, "inventory": world.inventory,
+                          "flags": sorted(world.flags),
+                          "used": {room: sorted(ids) for room, ids in world.used.items()}})
+    print(f"snapshot {len(data)} bytes (JSON {len(as_json)} bytes)")
+    print(f"dumps    {best_us(lambda: snapshot.dumps(world)):8.1f} us")
+    print(f"restore  {best_us(lambda: snapshot.loads(world, data)):8.1f} us")
+    world.step(TICK, [("press", "R")])
+    assert world.message == "You start this room over."
+
+    with tempfile.TemporaryDirectory() as folder:
+        # appending in the frame, the way it would be done without the thread
+        path = os.path.join(folder, "direct.sav")
+        with open(path, "wb") as f:
+            f.write(data)
+        direct = []
+        for i in range(SAVES):
+            click(world, i)
+            start = time.perf_counter()
+            sections = world.sections(world.dirty)
+            world.dirty = set()
+            with open(path, "ab") as f:
+                f.write(snapshot.pack_records(sections))
+                f.flush()
+                os.fsync(f.fileno())
+            direct.append(time.perf_counter() - start)
+
+        saver = snapshot.AutoSaver(os.path.join(folder, "auto.sav"))
+        world.dirty = set(world.sections())
+        saver.save(world)
+        threaded = []
+        for i in range(SAVES):
+            click(world, i)
+            start = time.perf_counter()
+            saver.save(world)
+            threaded.append(time.perf_counter() - start)
+        saver.flush()
+        size = os.path.getsize(saver.path)
+        stats = saver.stats()
+        saver.close()
+        assert snapshot.load(saver.path) == world.sections()
+
+    for name, times in (("in frame", direct), ("autosave", threaded)):
+        times.sort()
+        print(f"{name}  p50 {times[len(times) // 2] * 1e6:7.1f} us  p99 {times[len(times) * 99 // 100] * 1e6:7.1f} us"
+              f"  max {times[-1] * 1e6:8.1f} us")
+    print(f"{SAVES} autosaves: file {size} bytes, rewritten {stats['rewrites']} times")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+'''
+Startup Benchmark
+-----------------
+How long a window takes to draw its first frame when the 50 explosion frames
+are decoded one after another before the window opens, against handing them to
+a Prefetcher and drawing a loading bar while they come in, and against cutting
+them out of the prebuilt atlas cache (engine.atlas). Each run is its own
+process so the asset cache starts out empty. Needs an
+OpenGL context; on a machine without a display run it headless:
+
+    ARCADE_HEADLESS=1 python benchmarks/bench_startup.py
+'''
+
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RUNS = 5
+PATHS = [f"Images/explosions/explosion{i:04}.png" for i in range(50)]
+
+
+def child(mode):
+    start = time.perf_counter()
+    os.chdir(ROOT)
+    import arcade
+
+    from engine import atlas
+    from engine.assets import assets
+    from engine.loader import LoadingList, Prefetcher
+    from engine.render import draw_loading_bar, load_frames
+
+    window = arcade.Window(800, 600, "Startup Benchmark", visible=False)
+    opened = time.perf_counter()
+    if mode == "serial":
+        for path in PATHS:
+            assets.texture(path)
+        loading = None
+    elif mode == "parallel":
+        loading = LoadingList(Prefetcher(), "texture", PATHS)
+    else:
+        loading = load_frames(Prefetcher(), PATHS, atlas.EXPLOSION_CACHE)
+
+    frames = 0
+    first_frame = None
+    while True:
+        window.clear()
+        if loading is not None:
+            loading.poll()
+            draw_loading_bar(loading.progress())
+        window.ctx.finish()
+        frames += 1
+        if first_frame is None:
+            first_frame = time.perf_counter() - start
+        if loading is None or loading.done():
+            break
+    all_loaded = time.perf_counter() - start
+    print(first_frame, all_loaded, all_loaded - (opened - start), frames)
+
+
+def measure(mode):
+    out = subprocess.run([sys.executable, __file__, mode], capture_output=True, text=True, check=True)
+    first_frame, all_loaded, assets, frames = out.stdout.split()[-4:]
+    return float(first_frame), float(all_loaded), float(assets), int(frames)
+
+
+def main():
+    from engine import atlas
+    if atlas.read(atlas.EXPLOSION_CACHE, PATHS) is None:
+        atlas.build(PATHS, atlas.EXPLOSION_CACHE)
+    for mode in ("serial", "parallel", "atlas"):
+        runs = sorted(measure(mode) for _ in range(RUNS))
+        first_frame, all_loaded, assets, frames = runs[len(runs) // 2]
+        print(f"{mode:>8}: first frame {first_frame * 1000:.0f} ms, all loaded {all_loaded * 1000:.0f} ms "
+              f"({assets * 1000:.0f} ms after the window opened), {frames} frames drawn while loading "
+              f"(median of {RUNS})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        child(sys.argv[1])
+    else:
+        main()
@@ -0,0 +1,246 @@
+'''
+Benchmark Suite
+---------------
+Drives the worlds of BB8 Attack, the Sprite Game and Levels through scripted
+stress scenarios without a window and reports for each one:
+
+- ticks per second and the p50 / p99 / max time of one tick,
+- how much of each tick went to collisions (the spatial hash),
+- the peak memory of the process,
+- the state hash at the end, which should only change when the game does.
+
+Each scenario runs in its own process so the memory numbers don't add up.
+Run from the repository root, optionally saving the results and comparing them
+with an earlier run:
+
+    python benchmarks/bench_suite.py --json after.json --compare before.json
+    python benchmarks/bench_suite.py bb8_1000_troopers_fire --arrays
+'''
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import SW, SH, TICK
+from engine.replay import state_hash
+from engine.spatial import SpatialHash
+
+SEED = 1
+SCENARIOS = {}
+
+
+def scenario(name, ticks):
+    '''Register make(arrays) -> (world, drive); drive(tick) returns the inputs of that tick.'''
+    def register(make):
+        SCENARIOS[name] = (make, ticks)
+        return make
+    return register
+
+
+# -------Scenarios---------
+@scenario("bb8_40_troopers_idle", 1800)
+def bb8_idle(arrays):
+    from engine.bb8_attack import BB8World
+    world = BB8World(SEED, arrays)
+    return world, lambda tick: []
+
+
+@scenario("bb8_1000_troopers_fire", 1800)
+def bb8_fire(arrays):
+    from engine.bb8_attack import BB8World
+    world = BB8World(SEED, arrays)
+    world.trooper_count = 1000
+    world.reset()
+
+    def drive(tick):
+        world.gameover = False      # BB8 can't lose, the shooting goes on
+        inputs = [("press", "SPACE")] if tick % 4 == 0 else []
+        if tick % 60 == 0:
+            inputs.append(("release", "LEFT"))
+            inputs.append(("press", "LEFT" if tick % 120 else "RIGHT"))
+        return inputs
+    return world, drive
+
+
+@scenario("levels_10000_bullets", 600)
+def levels_bullets(arrays):
+    from engine.levels import Bullet_Speed, LevelsWorld
+    world = LevelsWorld(SEED, arrays)
+    world.step(TICK, [("press", "1")])
+    rng = world.rng
+
+    def drive(tick):
+        if not world.game_running:
+            return [("press", "1")]
+        # fill up to 10,000 bullets flying out from the middle in every direction
+        for i in range(10000 - len(world.bullet_list)):
+            bullet = world.bullet_pool.acquire()
+            bullet.center_x = SW / 2
+            bullet.center_y = SH / 2
+            bullet.angle = rng.uniform(0, 360)
+            bullet.speed = Bullet_Speed * rng.uniform(0.2, 1)
+            world.bullet_list.append(bullet)
+        return []
+    return world, drive
+
+
+@scenario("levels_rapid_transitions", 1800)
+def levels_transitions(arrays):
+    from engine.levels import LevelsWorld
+    world = LevelsWorld(SEED, arrays)
+
+    def drive(tick):
+        if not world.game_running:
+            return [("press", "1")]
+        if tick % 30 == 0:
+            # clearing a level moves on to the next one in the following tick
+            for trooper in world.trooper_list[:]:
+                trooper.kill()
+        return [("press", "SPACE")] if tick % 5 == 0 else []
+    return world, drive
+
+
+@scenario("fighter_constant_fire", 1800)
+def fighter_fire(arrays):
+    from engine.fighter import FighterWorld
+    world = FighterWorld(SEED, arrays)
+
+    def drive(tick):
+        if not world.game_running:
+            return [("press", "3")]
+        inputs = [("press", "SPACE")] if tick % 3 == 0 else []
+        if tick % 90 == 0:
+            inputs.append(("press", "A"))
+        return inputs
+    return world, drive
+
+
+@scenario("fighter_waves_5000", 1800)
+def fighter_waves(arrays):
+    from engine import fighter
+    from engine.waves import Wave
+    # a level of 5,000 planes, 50 a second from all four edges
+    fighter.LEVEL_WAVES[1] = [Wave(5000, interval=0.02)]
+    world = fighter.FighterWorld(SEED, arrays)
+
+    def drive(tick):
+        if tick == 0:
+            return [("press", "1")]
+        world.current_state = 1     # the fighter can't lose, the waves go on
+        inputs = [("press", "SPACE")] if tick % 3 == 0 else []
+        if tick % 90 == 0:
+            inputs.append(("press", "A"))
+        return inputs
+    return world, drive
+
+
+# -------Measuring---------
+def timed_hash():
+    '''Make the spatial hash add up the time spent in it.'''
+    spent = [0.0]
+    depth = [0]     # check_for_sweep() calls check_for_collision(), count it once
+
+    def wrap(method):
+        def timed(*args, **kwargs):
+            depth[0] += 1
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            depth[0] -= 1
+            if depth[0] == 0:
+                spent[0] += time.perf_counter() - start
+            return result
+        return timed
+
+    SpatialHash.build = wrap(SpatialHash.build)
+    SpatialHash.check_for_collision = wrap(SpatialHash.check_for_collision)
+    SpatialHash.check_for_sweep = wrap(SpatialHash.check_for_sweep)
+    return spent
+
+
+def run(name, arrays):
+    make, ticks = SCENARIOS[name]
+    world, drive = make(arrays)
+    collisions = timed_hash()
+    times = []
+    for tick in range(ticks):
+        inputs = drive(tick)
+        start = time.perf_counter()
+        world.step(TICK, inputs)
+        times.append(time.perf_counter() - start)
+
+    total = sum(times)
+    times.sort()
+    return {"ticks": ticks,
+            "ticks_per_sec": round(ticks / total, 1),
+            "p50_ms": round(times[len(times) // 2] * 1000, 4),
+            "p99_ms": round(times[len(times) * 99 // 100] * 1000, 4),
+            "max_ms": round(times[-1] * 1000, 4),
+            "collision_ms": round(collisions[0] * 1000 / ticks, 4),
+            "collision_share": round(collisions[0] / total, 3),
+            "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "arrays": world.arrays,
+            "state_hash": state_hash(world)}
+
+
+def measure(name, arrays):
+    command = [sys.executable, os.path.abspath(__file__), "--child", name]
+    if arrays:
+        command.append("--arrays")
+    out = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless stress scenarios for the games.")
+    parser.add_argument("scenarios", nargs="*", help=f"which to run (default all: {', '.join(SCENARIOS)})")
+    parser.add_argument("--arrays", action="store_true", help="move entities with EntityStore (NumPy)")
+    parser.add_argument("--json", help="save the results to this file")
+    parser.add_argument("--compare", help="show the change against results saved earlier")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run(args.child, args.arrays)))
+        return
+
+    base = {}
+    if args.compare:
+        with open(args.compare) as f:
+            base = json.load(f)["scenarios"]
+
+    results = {}
+    print(f"{'scenario':<26} {'ticks/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'coll ms':>8} {'MB':>6}")
+    for name in args.scenarios or SCENARIOS:
+        r = results[name] = measure(name, args.arrays)
+        line = (f"{name:<26} {r['ticks_per_sec']:>9.0f} {r['p50_ms']:>8.3f} {r['p99_ms']:>8.3f} "
+                f"{r['max_ms']:>8.3f} {r['collision_ms']:>8.3f} {r['peak_rss_mb']:>6.1f}")
+        if name in base:
+            change = r["ticks_per_sec"] / base[name]["ticks_per_sec"] - 1
+            line += f"   {change:+.1%} ticks/s"
+            if r["state_hash"] != base[name]["state_hash"]:
+                line += ", state differs"
+        print(line)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"commit": commit(), "python": sys.version.split()[0], "scenarios": results},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
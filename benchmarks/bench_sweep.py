@@ -0,0 +1,81 @@
+'''
+Swept Collision Benchmark
+-------------------------
+Fires the fighter's bullets (20 pixels a frame) out of the middle of a screen
+full of enemy planes, moving everything 1, 2, 4 or 8 frames per tick (60 down to
+7.5 ticks a second). Counts the planes hit when collisions only look at where a
+bullet is (check_for_collision) and when they sweep its path (check_for_sweep),
+and how long the checks take per tick. Swept hits should stay the same at every
+tick rate. Run from the repository root:
+
+    python benchmarks/bench_sweep.py
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.core import SW, SH, EntityList
+from engine.fighter import BULLET_SPEED, Bullet, EnemyPlane
+from engine.spatial import SpatialHash
+
+PLANES = 300
+BULLETS = 200
+FRAMES = [1, 2, 4, 8]
+MARGIN = BULLET_SPEED * FRAMES[-1]
+
+
+def make(rng):
+    planes = EntityList()
+    for i in range(PLANES):
+        plane = EnemyPlane()
+        plane.speed = 0     # standing still, so every tick rate faces the same planes
+        # away from the edges, bullets are gone once they move off the screen
+        plane.center_x = rng.uniform(MARGIN, SW - MARGIN)
+        plane.center_y = rng.uniform(MARGIN, SH - MARGIN)
+        planes.append(plane)
+    bullets = EntityList()
+    for i in range(BULLETS):
+        bullet = Bullet()
+        bullet.center_x = SW / 2
+        bullet.center_y = SH / 2
+        bullet.angle = rng.uniform(0, 360)
+        bullet.speed = BULLET_SPEED
+        bullets.append(bullet)
+    return planes, bullets
+
+
+def play(frames, swept):
+    planes, bullets = make(random.Random(1))
+    spatial = SpatialHash()
+    hit = set()
+    spent = 0.0
+    ticks = 0
+    while len(bullets):
+        bullets.update(frames)
+        start = time.perf_counter()
+        spatial.build(planes, frames)
+        for bullet in bullets:
+            if swept:
+                hit_list = spatial.check_for_sweep(bullet, frames, through=True)
+            else:
+                hit_list = spatial.check_for_collision(bullet)
+            hit.update(hit_list)
+        spent += time.perf_counter() - start
+        ticks += 1
+    return len(hit), spent * 1000 / ticks
+
+
+def main():
+    print(f"{'frames/tick':>11} {'hit (box)':>10} {'ms/tick':>8} {'hit (swept)':>12} {'ms/tick':>8}")
+    for frames in FRAMES:
+        hits, ms = play(frames, False)
+        swept_hits, swept_ms = play(frames, True)
+        print(f"{frames:>11} {hits:>10} {ms:>8.3f} {swept_hits:>12} {swept_ms:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+'''
+Headless game engine for the chapter 15-21 games.
+
+The worlds in this package hold all of the game rules and can run without an
+arcade window; engine.render is the only module that imports arcade.
+'''
+
+from engine.core import SW, SH, TICK, Entity, EntityList, Explosion, World
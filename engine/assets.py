@@ -0,0 +1,123 @@
+'''
+Asset Cache
+-----------
+One place that loads textures, sounds and collision outlines, so each file is
+read and decoded once per process no matter how many sprites or windows ask
+for it.
+
+The cache itself does not know how to load anything; engine.render registers
+the arcade loaders and engine.shapes the outlines. Assets are kept until the cache goes over its memory budget,
+then the least recently used ones are dropped (pinned assets are never dropped).
+'''
+
+import os
+from collections import OrderedDict
+
+from engine import core
+
+BUDGET = 64 * 1024 * 1024   # bytes
+
+
+def file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def texture_size(path):
+    # decoded RGBA pixels
+    w, h = core.image_size(path)
+    return w * h * 4
+
+
+class AssetCache:
+    def __init__(self, budget=BUDGET):
+        self.budget = budget
+        self.loaders = {}
+        self.entries = OrderedDict()    # (kind, path) -> (asset, size), oldest first
+        self.pinned = set()
+        self.used = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def register(self, kind, loader, sizer=file_size):
+        '''loader(path) makes the asset, sizer(path) guesses how many bytes it takes.'''
+        self.loaders[kind] = (loader, sizer)
+
+    def get(self, kind, path):
+        key = (kind, path)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        asset = self.load(kind, path)
+        self.put(kind, path, asset)
+        return asset
+
+    def load(self, kind, path):
+        '''Load an asset without touching the cache, safe to call from another thread.'''
+        return self.loaders[kind][0](path)
+
+    def put(self, kind, path, asset):
+        key = (kind, path)
+        if key in self.entries:
+            self.used -= self.entries[key][1]
+        size = self.loaders[kind][1](path)
+        self.entries[key] = (asset, size)
+        self.used += size
+        self.evict(keep=key)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def texture(self, path):
+        return self.get("texture", path)
+
+    def sound(self, path):
+        return self.get("sound", path)
+
+    def hull(self, path):
+        return self.get("hull", path)
+
+    def preload(self, kind, paths, pin=True):
+        for path in paths:
+            self.get(kind, path)
+            if pin:
+                self.pinned.add((kind, path))
+
+    def drop(self, kind, path):
+        '''Forget an asset that won't be needed for a while, pinned or not.'''
+        key = (kind, path)
+        self.pinned.discard(key)
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.used -= entry[1]
+
+    def evict(self, keep=None):
+        for key in list(self.entries):
+            if self.used <= self.budget:
+                break
+            if key == keep or key in self.pinned:
+                continue
+            asset, size = self.entries.pop(key)
+            self.used -= size
+            self.evictions += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "used": self.used, "budget": self.budget}
+
+    def counts(self):
+        '''The stats for profiler.end_frame(), next to the entity counts.'''
+        return {"asset hits": self.hits, "asset misses": self.misses, "asset evictions": self.evictions,
+                "asset KB": self.used // 1024}
+
+
+# the cache shared by everything in this process
+assets = AssetCache()
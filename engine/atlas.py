@@ -0,0 +1,126 @@
+'''
+Frame Atlas
+-----------
+Packs the frames of an animation into one sheet and saves it as a single
+binary file: a small header, the list of source files it was built from, and
+the raw RGBA pixels. Loading the sheet maps the file into memory instead of
+opening and decoding one PNG per frame.
+
+The cache is built again whenever a source PNG is changed, added or removed
+(checked by file size and modification time). To build it ahead of time:
+
+    python -m engine.atlas
+'''
+
+import json
+import mmap
+import os
+import struct
+
+from PIL import Image
+
+MAGIC = b"ATLAS001"
+HEADER = struct.Struct("<8sIIIII")     # magic, frame w, frame h, columns, frames, manifest bytes
+ALIGN = 16
+
+EXPLOSION_FRAMES = [f"Images/explosions/explosion{i:04}.png" for i in range(50)]
+EXPLOSION_CACHE = "Images/explosions.atlas"
+
+
+def manifest(paths):
+    '''What the cache was built from: each path with its size and modification time.'''
+    entries = []
+    for path in paths:
+        stat = os.stat(path)
+        entries.append([path, stat.st_size, stat.st_mtime_ns])
+    return entries
+
+
+class Atlas:
+    def __init__(self, image, frame_size, columns, count):
+        self.image = image
+        self.frame_size = frame_size
+        self.columns = columns
+        self.rects = []     # (x, y, w, h) of each frame in the sheet
+        w, h = frame_size
+        for i in range(count):
+            self.rects.append(((i % columns) * w, (i // columns) * h, w, h))
+
+    def __len__(self):
+        return len(self.rects)
+
+    def frame(self, i):
+        x, y, w, h = self.rects[i]
+        return self.image.crop((x, y, x + w, y + h))
+
+
+def build(paths, cache_path):
+    '''Decode every frame, pack them into one sheet and write the cache file.'''
+    return pack([Image.open(path).convert("RGBA") for path in paths], paths, cache_path)
+
+
+def pack(frames, paths, cache_path):
+    '''Pack frames already decoded from paths into one sheet and write the cache file.'''
+    w, h = frames[0].size
+    columns = max(1, int(len(frames) ** 0.5 + 0.5))
+    rows = (len(frames) + columns - 1) // columns
+    sheet = Image.new("RGBA", (columns * w, rows * h))
+    for i, frame in enumerate(frames):
+        sheet.paste(frame, ((i % columns) * w, (i // columns) * h))
+
+    info = json.dumps(manifest(paths)).encode()
+    header = HEADER.pack(MAGIC, w, h, columns, len(frames), len(info))
+    padding = -(len(header) + len(info)) % ALIGN
+
+    # write next to the real file and swap it in, so a crash never leaves half a cache
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(info)
+        f.write(b"\0" * padding)
+        f.write(sheet.tobytes())
+    os.replace(tmp_path, cache_path)
+    return Atlas(sheet, (w, h), columns, len(frames))
+
+
+def read(cache_path, paths):
+    '''The atlas in cache_path, or None if it is missing or was built from other files.'''
+    try:
+        with open(cache_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):     # missing or empty
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, w, h, columns, count, info_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        return None
+    try:
+        if json.loads(data[HEADER.size:HEADER.size + info_size]) != manifest(paths):
+            return None
+    except (OSError, ValueError):
+        return None
+
+    start = HEADER.size + info_size
+    start += -start % ALIGN
+    rows = (count + columns - 1) // columns
+    size = (columns * w, rows * h)
+    if len(data) - start != size[0] * size[1] * 4:
+        return None
+    # the pixels stay in the mapped file, nothing is copied until a frame is cut out
+    sheet = Image.frombuffer("RGBA", size, memoryview(data)[start:], "raw", "RGBA", 0, 1)
+    return Atlas(sheet, (w, h), columns, count)
+
+
+def load(paths, cache_path):
+    '''Read the cached atlas, building it first if the frames changed.'''
+    atlas = read(cache_path, paths)
+    if atlas is None:
+        atlas = build(paths, cache_path)
+    return atlas
+
+
+if __name__ == "__main__":
+    atlas = build(EXPLOSION_FRAMES, EXPLOSION_CACHE)
+    print(f"{EXPLOSION_CACHE}: {len(atlas)} frames of {atlas.frame_size[0]}x{atlas.frame_size[1]}, "
+          f"{os.path.getsize(EXPLOSION_CACHE) // 1024} KB")
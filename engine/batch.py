@@ -0,0 +1,185 @@
+'''
+Batch Runner
+------------
+Plays lots of headless games with bots to see how hard each level is. The
+games are spread over a pool of processes (they share nothing, so more cores
+means proportionally more games a second) and every game is written to a file
+as one JSON line as soon as it finishes. The summary is added up from the same
+stream, so memory stays the same no matter how many games are played.
+
+    python -m engine.batch levels --games 5000 --bot random
+    python -m engine.batch fighter --games 2000 --counts 2,4,8 --out fighter.jsonl
+
+For every level a game goes through it records whether the bot cleared it,
+died in it or ran out of time, plus the score and how long the bot survived.
+'''
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import time
+
+from engine import fighter, levels
+from engine.core import TICK
+from engine.waves import Wave
+
+GAMES = {
+    # world class, the keys a bot can press
+    "levels": (levels.LevelsWorld, ["LEFT", "RIGHT", "UP", "DOWN", "SPACE"]),
+    "fighter": (fighter.FighterWorld, ["A", "D", "W", "S", "SPACE"]),
+}
+LEVEL_NUMBERS = (1, 2, 3)
+MAX_SECONDS = 120
+SCORE_BUCKET = 10
+# chunks per worker handed to the pool at a time
+ROUND_CHUNKS = 4
+
+
+# -------Bots---------
+def random_bot(rng, keys):
+    '''Mashes keys: a press about every ten ticks and a release about every twenty.'''
+    def play(tick):
+        inputs = []
+        if rng.random() < 0.1:
+            inputs.append(("press", rng.choice(keys)))
+        if rng.random() < 0.05:
+            inputs.append(("release", rng.choice(keys)))
+        return inputs
+    return play
+
+
+def spin_bot(rng, keys):
+    '''Holds the first turning key and fires every six ticks.'''
+    def play(tick):
+        if tick == 0:
+            return [("press", keys[0])]
+        return [("press", "SPACE")] if tick % 6 == 0 else []
+    return play
+
+
+BOTS = {"random": random_bot, "spin": spin_bot}
+
+
+# -------Playing---------
+def set_counts(counts):
+    '''Change how many enemies each level has, in this process only.'''
+    if counts:
+        for level, count in zip(LEVEL_NUMBERS, counts):
+            levels.LEVELS[level] = (levels.LEVELS[level][0], count)
+            fighter.LEVEL_WAVES[level] = [Wave(count)]
+
+
+def play(task):
+    '''Play one game from level 1 until the player dies, clears level 3 or time runs out.'''
+    game, bot, seed, max_ticks = task
+    world_class, keys = GAMES[game]
+    world = world_class(seed=seed)
+    bot_inputs = BOTS[bot](random.Random(seed), keys)
+
+    world.step(TICK, [("press", "1")])
+    outcomes = {}
+    level = world.current_state
+    tick = 0
+    while level in LEVEL_NUMBERS and tick < max_ticks:
+        world.step(TICK, bot_inputs(tick))
+        tick += 1
+        # a step can end more than one level: cleared one, died in the next
+        for ended, outcome in world.ended:
+            outcomes[ended] = outcome
+        level = world.current_state
+    if level in LEVEL_NUMBERS:
+        outcomes[level] = "timeout"
+
+    return {"game": game, "bot": bot, "seed": seed, "seconds": round(tick * TICK, 3),
+            "score": world.score, "levels": outcomes}
+
+
+def tasks(game, bot, games, seed, max_ticks):
+    # made one at a time, run() takes them a round at a time
+    for i in range(games):
+        yield game, bot, seed + i, max_ticks
+
+
+# -------Summary---------
+class Summary:
+    '''Running totals, so no game has to be kept after it is counted.'''
+
+    def __init__(self):
+        self.games = 0
+        self.seconds = 0.0
+        self.scores = {}        # bucket -> games
+        self.levels = {}        # level -> {"cleared": n, "died": n, "timeout": n}
+
+    def add(self, result):
+        self.games += 1
+        self.seconds += result["seconds"]
+        bucket = result["score"] // SCORE_BUCKET * SCORE_BUCKET
+        self.scores[bucket] = self.scores.get(bucket, 0) + 1
+        for level, outcome in result["levels"].items():
+            counts = self.levels.setdefault(int(level), {"cleared": 0, "died": 0, "timeout": 0})
+            counts[outcome] += 1
+
+    def score_percentile(self, p):
+        target = self.games * p
+        seen = 0
+        for bucket in sorted(self.scores):
+            seen += self.scores[bucket]
+            if seen >= target:
+                return bucket
+        return None
+
+    def report(self):
+        lines = [f"{self.games} games, survived {self.seconds / max(self.games, 1):.1f} s on average",
+                 f"score p10 {self.score_percentile(0.1)}, p50 {self.score_percentile(0.5)}, "
+                 f"p90 {self.score_percentile(0.9)} (in buckets of {SCORE_BUCKET})"]
+        for level in sorted(self.levels):
+            counts = self.levels[level]
+            played = sum(counts.values())
+            lines.append(f"level {level}: played {played}, cleared {counts['cleared'] / played:.1%}, "
+                         f"died {counts['died'] / played:.1%}, timed out {counts['timeout'] / played:.1%}")
+        return "\n".join(lines)
+
+
+def run(game, bot, games, workers, out, seed=0, max_ticks=int(MAX_SECONDS / TICK), counts=None):
+    '''Play the games on workers processes, writing each to out. Returns the Summary.'''
+    summary = Summary()
+    chunk = max(1, min(64, games // (workers * 8)))
+    pending = tasks(game, bot, games, seed, max_ticks)
+    with multiprocessing.Pool(workers, initializer=set_counts, initargs=(counts,)) as pool, open(out, "w") as f:
+        # imap_unordered reads its whole iterable up front, so it only gets a round of tasks at a time
+        while True:
+            round_tasks = list(itertools.islice(pending, chunk * workers * ROUND_CHUNKS))
+            if not round_tasks:
+                break
+            for result in pool.imap_unordered(play, round_tasks, chunksize=chunk):
+                f.write(json.dumps(result) + "\n")
+                summary.add(result)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games with bots.")
+    parser.add_argument("game", choices=sorted(GAMES))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--bot", choices=sorted(BOTS), default="random")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game, the rest count up")
+    parser.add_argument("--seconds", type=float, default=MAX_SECONDS, help="time limit of one game")
+    parser.add_argument("--counts", help="enemies in levels 1,2,3, e.g. 2,4,8")
+    parser.add_argument("--out", default="batch.jsonl")
+    args = parser.parse_args()
+
+    counts = [int(n) for n in args.counts.split(",")] if args.counts else None
+    start = time.perf_counter()
+    summary = run(args.game, args.bot, args.games, args.workers, args.out,
+                  args.seed, int(args.seconds / TICK), counts)
+    seconds = time.perf_counter() - start
+    print(summary.report())
+    print(f"{args.games / seconds:.0f} games/s on {args.workers} processes, results in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+'''
+BB8 Attack (15.0_Jedi_Training.py) without the window.
+'''
+
+from engine.core import SW, SH, TICK, Entity, EntityList, Explosion, World
+from engine.entity_store import EntityStore
+from engine.pools import Pool
+from engine.spatial import SpatialHash
+
+# --- Constants ---
+BB8_scale = 0.3
+trooper_scale = 0.1
+trooper_count = 40
+bullet_scale = 1
+speed = 4
+
+# each trooper used to fire on 1 in 800 ticks, that is this many shots a second
+fire_rate = 1 / (800 * TICK)
+
+
+# -------Player/BB8--------
+class Player(Entity):
+    image = "Images/bb8.png"
+    scale = BB8_scale
+    shape = "polygon"
+
+    def update(self, frames=1):
+        self.center_x += self.change_x * frames
+        if self.right < 0:
+            self.right = SW
+        elif self.left > SW:
+            self.left = 0
+
+
+# --------Enemy Bullet-----
+class EnemyBullet(Entity):
+    image = "Images/rbullet.png"
+    scale = bullet_scale
+    shape = "polygon"
+    edge = "cull_bottom"
+
+    def reset(self):
+        super().reset()
+        self.angle = -90
+
+    def velocity(self):
+        return 0, -10
+
+    def update(self, frames=1):
+        self.center_y -= 10 * frames
+        if self.top < 0:
+            self.kill()
+
+
+# --------Trooper----------
+class Trooper(Entity):
+    image = "Images/stormtrooper.png"
+    scale = trooper_scale
+    shape = "polygon"
+    edge = "respawn"
+
+    def __init__(self, rng):
+        super().__init__()
+        self.rng = rng
+        self.w = int(self.width)
+        self.h = int(self.height)
+
+    def velocity(self):
+        return 0, -2
+
+    def respawn(self):
+        self.center_x = self.rng.randrange(self.w, SW - self.w)
+        self.center_y = self.rng.randrange(SH + self.h, SH * 2)
+
+    def update(self, frames=1):
+        self.center_y -= 2 * frames
+        if self.top < 0:
+            self.respawn()
+
+
+# -------Bullet-----------
+class Bullet(Entity):
+    image = "Images/bullet.png"
+    scale = bullet_scale
+    shape = "polygon"
+    edge = "cull_top"
+
+    def velocity(self):
+        return 0, 10
+
+    def update(self, frames=1):
+        self.center_y += 10 * frames
+        if self.bottom > SH:
+            self.kill()
+
+
+# ------BB8 World--------------
+class BB8World(World):
+    # what engine.net sends the clients of a networked game
+    net_lists = {"player_list": Player, "trooper_list": Trooper, "bullet_list": Bullet,
+                 "explosions": Explosion, "ebullets": EnemyBullet}
+    net_state = {"score": int, "gameover": bool}
+    net_player = "BB8"
+
+    def __init__(self, seed=None, arrays=False, players=1):
+        super().__init__(seed, arrays)
+        self.player_count = players
+        self.trooper_count = trooper_count
+        self.trooper_hash = SpatialHash()
+        self.ebullet_hash = SpatialHash()
+        self.bullet_pool = Pool(Bullet)
+        self.ebullet_pool = Pool(EnemyBullet)
+        self.explosion_pool = Pool(Explosion)
+        self.reset()
+
+    def reset(self):   # reset the game
+        self.gameover = False
+        self.scheduler.clear()
+
+        # entity lists
+        self.player_list = EntityList()
+        self.trooper_list = EntityList()
+        self.bullet_list = EntityList()
+        self.explosions = EntityList()
+        self.ebullets = EntityList()
+        if self.arrays:
+            EntityStore(self.trooper_list, Trooper)
+            EntityStore(self.bullet_list, Bullet)
+            EntityStore(self.ebullets, EnemyBullet)
+
+        self.score = 0
+
+        # create the players, spread out along the bottom
+        self.players = []
+        for n in range(self.player_count):
+            bb8 = Player()
+            bb8.center_x = SW * (n + 1) / (self.player_count + 1)
+            bb8.bottom = 2
+            self.players.append(bb8)
+            self.player_list.append(bb8)
+        self.BB8 = self.players[0]
+
+        # create the troopers
+        for i in range(self.trooper_count):
+            trooper = Trooper(self.rng)
+            trooper.center_x = self.rng.randrange(trooper.w, SW - trooper.w)
+            trooper.center_y = self.rng.randrange(SH // 2, SH * 2)
+            self.trooper_list.append(trooper)
+            self.schedule_fire(trooper)
+
+    def schedule_fire(self, trooper):
+        # time to the next shot, the same odds as the old 1 in 800 roll every tick
+        self.scheduler.schedule(self.time + self.rng.expovariate(fire_rate), self.trooper_fire, trooper)
+
+    def trooper_fire(self, trooper):
+        if not trooper.alive:
+            return
+        if self.gameover is False:
+            ebullet = self.ebullet_pool.acquire()
+            ebullet.center_x = trooper.center_x
+            ebullet.top = trooper.bottom
+            self.ebullets.append(ebullet)
+        self.schedule_fire(trooper)
+
+    def steer(self, bb8, action, key):
+        '''How the keys move a player. A client of a networked game runs it too, to predict its own player.'''
+        if action == "press":
+            if key == "LEFT":
+                bb8.change_x -= speed
+            elif key == "RIGHT":
+                bb8.change_x += speed
+        elif key == "LEFT" or key == "RIGHT":
+            bb8.change_x = 0
+
+    def on_key_press(self, key, player=0):
+        bb8 = self.players[player]
+        if key == "P":
+            self.reset()
+        elif key == "SPACE" and self.gameover is False:
+            bullet = self.bullet_pool.acquire()
+            bullet.center_x = bb8.center_x
+            bullet.bottom = bb8.top
+            bullet.angle = 90
+            self.bullet_list.append(bullet)
+            self.sounds.append("laser")
+            self.score -= 1
+        else:
+            self.steer(bb8, "press", key)
+
+    def on_key_release(self, key, player=0):
+        self.steer(self.players[player], "release", key)
+
+    def update(self, frames=1):
+        with self.phase("move"):
+            self.player_list.update(frames)
+            self.trooper_list.update(frames)
+            self.bullet_list.update(frames)
+            self.explosions.update(frames)
+            self.ebullets.update(frames)
+
+        # what left the screen is gone before anything can hit it
+        self.despawn.flush()
+
+        if len(self.trooper_list) == 0:
+            self.gameover = True
+
+        with self.phase("collisions"):
+            # every collision check this tick goes through the hashes
+            self.trooper_hash.build(self.trooper_list, frames)
+
+            # check if a bb8 is colliding with a trooper
+            for bb8 in self.players:
+                if bb8.alive and len(self.trooper_hash.check_for_collision(bb8)) > 0:
+                    bb8.kill()
+                    self.check_players()
+
+        # make the troopers whose shot is due fire
+        with self.phase("enemy fire"):
+            self.scheduler.run(self.time)
+
+        with self.phase("collisions"):
+            for bullet in self.bullet_list[:]:
+                # check if a bullet and trooper are colliding
+                hit_list = self.trooper_hash.check_for_sweep(bullet, frames)
+
+                if len(hit_list) > 0:
+                    explosion = self.explosion_pool.acquire()
+                    explosion.center_x = hit_list[0].center_x
+                    explosion.center_y = hit_list[0].center_y
+                    self.explosions.append(explosion)
+                    self.sounds.append("explosion")
+                    bullet.kill()
+
+                for trooper in hit_list:
+                    trooper.kill()
+                    self.score += 2
+
+            self.ebullet_hash.build(self.ebullets, frames)
+            for bb8 in self.players:
+                if not bb8.alive:
+                    continue    # a bb8 that was hit is gone, bullets fly through where it was
+                bb8_hit = self.ebullet_hash.check_for_sweep(bb8, frames)
+                if len(bb8_hit) > 0:
+                    self.sounds.append("explosion")
+                    bb8.kill()
+                    bb8_hit[0].kill()
+                    self.check_players()
+
+    def check_players(self):
+        # the game is over when the last bb8 is hit
+        if not any(bb8.alive for bb8 in self.players):
+            self.gameover = True
@@ -0,0 +1,335 @@
+'''
+Engine Core
+-----------
+The pieces every headless game world is built from. Entities look like arcade
+sprites (center_x, left, kill(), update() ...) so the game rules read the same
+as they do in the chapter scripts, but nothing here needs a window or a GPU.
+'''
+
+import math
+import random
+import struct
+from contextlib import nullcontext
+
+from engine import shapes
+from engine.scheduler import Scheduler
+
+# --- Constants ---
+SW = 800
+SH = 600
+TICK = 1 / 60   # movement speeds are per 1/60th of a second
+
+# some images used by the scripts are not checked in, so fall back to this size
+DEFAULT_IMAGE_SIZE = (128, 128)
+
+explosion_texture_count = 50
+
+# what World.phase() hands out when nothing is timing it
+NO_PHASE = nullcontext()
+
+_image_sizes = {}
+
+
+def image_size(path):
+    '''Width and height of a PNG, read from its header instead of decoding it.'''
+    if path is None:
+        return DEFAULT_IMAGE_SIZE
+    size = _image_sizes.get(path)
+    if size is None:
+        try:
+            with open(path, "rb") as f:
+                header = f.read(24)
+            size = struct.unpack(">II", header[16:24])
+        except (OSError, struct.error):
+            size = DEFAULT_IMAGE_SIZE
+        _image_sizes[path] = size
+    return size
+
+
+# -------Entity---------
+class Entity:
+    image = None
+    scale = 1
+    edge = None     # how an EntityStore treats it at the screen edge, None = not stored
+    shape = "aabb"  # what collisions test, "aabb", "circle" or "polygon" (see engine.shapes)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.shape != "aabb":
+            shapes.preload_hull(cls.image)  # read the outline now rather than in the first collision
+
+    def __init__(self, *args):
+        w, h = image_size(self.image)
+        self.width = w * self.scale
+        self.height = h * self.scale
+        self.pool = None    # the Pool it goes back to when killed
+        self.generation = 0     # times a Pool handed it out again
+
+        self._extent_angle = None
+        self._half_w = 0
+        self._half_h = 0
+        self._polygon_angle = None
+        self._polygon = None
+        self.reset(*args)
+
+    def reset(self):
+        # everything a fresh entity starts with, so a pool can hand it out again
+        self.center_x = 0.0
+        self.center_y = 0.0
+        self.angle = 0
+        self.change_x = 0
+        self.change_y = 0
+        self.change_angle = 0
+        self.speed = 0
+        self.alive = True
+        self.lists = []
+
+    def half_extents(self):
+        # half width/height of the box around the (rotated) image
+        if self._extent_angle != self.angle:
+            rad = math.radians(self.angle)
+            c = abs(math.cos(rad))
+            s = abs(math.sin(rad))
+            self._half_w = (self.width * c + self.height * s) / 2
+            self._half_h = (self.width * s + self.height * c) / 2
+            self._extent_angle = self.angle
+        return self._half_w, self._half_h
+
+    @property
+    def left(self):
+        return self.center_x - self.half_extents()[0]
+
+    @left.setter
+    def left(self, value):
+        self.center_x = value + self.half_extents()[0]
+
+    @property
+    def right(self):
+        return self.center_x + self.half_extents()[0]
+
+    @right.setter
+    def right(self, value):
+        self.center_x = value - self.half_extents()[0]
+
+    @property
+    def bottom(self):
+        return self.center_y - self.half_extents()[1]
+
+    @bottom.setter
+    def bottom(self, value):
+        self.center_y = value + self.half_extents()[1]
+
+    @property
+    def top(self):
+        return self.center_y + self.half_extents()[1]
+
+    @top.setter
+    def top(self, value):
+        self.center_y = value - self.half_extents()[1]
+
+    def velocity(self):
+        return self.change_x, self.change_y
+
+    def set_velocity(self, change_x, change_y):
+        self.change_x = change_x
+        self.change_y = change_y
+
+    def kill(self):
+        was_alive = self.alive
+        self.alive = False
+        if DespawnQueue.active is not None and self.lists:
+            # a world is stepping: it takes the entity out of its lists at the end of the tick
+            if was_alive:
+                DespawnQueue.active.add(self)
+            return
+        for entity_list in self.lists[:]:
+            entity_list.remove(self)
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
+
+    def update(self, frames=1):
+        pass
+
+
+# -------Explosion---------
+class Explosion(Entity):
+    image = "Images/explosions/explosion0000.png"
+
+    def reset(self):
+        super().reset()
+        self.current_texture = 0
+
+    def update(self, frames=1):
+        self.current_texture += frames
+        if self.current_texture >= explosion_texture_count:
+            self.kill()
+
+
+# -------Entity List---------
+class EntityList:
+    '''A SpriteList without the drawing.'''
+
+    def __init__(self):
+        self.entities = []
+        self.store = None   # an EntityStore moving the whole list at once
+
+    def append(self, entity):
+        self.entities.append(entity)
+        entity.lists.append(self)
+        if self.store is not None:
+            self.store.add(entity)
+
+    def remove(self, entity):
+        self.entities.remove(entity)
+        entity.lists.remove(self)
+        if self.store is not None:
+            self.store.discard(entity)
+
+    def compact(self):
+        '''Drop the entities killed since the last compact() in one pass.'''
+        kept = []
+        for entity in self.entities:
+            if entity.alive:
+                kept.append(entity)
+            elif self.store is not None:
+                self.store.discard(entity)
+        self.entities = kept
+
+    def update(self, frames=1):
+        if self.store is not None:
+            self.store.update(frames)
+            return
+        for entity in self.entities[:]:
+            entity.update(frames)
+
+    def __iter__(self):
+        return iter(self.entities)
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __getitem__(self, i):
+        return self.entities[i]
+
+
+# -------Despawn Queue---------
+class DespawnQueue:
+    '''
+    kill() takes an entity out of every list it is in right away, a list.remove()
+    each, so killing a thousand troopers is a thousand passes over the lists.
+    While a world steps, kill() only marks the entity dead and puts it here;
+    flush() then rebuilds each list that lost something once and hands the
+    entities back to their pools. Dead entities still in a list are skipped by
+    the collision checks, which look at alive.
+    '''
+
+    active = None   # the queue of the world that is stepping right now
+
+    def __init__(self):
+        self.pending = []
+        self.flushed = 0
+
+    def add(self, entity):
+        self.pending.append(entity)
+
+    def flush(self):
+        if not self.pending:
+            return
+        entities = self.pending
+        self.pending = []
+        lists = {}
+        for entity in entities:
+            for entity_list in entity.lists:
+                lists[id(entity_list)] = entity_list
+        for entity_list in lists.values():
+            entity_list.compact()
+        for entity in entities:
+            entity.lists = []
+            if entity.pool is not None:
+                entity.pool.release(entity)
+        self.flushed += len(entities)
+
+
+def check_for_collision(a, b):
+    # the boxes first: every shape lies inside its box, and two boxes are done here
+    if not (a.left < b.right and b.left < a.right and
+            a.bottom < b.top and b.bottom < a.top):
+        return False
+    if a.shape == "aabb" and b.shape == "aabb":
+        return True
+    return shapes.overlap(a, b)
+
+
+def check_for_collision_with_list(entity, entity_list):
+    return [other for other in entity_list if other is not entity and check_for_collision(entity, other)]
+
+
+# -------World---------
+class World:
+    '''
+    All the state of one game. The window calls step() from on_update() with the
+    keys pressed since the last tick and draws whatever the world holds.
+    '''
+
+    def __init__(self, seed=None, arrays=False):
+        # every random number of the game comes from here, so a seed and the
+        # keys of each step are enough to play a session again (engine.replay)
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        # move bullets and enemies with an EntityStore, which needs NumPy
+        from engine.entity_store import np
+        self.arrays = arrays and np is not None
+        self.tick = 0
+        self.time = 0.0
+        self.sounds = []
+        self.ended = []     # (level, "cleared" | "died") for each level the last step ended
+        self.scheduler = Scheduler()    # timed events, run against self.time
+        self.profiler = None            # times the phases of update() when set (engine.profiler)
+        self.despawn = DespawnQueue()   # entities killed during a step, removed at its end
+
+    def step(self, dt, inputs=()):
+        '''
+        Run one tick of dt seconds. inputs is a list of ("press" | "release", key name)
+        and ("click", (x, y)). A key of another player than the first has the
+        player's number third, ("press", key name, 1), for the worlds that have more.
+        Everything moves dt / TICK times as far as it would in a 1/60th second tick,
+        and update() sees self.time as the time at the end of the tick.
+        '''
+        self.sounds = []
+        self.ended = []
+        DespawnQueue.active = self.despawn
+        try:
+            for action, key, *player in inputs:
+                if action == "press":
+                    self.on_key_press(key, *player)
+                elif action == "release":
+                    self.on_key_release(key, *player)
+                else:
+                    self.on_mouse_press(*key)   # ("click", (x, y))
+            self.time += dt
+            self.update(dt / TICK)
+        finally:
+            self.despawn.flush()
+            DespawnQueue.active = None
+        self.tick += 1
+        return self.sounds
+
+    def phase(self, name):
+        '''with self.phase("collisions"): ... times that block when a profiler is attached.'''
+        if self.profiler is None:
+            return NO_PHASE
+        return self.profiler.phase(name)
+
+    def on_key_press(self, key):
+        pass
+
+    def on_key_release(self, key):
+        pass
+
+    def on_mouse_press(self, x, y):
+        pass
+
+    def update(self, frames=1):
+        pass
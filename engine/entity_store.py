@@ -0,0 +1,158 @@
+'''
+Entity Store
+------------
+Keeps the positions, velocities and alive flags of one EntityList in NumPy
+arrays so the whole list moves, bounces and leaves the screen in a few array
+operations instead of one update() call per entity. The entities are still
+there for collisions and drawing; the store copies the new positions back to
+them once per tick.
+
+NumPy is optional. Without it worlds ignore arrays=True and every entity keeps
+running its own update().
+
+Entities in a store must only be moved by the store. Each entity class says
+what happens at the edge of the screen with its edge attribute:
+    "cull"     kill it once it is completely off the screen
+    "cull_top", "cull_bottom"
+               kill it once it is past that edge (it may start off screen)
+    "bounce"   flip its velocity when it touches an edge
+    "respawn"  call its respawn() once it falls below the screen
+'''
+
+from engine.core import SW, SH, DespawnQueue
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class EntityStore:
+    def __init__(self, entity_list, entity_class, capacity=64):
+        self.entity_list = entity_list
+        self.edge = entity_class.edge
+        self.entities = []
+        self.index = {}
+        self.count = 0
+        self.dead = 0
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.half_w = np.zeros(capacity)
+        self.half_h = np.zeros(capacity)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        entity_list.store = self
+        for entity in entity_list:
+            self.add(entity)
+
+    def grow(self):
+        for name in ("x", "y", "vx", "vy", "half_w", "half_h", "alive"):
+            old = getattr(self, name)
+            new = np.zeros(len(old) * 2, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def add(self, entity):
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        self.x[i] = entity.center_x
+        self.y[i] = entity.center_y
+        self.vx[i], self.vy[i] = entity.velocity()
+        self.half_w[i], self.half_h[i] = entity.half_extents()
+        self.alive[i] = True
+        self.entities.append(entity)
+        self.index[entity] = i
+        self.count += 1
+
+    def discard(self, entity):
+        i = self.index.pop(entity)
+        self.alive[i] = False
+        self.entities[i] = None
+        self.dead += 1
+
+    def compact(self):
+        # drop the removed rows, keeping the rest in list order
+        n = self.count
+        keep = np.flatnonzero(self.alive[:n])
+        for name in ("x", "y", "vx", "vy", "half_w", "half_h", "alive"):
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.entities = [self.entities[i] for i in keep.tolist()]
+        self.index = {entity: i for i, entity in enumerate(self.entities)}
+        self.count = len(keep)
+        self.alive[self.count:n] = False
+        self.dead = 0
+
+    def update(self, frames=1):
+        if self.dead > self.count // 2:
+            self.compact()
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        vx = self.vx[:n]
+        vy = self.vy[:n]
+        half_w = self.half_w[:n]
+        half_h = self.half_h[:n]
+        alive = self.alive[:n]
+
+        x += vx * frames
+        y += vy * frames
+
+        gone = ()
+        if self.edge == "cull":
+            off = (y - half_h > SH) | (y + half_h < 0) | (x + half_w < 0) | (x - half_w > SW)
+            gone = np.flatnonzero(off & alive).tolist()
+        elif self.edge == "cull_top":
+            gone = np.flatnonzero((y - half_h > SH) & alive).tolist()
+        elif self.edge == "cull_bottom":
+            gone = np.flatnonzero((y + half_h < 0) & alive).tolist()
+
+        elif self.edge == "bounce":
+            flip_y = (y - half_h < 0) | (y + half_h > SH)
+            flip_x = ~flip_y & ((x - half_w < 0) | (x + half_w > SW))
+            vy[flip_y] *= -1
+            vx[flip_x] *= -1
+            for i in np.flatnonzero((flip_x | flip_y) & alive).tolist():
+                self.entities[i].set_velocity(float(vx[i]), float(vy[i]))
+
+        entities = self.entities
+        for entity, new_x, new_y in zip(entities, x.tolist(), y.tolist()):
+            if entity is not None:
+                entity.center_x = new_x
+                entity.center_y = new_y
+
+        if self.edge == "respawn":
+            for i in np.flatnonzero((y + half_h < 0) & alive).tolist():
+                entity = entities[i]
+                entity.respawn()
+                x[i] = entity.center_x
+                y[i] = entity.center_y
+
+        if gone:
+            self.cull(gone)
+
+    def cull(self, gone):
+        if DespawnQueue.active is not None:
+            # the world's despawn queue removes them at the end of the tick
+            for i in gone:
+                self.entities[i].kill()
+            return
+
+        # kill everything that left the screen with one pass over the list
+        # instead of one list.remove() per entity
+        entity_list = self.entity_list
+        for i in gone:
+            entity = self.entities[i]
+            if len(entity.lists) > 1:
+                entity.kill()
+                continue
+            entity.alive = False
+            entity.lists.remove(entity_list)
+            self.discard(entity)
+            if entity.pool is not None:
+                entity.pool.release(entity)
+        entity_list.entities = [entity for entity in entity_list.entities if entity.alive]
@@ -0,0 +1,226 @@
+'''
+Escape Room
+-----------
+The rules of the Escape Room. Rooms are JSON files in rooms/, one per room,
+so adding rooms and puzzles doesn't touch the code:
+
+    {"background": "Images/sky1.png",
+     "objects": [{"id": "door", "x": 700, "y": 300, "width": 80, "height": 200,
+                  "image": "Images/wall.png", "goes": "hall",
+                  "requires": "key", "locked": "The door is locked."}]}
+
+x and y are the center of an object. What clicking it does comes from its
+other fields, in this order:
+    requires    an item or flag needed first, otherwise it shows locked
+    message     text to show
+    gives       an item for the inventory
+    sets        a flag (a solved puzzle)
+    points      added to the score
+    once        the object is used up and goes away
+    escape      the player is out
+    goes        the room to go to
+shown_by hides an object until that flag is set. Objects without an image are
+only a spot to click on. R starts the room over, back to how it was when the
+player came in (a snapshot taken at the door, see engine.snapshot).
+
+Only the room the player is in and the rooms its doors lead to are loaded,
+the rest are read again when the player gets near them. Each room hashes its
+objects into a grid, so a click only looks at the objects around it.
+'''
+
+import json
+import os
+import struct
+
+from engine import snapshot
+from engine.core import Entity, EntityList, World
+from engine.spatial import SpatialHash
+
+ROOMS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rooms")
+START_ROOM = "cell"
+PROGRESS = struct.Struct("<iB")     # score, escaped
+
+
+# -------Room Object--------
+class RoomObject(Entity):
+    def __init__(self, data):
+        self.image = data.get("image")
+        super().__init__()
+        self.data = data
+        self.id = data["id"]
+        self.center_x = data["x"]
+        self.center_y = data["y"]
+        self.width = data["width"]
+        self.height = data["height"]
+
+    def contains(self, x, y):
+        return abs(x - self.center_x) <= self.width / 2 and abs(y - self.center_y) <= self.height / 2
+
+
+# -------Room---------
+class Room:
+    def __init__(self, name, data):
+        self.name = name
+        self.background = data.get("background")
+        self.objects = EntityList()
+        for obj in data.get("objects", []):
+            self.objects.append(RoomObject(obj))
+        # objects don't move, so the grid is built once
+        self.index = SpatialHash()
+        self.index.build(self.objects)
+        self.exits = []
+        for obj in self.objects:
+            goes = obj.data.get("goes")
+            if goes is not None and goes not in self.exits:
+                self.exits.append(goes)
+
+    def images(self):
+        images = {obj.image for obj in self.objects if obj.image is not None}
+        if self.background is not None:
+            images.add(self.background)
+        return images
+
+
+def load_room(name, rooms_dir=ROOMS_DIR):
+    with open(os.path.join(rooms_dir, name + ".json")) as f:
+        return Room(name, json.load(f))
+
+
+# -------World---------
+class EscapeWorld(World):
+    # the sections every save holds, a file without one of them is not used
+    required_sections = ("world", "inventory", "flags")
+
+    def __init__(self, seed=None, arrays=False, rooms_dir=ROOMS_DIR, start=START_ROOM):
+        super().__init__(seed, arrays)
+        self.rooms_dir = rooms_dir
+        self.rooms = {}         # name -> Room, only the current room and its neighbours
+        self.room_loads = 0
+
+        # the progress of the player, kept when rooms are unloaded
+        self.inventory = []
+        self.flags = set()
+        self.used = {}          # room name -> ids of the objects used up in it
+        self.score = 0
+        self.message = ""
+        self.escaped = False
+        # sections changed since the last save, all of them until the first one
+        self.dirty = set(self.required_sections)
+        self.checkpoint = None  # a snapshot from when the player came into this room
+
+        self.enter(start)
+        self.checkpoint = snapshot.dumps(self)
+
+    def room(self, name):
+        room = self.rooms.get(name)
+        if room is None:
+            room = self.rooms[name] = load_room(name, self.rooms_dir)
+            self.room_loads += 1
+        return room
+
+    def enter(self, name):
+        self.room_name = name
+        self.current = self.room(name)
+        self.objects = self.current.objects
+        resident = [name] + self.current.exits
+        for other in resident:
+            self.room(other)
+        for other in list(self.rooms):
+            if other not in resident:
+                del self.rooms[other]
+        self.dirty.add("world")
+
+    def sections(self, names=None):
+        '''The progress as name -> bytes for engine.snapshot, all of it or only names.'''
+        if names is None:
+            names = list(self.required_sections) + ["used/" + room for room in self.used]
+        sections = {}
+        for name in names:
+            if name == "world":
+                data = PROGRESS.pack(self.score, self.escaped) + snapshot.pack_strings([self.room_name, self.message])
+            elif name == "inventory":
+                data = snapshot.pack_strings(self.inventory)
+            elif name == "flags":
+                data = snapshot.pack_strings(sorted(self.flags))
+            else:
+                data = snapshot.pack_strings(sorted(self.used.get(name[len("used/"):], ())))
+            sections[name] = data
+        return sections
+
+    def restore_sections(self, sections):
+        data = sections["world"]
+        self.score, escaped = PROGRESS.unpack_from(data)
+        self.escaped = bool(escaped)
+        room_name, message = snapshot.unpack_strings(data[PROGRESS.size:])
+        self.inventory = snapshot.unpack_strings(sections["inventory"])
+        self.flags = set(snapshot.unpack_strings(sections["flags"]))
+        # rooms emptied by the restore are saved as empty, not left as they were
+        dirty = set(sections) | {"used/" + room for room in self.used}
+        self.used = {}
+        for name, data in sections.items():
+            if name.startswith("used/"):
+                self.used[name[len("used/"):]] = set(snapshot.unpack_strings(data))
+        self.message = message
+        self.enter(room_name)
+        self.dirty = dirty
+        # the state just restored is where R goes back to
+        self.checkpoint = snapshot.MAGIC + snapshot.pack_records(sections)
+
+    def resident_images(self):
+        '''The images of the current room and the rooms next to it.'''
+        images = set()
+        for room in self.rooms.values():
+            images |= room.images()
+        return images
+
+    def has(self, name):
+        return name in self.inventory or name in self.flags
+
+    def visible(self, obj):
+        if obj.id in self.used.get(self.room_name, ()):
+            return False
+        shown_by = obj.data.get("shown_by")
+        return shown_by is None or shown_by in self.flags
+
+    def object_at(self, x, y):
+        '''The object drawn on top at x, y (the last one in the room file), or None.'''
+        for obj in reversed(self.current.index.at(x, y)):
+            if obj.contains(x, y) and self.visible(obj):
+                return obj
+        return None
+
+    def use(self, obj):
+        data = obj.data
+        needs = data.get("requires")
+        if needs is not None and not self.has(needs):
+            self.message = data.get("locked", "Nothing happens.")
+            return
+        self.message = data.get("message", "")
+        self.dirty.add("world")
+        if "gives" in data:
+            self.inventory.append(data["gives"])
+            self.dirty.add("inventory")
+        if "sets" in data:
+            self.flags.add(data["sets"])
+            self.dirty.add("flags")
+        self.score += data.get("points", 0)
+        if data.get("once"):
+            self.used.setdefault(self.room_name, set()).add(obj.id)
+            self.dirty.add("used/" + self.room_name)
+        if data.get("escape"):
+            self.escaped = True
+        if "goes" in data:
+            self.enter(data["goes"])
+            self.checkpoint = snapshot.dumps(self)
+
+    def on_key_press(self, key):
+        if key == "R" and not self.escaped:
+            snapshot.loads(self, self.checkpoint)
+            self.message = "You start this room over."
+
+    def on_mouse_press(self, x, y):
+        if self.escaped:
+            return
+        obj = self.object_at(x, y)
+        if obj is not None:
+            self.use(obj)
@@ -0,0 +1,276 @@
+'''
+The Fighter sprite game (15.1_Game.py) without the window.
+'''
+
+import math
+
+from engine.core import SW, SH, Entity, EntityList, Explosion, World
+from engine.entity_store import EntityStore
+from engine.pools import Pool
+from engine.spatial import SpatialHash
+from engine.waves import Wave, WaveSpawner
+
+# --- Constants ---
+FIGHTER_SCALE = 0.3
+ENEMY_PLANE_SCALE = 0.1
+BULLET_SCALE = 1
+
+# Movement Constants
+ANGLE_SPEED = 4
+MIN_PLANE_SPEED = 2
+MAX_PLANE_SPEED = 5
+BULLET_SPEED = 20
+ENEMY_PLANE_SPEED = 2.5
+
+# the waves of enemy planes in each level (see engine.waves)
+LEVEL_WAVES = {1: [Wave(1)], 2: [Wave(2)], 3: [Wave(3)]}
+
+
+# ------Fighter Jet/Player------------
+class Player(Entity):
+    image = "Images/fighter1.png"
+    scale = FIGHTER_SCALE
+    shape = "polygon"
+
+    def velocity(self):
+        # trig to figure out distance change based on speed and angle
+        angle_rad = math.radians(self.angle)
+        return -self.speed * math.sin(angle_rad), self.speed * math.cos(angle_rad)
+
+    def update(self, frames=1):
+        self.angle += self.change_angle * frames
+        dx, dy = self.velocity()
+        self.center_x += dx * frames
+        self.center_y += dy * frames
+        # use if statements to keep the fighter in walls
+        if self.left < 0:
+            self.left = 0
+        if self.right > SW:
+            self.right = SW
+        if self.top > SH:
+            self.top = SH
+        if self.bottom < 0:
+            self.bottom = 0
+
+
+# ---------Bullet/Laser-------------
+class Bullet(Entity):
+    image = "Images/bullet.png"
+    scale = BULLET_SCALE
+    shape = "polygon"
+    edge = "cull"
+
+    def velocity(self):
+        angle_shoot = math.radians(self.angle - 90)
+        return -self.speed * math.sin(angle_shoot), self.speed * math.cos(angle_shoot)
+
+    def update(self, frames=1):
+        dx, dy = self.velocity()
+        self.center_x += dx * frames
+        self.center_y += dy * frames
+        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
+            self.kill()
+
+
+# ---------Enemy Plane------------
+class EnemyPlane(Entity):
+    image = "Images/enemy_plane.png"
+    scale = ENEMY_PLANE_SCALE
+    shape = "polygon"
+    edge = "cull"
+
+    def reset(self):
+        super().reset()
+        self.speed = ENEMY_PLANE_SPEED
+
+    def velocity(self):
+        angle_shoot = math.radians(self.angle - 45)
+        return -self.speed * math.sin(angle_shoot), self.speed * math.cos(angle_shoot)
+
+    def update(self, frames=1):
+        dx, dy = self.velocity()
+        self.center_x += dx * frames
+        self.center_y += dy * frames
+        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
+            self.kill()
+
+
+# ------Fighter World--------------
+class FighterWorld(World):
+    # what engine.net sends the clients of a networked game
+    net_lists = {"player_list": Player, "bullet_list": Bullet, "enemy_plane_list": EnemyPlane,
+                 "explosion_list": Explosion}
+    net_state = {"score": int, "current_state": int, "game_running": bool}
+    net_player = "fighter"
+
+    def __init__(self, seed=None, arrays=False, players=1):
+        super().__init__(seed, arrays)
+        self.player_count = players
+        self.players = []
+        self.current_state = 0
+        self.game_running = False
+        self.score = 0
+        self.enemy_count = 0
+        self.waves = []
+        self.enemy_plane_hash = SpatialHash()
+        self.enemy_plane_pool = Pool(EnemyPlane)
+        self.bullet_pool = Pool(Bullet)
+        self.explosion_pool = Pool(Explosion)
+
+    def setup(self):   # setup the game
+        self.scheduler.clear()
+        if self.current_state in LEVEL_WAVES:     # check which level is active and set variables accordingly
+            self.waves = LEVEL_WAVES[self.current_state]
+            self.enemy_count = sum(wave.count for wave in self.waves)
+
+        # entity lists
+        self.player_list = EntityList()
+        self.bullet_list = EntityList()
+        self.enemy_plane_list = EntityList()
+        self.explosion_list = EntityList()
+        if self.arrays:
+            EntityStore(self.bullet_list, Bullet)
+            EntityStore(self.enemy_plane_list, EnemyPlane)
+
+        # create the players, side by side in the middle
+        self.players = []
+        for n in range(self.player_count):
+            fighter = Player()
+            fighter.center_x = SW * (n + 1) / (self.player_count + 1)
+            fighter.center_y = SH / 2
+            fighter.speed = 2
+            self.players.append(fighter)
+            self.player_list.append(fighter)
+        self.fighter = self.players[0]
+
+        # planes come in wave by wave, the ones due now are made right away
+        self.spawner = WaveSpawner(self, self.waves, self.spawn_plane, lambda: len(self.enemy_plane_list))
+        self.spawner.start()
+
+    def spawn_plane(self, edge):
+        eplane = self.enemy_plane_pool.acquire()
+        # the edge it comes in from determines the direction
+        if edge == "bottom":
+            eplane.center_x = self.rng.randrange(int(SW/3), int(SW * 2/3))
+            eplane.center_y = 0
+            eplane.angle = self.rng.randrange(5, 85)
+
+        elif edge == "top":
+            eplane.center_x = self.rng.randrange(int(SW/3), int(SW * 2/3))
+            eplane.center_y = SH
+            eplane.angle = self.rng.randrange(160, 280)
+
+        elif edge == "left":
+            eplane.center_x = 0
+            eplane.center_y = self.rng.randrange(int(SH/3), int(SH * 2/3))
+            eplane.angle = self.rng.randrange(-90, 0)
+
+        else:           # from the right
+            eplane.center_x = SW
+            eplane.center_y = self.rng.randrange(int(SH/3), int(SH * 2/3))
+            eplane.angle = self.rng.randrange(90, 180)
+        self.enemy_plane_list.append(eplane)
+
+    def steer(self, fighter, action, key):
+        '''How the keys move a player. A client of a networked game runs it too, to predict its own player.'''
+        if not self.game_running:
+            return
+        if action == "release":
+            if key == "A" or key == "D":
+                fighter.change_angle = 0
+
+        elif key == "A":
+            fighter.change_angle = ANGLE_SPEED
+
+        elif key == "D":
+            fighter.change_angle = -ANGLE_SPEED
+
+        elif key == "W" and fighter.speed < MAX_PLANE_SPEED:
+            fighter.speed += 1
+
+        elif key == "S" and fighter.speed > MIN_PLANE_SPEED:
+            fighter.speed -= 1
+
+    def on_key_press(self, key, player=0):
+        if key in ("A", "D", "W", "S") and self.game_running:
+            self.steer(self.players[player], "press", key)
+
+        elif key == "SPACE" and self.game_running:
+            fighter = self.players[player]
+            bullet = self.bullet_pool.acquire()
+            bullet.center_x = fighter.center_x
+            bullet.center_y = fighter.center_y
+            bullet.angle = fighter.angle + 90
+            bullet.speed = BULLET_SPEED
+            self.bullet_list.append(bullet)
+            self.sounds.append("laser")
+
+        # level selector
+        elif key == "I" and not self.game_running:
+            self.current_state = 0
+        elif key in ("1", "2", "3") and not self.game_running:
+            self.current_state = int(key)
+            self.score = 0
+            self.setup()
+
+    def end_level(self, outcome):
+        if 0 < self.current_state < 4:
+            self.ended.append((self.current_state, outcome))
+
+    def on_key_release(self, key, player=0):
+        if self.game_running:
+            self.steer(self.players[player], "release", key)
+
+    def update(self, frames=1):
+        if self.current_state > 0 and self.current_state < 4:
+            self.game_running = True
+
+        else:
+            self.game_running = False
+
+        if self.game_running is True:
+            with self.phase("move"):
+                self.player_list.update(frames)
+                self.bullet_list.update(frames)
+                self.explosion_list.update(frames)
+                self.enemy_plane_list.update(frames)
+
+            # what left the screen is gone before anything can hit it
+            self.despawn.flush()
+
+            with self.phase("spawning"):
+                self.scheduler.run(self.time)
+
+            # the level is over once every wave is out and every plane is gone
+            if len(self.enemy_plane_list) == 0 and self.spawner.done():
+                self.end_level("cleared")
+                self.current_state += 1
+                self.setup()
+
+            with self.phase("collisions"):
+                # every collision check this tick goes through the hash
+                self.enemy_plane_hash.build(self.enemy_plane_list, frames)
+
+                # check if a fighter is colliding with another plane, the game is over with the last one
+                for fighter in self.players:
+                    if fighter.alive and len(self.enemy_plane_hash.check_for_collision(fighter)) > 0:
+                        fighter.kill()
+                        if not any(other.alive for other in self.players):
+                            self.end_level("died")
+                            self.current_state = 4
+
+                for bullet in self.bullet_list:
+                    # check if a bullet and enemy plane are colliding, the bullet keeps going
+                    hit_list = self.enemy_plane_hash.check_for_sweep(bullet, frames, through=True)
+
+                    # create the explosion
+                    if len(hit_list) > 0:
+                        explosion = self.explosion_pool.acquire()
+                        explosion.center_x = hit_list[0].center_x
+                        explosion.center_y = hit_list[0].center_y
+                        self.explosion_list.append(explosion)
+                        self.sounds.append("explosion")
+
+                    for eplane in hit_list:
+                        eplane.kill()
+                        self.score += 1
@@ -0,0 +1,50 @@
+'''
+HUD Text
+--------
+arcade.draw_text() has to find or lay out a label every time it is called, so
+drawing the score 60 times a second lays it out 60 times a second. A Hud keeps
+one label per line and only lays a line out again when its text changes.
+
+The labels of a Hud share one pyglet batch, so all its lines are drawn
+together in one call instead of one call a line.
+'''
+
+import arcade
+import pyglet
+
+# arcade.Text's default fonts
+FONT_NAME = ("calibri", "arial")
+
+
+class HudLine:
+    def __init__(self, text, x, y, color, font_size=14, batch=None):
+        self.text = text
+        self.label = pyglet.text.Label(text, x=x, y=y, color=arcade.get_four_byte_color(color),
+                                       font_name=FONT_NAME, font_size=font_size, batch=batch)
+        self.rebuilds = 0
+
+    def set(self, text):
+        if text != self.text:
+            self.text = text
+            self.label.text = text
+            self.rebuilds += 1
+
+
+class Hud:
+    def __init__(self):
+        self.lines = {}
+        self.batch = pyglet.graphics.Batch()
+
+    def add(self, name, text, x, y, color, font_size=14):
+        self.lines[name] = HudLine(text, x, y, color, font_size, self.batch)
+
+    def set(self, name, text):
+        self.lines[name].set(text)
+
+    def draw(self):
+        # raw pyglet drawing has to happen inside arcade's pyglet context
+        with arcade.get_window().ctx.pyglet_rendering():
+            self.batch.draw()
+
+    def rebuilds(self):
+        return sum(line.rebuilds for line in self.lines.values())
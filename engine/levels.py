@@ -0,0 +1,305 @@
+'''
+BB8 Attack with levels (18.0_Levels.py) without the window.
+'''
+
+import math
+
+from engine.core import SW, SH, TICK, Entity, EntityList, Explosion, World
+from engine.entity_store import EntityStore
+from engine.pools import Pool
+from engine.spatial import SpatialHash
+
+# --- Constants ---
+BB8_scale = 0.3
+trooper_scale = 0.1
+bullet_scale = 1
+Bullet_Points = -1
+Trooper_Points = 5
+
+# game states
+Instructions = 0
+Level_1 = 1
+Level_2 = 2
+Level_3 = 3
+Finished = 4
+
+# speed constants
+Movement_Speed = 5
+Angle_Speed = 5
+Bullet_Speed = 10
+E_Bullet_Speed = 8
+
+# each trooper used to fire on 1 in 800 ticks, that is this many shots a second
+Fire_Rate = 1 / (800 * TICK)
+
+# background image and trooper count for each level
+LEVELS = {
+    Level_1: ("Images/sky1.png", 1),
+    Level_2: ("Images/sky2.png", 2),
+    Level_3: ("Images/sky3.png", 3),
+}
+
+
+# -------Player/BB8--------
+class Player(Entity):
+    image = "Images/bb8.png"
+    scale = BB8_scale
+    shape = "polygon"
+
+    def velocity(self):
+        # trig to figure out distance change based on speed and angle
+        angle_rad = math.radians(self.angle)
+        return -self.speed * math.sin(angle_rad), self.speed * math.cos(angle_rad)
+
+    def update(self, frames=1):
+        self.angle += self.change_angle * frames
+        dx, dy = self.velocity()
+        self.center_x += dx * frames
+        self.center_y += dy * frames
+        # use if statements to keep bb8 in walls
+        if self.left < 0:
+            self.left = 0
+        if self.right > SW:
+            self.right = SW
+        if self.top > SH:
+            self.top = SH
+        if self.bottom < 0:
+            self.bottom = 0
+
+
+# --------Enemy Bullet-----
+class EnemyBullet(Entity):
+    image = "Images/rbullet.png"
+    scale = bullet_scale
+    shape = "polygon"
+    edge = "cull"
+
+    def reset(self, rng):
+        super().reset()
+        self.angle_list = [0, 90, 180, 270]
+        self.angle = rng.choice(self.angle_list)
+
+    def velocity(self):
+        angle_shoot = math.radians(self.angle - 90)
+        return -E_Bullet_Speed * math.sin(angle_shoot), E_Bullet_Speed * math.cos(angle_shoot)
+
+    def update(self, frames=1):
+        dx, dy = self.velocity()
+        self.center_x += dx * frames
+        self.center_y += dy * frames
+        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
+            self.kill()
+
+
+# --------Trooper----------
+class Trooper(Entity):
+    image = "Images/stormtrooper.png"
+    scale = trooper_scale
+    shape = "polygon"
+    edge = "bounce"
+
+    def __init__(self, rng):
+        super().__init__()
+        self.w = int(self.width)
+        self.h = int(self.height)
+        self.dx = rng.randrange(-1, 2, 2)
+        self.dy = rng.randrange(-1, 2, 2)
+
+    def velocity(self):
+        return self.dx, self.dy
+
+    def set_velocity(self, dx, dy):
+        self.dx = dx
+        self.dy = dy
+
+    def update(self, frames=1):
+        self.center_x += self.dx * frames
+        self.center_y += self.dy * frames
+        if self.bottom < 0 or self.top > SH:
+            self.dy *= -1
+        elif self.left < 0 or self.right > SW:
+            self.dx *= -1
+
+
+# -------Bullet-----------
+class Bullet(Entity):
+    image = "Images/bullet.png"
+    scale = bullet_scale
+    shape = "polygon"
+    edge = "cull"
+
+    def velocity(self):
+        angle_shoot = math.radians(self.angle - 90)
+        return -self.speed * math.sin(angle_shoot), self.speed * math.cos(angle_shoot)
+
+    def update(self, frames=1):
+        dx, dy = self.velocity()
+        self.center_x += dx * frames
+        self.center_y += dy * frames
+        if self.bottom > SH or self.top < 0 or self.right < 0 or self.left > SW:
+            self.kill()
+
+
+# ------Levels World--------------
+class LevelsWorld(World):
+    def __init__(self, seed=None, arrays=False):
+        super().__init__(seed, arrays)
+        # set game state
+        self.current_state = Instructions
+        self.game_running = False
+        self.score = 0
+        self.background = None
+        self.trooper_count = 0
+        self.trooper_hash = SpatialHash()
+        self.ebullet_hash = SpatialHash()
+        self.bullet_pool = Pool(Bullet)
+        self.ebullet_pool = Pool(EnemyBullet)
+        self.explosion_pool = Pool(Explosion)
+
+    def setup(self):   # setup the game
+        self.scheduler.clear()
+        if self.current_state in LEVELS:     # check which level is active and set variables accordingly
+            self.background, self.trooper_count = LEVELS[self.current_state]
+
+        # entity lists
+        self.player_list = EntityList()
+        self.trooper_list = EntityList()
+        self.bullet_list = EntityList()
+        self.explosions = EntityList()
+        self.ebullets = EntityList()
+        if self.arrays:
+            EntityStore(self.trooper_list, Trooper)
+            EntityStore(self.bullet_list, Bullet)
+            EntityStore(self.ebullets, EnemyBullet)
+
+        # create the player
+        self.BB8 = Player()
+        self.BB8.center_x = SW/2
+        self.BB8.center_y = SH/2
+        self.player_list.append(self.BB8)
+
+        # create the troopers
+        for i in range(self.trooper_count):
+            trooper = Trooper(self.rng)
+            if i % 2 == 0:
+                trooper.center_x = self.rng.randrange(trooper.w, int(SW / 3))
+            else:
+                trooper.center_x = self.rng.randrange(int(SW * 2 / 3), SW - trooper.w)
+            trooper.center_y = self.rng.randrange(trooper.h, SH - trooper.h)
+            self.trooper_list.append(trooper)
+            self.schedule_fire(trooper)
+
+    def schedule_fire(self, trooper):
+        # time to the next shot, the same odds as the old 1 in 800 roll every tick
+        self.scheduler.schedule(self.time + self.rng.expovariate(Fire_Rate), self.trooper_fire, trooper)
+
+    def trooper_fire(self, trooper):
+        if not trooper.alive:
+            return
+        ebullet = self.ebullet_pool.acquire(self.rng)
+        ebullet.center_x = trooper.center_x
+        ebullet.center_y = trooper.center_y
+        self.ebullets.append(ebullet)
+        self.schedule_fire(trooper)
+
+    def on_key_press(self, key):
+        if key == "LEFT" and self.game_running:
+            self.BB8.change_angle = Angle_Speed
+        elif key == "RIGHT" and self.game_running:
+            self.BB8.change_angle = -Angle_Speed
+        elif key == "UP" and self.game_running:
+            self.BB8.speed = Movement_Speed
+        elif key == "DOWN" and self.game_running:
+            self.BB8.speed = -Movement_Speed
+        elif key == "SPACE" and self.game_running:
+            bullet = self.bullet_pool.acquire()
+            bullet.center_x = self.BB8.center_x
+            bullet.center_y = self.BB8.center_y
+            bullet.angle = self.BB8.angle + 90
+            bullet.speed = Bullet_Speed
+            self.bullet_list.append(bullet)
+            self.sounds.append("laser")
+            self.score += Bullet_Points
+
+        # level selector
+        elif key == "I" and not self.game_running:
+            self.current_state = Instructions
+        elif key in ("1", "2", "3") and not self.game_running:
+            self.current_state = int(key)
+            self.score = 0
+            self.setup()
+
+    def end_level(self, outcome):
+        # once per level, BB8 can be hit again after the game is already over
+        if Instructions < self.current_state < Finished:
+            self.ended.append((self.current_state, outcome))
+
+    def on_key_release(self, key):
+        if (key == "LEFT" or key == "RIGHT") and self.game_running:
+            self.BB8.change_angle = 0
+        if (key == "UP" or key == "DOWN") and self.game_running:
+            self.BB8.speed = 0
+
+    def update(self, frames=1):
+        if self.current_state > Instructions and self.current_state < Finished:
+            self.game_running = True
+
+        else:
+            self.game_running = False
+
+        if self.game_running is True:
+
+            with self.phase("move"):
+                self.player_list.update(frames)
+                self.trooper_list.update(frames)
+                self.bullet_list.update(frames)
+                self.explosions.update(frames)
+                self.ebullets.update(frames)
+
+            # what left the screen is gone before anything can hit it
+            self.despawn.flush()
+
+            if len(self.trooper_list) == 0:
+                self.end_level("cleared")
+                self.current_state += 1
+                self.setup()
+
+            with self.phase("collisions"):
+                # every collision check this tick goes through the hashes
+                self.trooper_hash.build(self.trooper_list, frames)
+
+                # check if bb8 is colliding with a trooper
+                if len(self.trooper_hash.check_for_collision(self.BB8)) > 0:
+                    self.BB8.kill()
+                    self.end_level("died")
+                    self.current_state = Finished
+
+            # make the troopers whose shot is due fire
+            with self.phase("enemy fire"):
+                self.scheduler.run(self.time)
+
+            with self.phase("collisions"):
+                for bullet in self.bullet_list[:]:
+                    # check if a bullet and trooper are colliding
+                    hit_list = self.trooper_hash.check_for_sweep(bullet, frames)
+
+                    if len(hit_list) > 0:
+                        explosion = self.explosion_pool.acquire()
+                        explosion.center_x = hit_list[0].center_x
+                        explosion.center_y = hit_list[0].center_y
+                        self.explosions.append(explosion)
+                        self.sounds.append("explosion")
+                        bullet.kill()
+
+                    for trooper in hit_list:
+                        trooper.kill()
+                        self.score += Trooper_Points
+
+                self.ebullet_hash.build(self.ebullets, frames)
+                bb8_hit = self.ebullet_hash.check_for_sweep(self.BB8, frames)
+                if len(bb8_hit) > 0:
+                    self.sounds.append("explosion")
+                    self.BB8.kill()
+                    bb8_hit[0].kill()
+                    self.end_level("died")
+                    self.current_state = Finished
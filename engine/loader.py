@@ -0,0 +1,120 @@
+'''
+Background Loading
+------------------
+Decodes assets on a worker thread while the game keeps running. The game asks
+for something it will need soon with prefetch() and picks it up with take()
+when it actually needs it; if the worker is done by then take() costs nothing,
+otherwise it waits for the rest. How long take() had to wait is the stall.
+
+Only the decoding happens on the worker. The asset cache itself is only touched
+from the thread that calls take().
+'''
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from engine.assets import assets
+
+WORKERS = 4
+
+
+class Prefetcher:
+    def __init__(self, cache=assets, workers=WORKERS):
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self.pending = {}
+
+        self.prefetched = 0
+        self.last_stall = 0.0
+        self.max_stall = 0.0
+        self.stalls = 0
+
+    def prefetch(self, kind, path):
+        key = (kind, path)
+        if key in self.pending or key in self.cache:
+            return
+        self.pending[key] = self.executor.submit(self.cache.load, kind, path)
+        self.prefetched += 1
+
+    def take(self, kind, path):
+        start = time.perf_counter()
+        future = self.pending.pop((kind, path), None)
+        if future is not None:
+            asset = future.result()
+            self.cache.put(kind, path, asset)
+        else:
+            asset = self.cache.get(kind, path)
+        self.last_stall = time.perf_counter() - start
+        self.max_stall = max(self.max_stall, self.last_stall)
+        self.stalls += 1
+        return asset
+
+    def poll(self):
+        '''Move whatever the workers have finished into the cache, without waiting.'''
+        for key, future in list(self.pending.items()):
+            if future.done():
+                del self.pending[key]
+                self.cache.put(key[0], key[1], future.result())
+
+    def stats(self):
+        return {"prefetched": self.prefetched, "waiting": len(self.pending), "takes": self.stalls,
+                "last_stall_ms": self.last_stall * 1000, "max_stall_ms": self.max_stall * 1000}
+
+    def counts(self):
+        '''The stalls for profiler.end_frame(), next to the entity counts.'''
+        return {"prefetch waiting": len(self.pending), "stall last ms": round(self.last_stall * 1000, 3),
+                "stall max ms": round(self.max_stall * 1000, 3)}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LoadingList:
+    '''
+    A list of assets that fills up in order as a Prefetcher finishes them, so a
+    window can open and start drawing before they are all decoded. Anything
+    holding on to items sees new ones as they arrive.
+    '''
+
+    def __init__(self, prefetcher, kind, paths):
+        self.prefetcher = prefetcher
+        self.kind = kind
+        self.paths = list(paths)
+        self.items = []
+        self.callbacks = []
+        for path in self.paths:
+            prefetcher.prefetch(kind, path)
+        self.poll()     # anything already in the cache is ready now
+
+    def poll(self):
+        if self.done():
+            return
+        self.prefetcher.poll()
+        cache = self.prefetcher.cache
+        while not self.done() and (self.kind, self.paths[len(self.items)]) in cache:
+            self.items.append(cache.get(self.kind, self.paths[len(self.items)]))
+        if self.done():
+            self.finished()
+
+    def done(self):
+        return len(self.items) == len(self.paths)
+
+    def progress(self):
+        return len(self.items) / len(self.paths)
+
+    def wait(self):
+        '''Block until everything is loaded.'''
+        while not self.done():
+            self.items.append(self.prefetcher.take(self.kind, self.paths[len(self.items)]))
+        self.finished()
+
+    def when_done(self, callback):
+        '''Call callback(items) once everything is loaded, right away if it already is.'''
+        self.callbacks.append(callback)
+        if self.done():
+            self.finished()
+
+    def finished(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(self.items)
@@ -0,0 +1,72 @@
+'''
+Sound Mixer
+-----------
+Sits between the sounds a world makes and whatever plays them. Holding SPACE
+fires a laser every step, and each one used to start another voice on top of
+the ones still playing. The mixer:
+
+- plays a sound only once per batch no matter how many times it came up,
+- keeps at most max_voices of each sound playing and stops the oldest one
+  to make room for a new one,
+- counts what it did and how long starting the voices held up the frame.
+
+It doesn't know about arcade; engine.render hands it the play and stop
+functions.
+'''
+
+import time
+
+MAX_VOICES = 4
+
+
+class Mixer:
+    def __init__(self, sounds, play, stop, playing, max_voices=MAX_VOICES):
+        '''sounds maps names to loaded sounds, play(sound) starts a voice, stop(voice)
+        ends it early and playing(voice) tells if it is still going.'''
+        self.sounds = sounds
+        self.play_sound = play
+        self.stop_sound = stop
+        self.is_playing = playing
+        self.max_voices = max_voices
+        self.voices = {name: [] for name in sounds}    # oldest first
+
+        self.played = 0
+        self.coalesced = 0
+        self.stolen = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+    def play(self, names):
+        '''Start the sounds the world made since the last frame.'''
+        start = time.perf_counter()
+        started = set()
+        for name in names:
+            if name in started:
+                self.coalesced += 1
+                continue
+            started.add(name)
+
+            voices = self.voices[name] = [v for v in self.voices[name] if self.is_playing(v)]
+            if len(voices) >= self.max_voices:
+                self.stop_sound(voices.pop(0))
+                self.stolen += 1
+            voice = self.play_sound(self.sounds[name])
+            if voice is not None:
+                voices.append(voice)
+            self.played += 1
+        self.last_latency = time.perf_counter() - start
+        self.max_latency = max(self.max_latency, self.last_latency)
+
+    def active_voices(self):
+        return sum(1 for voices in self.voices.values() for v in voices if self.is_playing(v))
+
+    def stats(self):
+        return {"active": self.active_voices(), "played": self.played, "coalesced": self.coalesced,
+                "stolen": self.stolen, "last_latency_ms": self.last_latency * 1000,
+                "max_latency_ms": self.max_latency * 1000}
+
+    def counts(self):
+        '''The voices and latency for profiler.end_frame(), next to the entity counts.'''
+        return {"voices active": self.active_voices(), "voices coalesced": self.coalesced,
+                "voices stolen": self.stolen, "sound latency last ms": round(self.last_latency * 1000, 3),
+                "sound latency max ms": round(self.max_latency * 1000, 3)}
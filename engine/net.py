@@ -0,0 +1,678 @@
+'''
+Networked Games
+---------------
+Two players on separate machines playing BB8 Attack or the fighter game
+together. A server runs the only real world and steps it 60 times a second;
+the windows send it their keys and draw what it sends back.
+
+    python -m engine.net bb8 --port 5015
+    SERVER=192.168.1.20:5015 python 15.0_Jedi_Training.py
+
+Everything goes over UDP with asyncio:
+
+- A client numbers its steps (frames) and sends the keys of every frame the
+  server hasn't confirmed yet, so the next packet covers a lost one. The
+  server applies one frame of each client per tick, in order.
+- Each tick the server sends a client the world as a delta against the last
+  state that client told it has: entities that are new, gone, or not where the
+  client expects them. Positions are quantized to 1/4 pixel and every entity
+  carries its velocity, so the client moves it along until it hears otherwise
+  and an entity going in a straight line costs nothing. A correction that fits
+  in a byte is sent in one. The client ends up with exactly the server's
+  (quantized) state, which is what lets any state it has be the next base.
+- The client predicts its own player: its keys go through the world's steer()
+  right away, and when a state comes in it starts again from the server's
+  player and replays the frames the server hasn't applied yet.
+
+Bullets show up once the server's state comes back. States over about 1400
+bytes (hundreds of entities that all change) are split into IP fragments,
+which a lossy network drops more often.
+
+Either end can pretend to be on a bad network: every packet it sends or
+receives is delayed by latency plus up to jitter, and lost with probability
+loss (--latency/--jitter/--loss for the server, NET_LATENCY/NET_JITTER in ms
+and NET_LOSS for a window). benchmarks/bench_net.py plays over localhost.
+'''
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import struct
+import time
+import weakref
+
+from engine.bb8_attack import BB8World
+from engine.core import TICK, Entity, EntityList
+from engine.fighter import FighterWorld
+from engine.replay import record
+
+GAMES = {"bb8": BB8World, "fighter": FighterWorld}
+PORT = 5015
+SERVER = os.environ.get("SERVER")   # host:port of the server a window plays on
+
+# key and sound names go over the network as their place in these
+KEYS = ("LEFT", "RIGHT", "UP", "DOWN", "SPACE", "A", "D", "W", "S", "P", "I", "R", "1", "2", "3")
+SOUNDS = ("laser", "explosion")
+RELEASE = 0x80
+
+POSITION = 4            # quantized units per pixel, for positions and velocities
+ANGLE = 65536 / 360     # units per degree
+RATE = 64               # units per unit of speed, change_x and change_angle
+HISTORY = 64            # states kept as bases for deltas, about a second
+MAX_FRAMES = 32         # frames of keys a client sends again at most
+TIMEOUT = 5.0           # seconds without a packet before the server forgets a client
+NO_BASE = 0xFFFFFFFF
+NO_PLAYER = 0xFFFF
+
+# packets, told apart by their first byte
+HELLO = b"H"
+WELCOME = b"W"
+FULL = b"F"
+INPUT = b"I"
+STATE = b"S"
+BYE = b"B"
+WELCOME_HEADER = struct.Struct("<cBB")      # player number, players, then the world class
+INPUT_HEADER = struct.Struct("<cIIB")       # newest state, first frame, frames
+STATE_HEADER = struct.Struct("<cIIiH")      # tick, base tick, last frame applied, the client's player
+COUNT = struct.Struct("<H")
+
+# an entity in a state is (kind, x, y, angle, vx, vy, frame, speed, change_x, change_angle),
+# kind being the place of its list in net_lists; an entry sends the fields in its mask.
+# The mask is one byte when only the first seven bits are set, the top bit says a second follows.
+X_NEAR, X, Y_NEAR, Y, TURN, VELOCITY, FRAME, SPEED, CHANGE_X, CHANGE_ANGLE, NEW = (1 << bit for bit in range(11))
+MORE = 0x80
+FIELDS = ((X_NEAR, "b"), (X, "h"), (Y_NEAR, "b"), (Y, "h"), (TURN, "H"), (VELOCITY, "hh"),
+          (FRAME, "B"), (SPEED, "h"), (CHANGE_X, "h"), (CHANGE_ANGLE, "h"))
+FIELD_INDEX = {X: 1, Y: 2, TURN: 3, FRAME: 6, SPEED: 7, CHANGE_X: 8, CHANGE_ANGLE: 9}
+ENTRY = struct.Struct("<HB")    # net id, the first byte of the mask
+
+_entries = {}
+
+
+def entry_struct(mask):
+    entry = _entries.get(mask)
+    if entry is None:
+        fmt = "<HB" + ("B" if mask >= MORE else "") + ("B" if mask & NEW else "")
+        entry = _entries[mask] = struct.Struct(fmt + "".join(f for bit, f in FIELDS if mask & bit))
+    return entry
+
+
+def pack_entry(net_id, mask, values):
+    if mask >= MORE:
+        return entry_struct(mask).pack(net_id, mask & 0x7f | MORE, mask >> 7, *values)
+    return entry_struct(mask).pack(net_id, mask, *values)
+
+
+def clamp(value):
+    return -32768 if value < -32768 else 32767 if value > 32767 else value
+
+
+def quantize(entity, kind):
+    vx, vy = entity.velocity()
+    return (kind, clamp(round(entity.center_x * POSITION)), clamp(round(entity.center_y * POSITION)),
+            round(entity.angle * ANGLE) % 65536, clamp(round(vx * POSITION)), clamp(round(vy * POSITION)),
+            int(getattr(entity, "current_texture", 0)) & 255, clamp(round(entity.speed * RATE)),
+            clamp(round(entity.change_x * RATE)), clamp(round(entity.change_angle * RATE)))
+
+
+# -------Deltas---------
+def encode_delta(state, base, ticks):
+    '''The entries (count, bytes) and removed ids that turn base, ticks older, into state.'''
+    parts = []
+    for net_id, q in state.items():
+        b = base.get(net_id)
+        if b is None or b[0] != q[0]:
+            mask = NEW | X | Y
+            values = [q[0], q[1], q[2]]
+            if q[3]:
+                mask |= TURN
+                values.append(q[3])
+            if q[4] or q[5]:
+                mask |= VELOCITY
+                values += (q[4], q[5])
+            for bit, i in ((FRAME, 6), (SPEED, 7), (CHANGE_X, 8), (CHANGE_ANGLE, 9)):
+                if q[i]:
+                    mask |= bit
+                    values.append(q[i])
+        else:
+            if q == b and not b[4] and not b[5]:
+                continue    # standing still where it was
+            mask = 0
+            values = []
+            # the client moves it on by its velocity, only how far off that is goes out
+            for near, far, i in ((X_NEAR, X, 1), (Y_NEAR, Y, 2)):
+                off = q[i] - (b[i] + b[i + 3] * ticks)
+                if off:
+                    if -128 <= off <= 127:
+                        mask |= near
+                        values.append(off)
+                    else:
+                        mask |= far
+                        values.append(q[i])
+            if q[3] != b[3]:
+                mask |= TURN
+                values.append(q[3])
+            if q[4] != b[4] or q[5] != b[5]:
+                mask |= VELOCITY
+                values += (q[4], q[5])
+            for bit, i in ((FRAME, 6), (SPEED, 7), (CHANGE_X, 8), (CHANGE_ANGLE, 9)):
+                if q[i] != b[i]:
+                    mask |= bit
+                    values.append(q[i])
+            if not mask:
+                continue
+        parts.append(pack_entry(net_id, mask, values))
+    removed = [net_id for net_id in base if net_id not in state]
+    return len(parts), b"".join(parts), removed
+
+
+def decode_delta(base, ticks, count, data, offset, removed):
+    '''The state encode_delta() was given, from the same base.'''
+    state = {}
+    for net_id, b in base.items():
+        if b[4] or b[5]:
+            b = (b[0], b[1] + b[4] * ticks, b[2] + b[5] * ticks) + b[3:]
+        state[net_id] = b
+    for net_id in removed:
+        state.pop(net_id, None)
+    for i in range(count):
+        net_id, mask = ENTRY.unpack_from(data, offset)
+        if mask & MORE:
+            mask = mask & ~MORE | data[offset + ENTRY.size] << 7
+        entry = entry_struct(mask)
+        values = entry.unpack_from(data, offset)[3 if mask >= MORE else 2:]
+        offset += entry.size
+        if mask & NEW:
+            q = [values[0], 0, 0, 0, 0, 0, 0, 0, 0, 0]
+            values = values[1:]
+        else:
+            q = list(state[net_id])
+        v = 0
+        for bit, fmt in FIELDS:
+            if not mask & bit:
+                continue
+            if bit == X_NEAR or bit == Y_NEAR:
+                q[1 if bit == X_NEAR else 2] += values[v]
+            elif bit == VELOCITY:
+                q[4], q[5] = values[v], values[v + 1]
+                v += 1
+            else:
+                q[FIELD_INDEX[bit]] = values[v]
+            v += 1
+        state[net_id] = tuple(q)
+    return state
+
+
+# -------Simulated Network---------
+class Link:
+    '''
+    How one end passes its packets on: right away, or late and now and then not
+    at all when it simulates a bad network. Counts what it sends.
+    '''
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.loop = None
+        self.sent = 0
+        self.sent_bytes = 0
+        self.lost = 0
+
+    def deliver(self, callback, *args):
+        if self.loss and self.rng.random() < self.loss:
+            self.lost += 1
+            return
+        delay = self.latency + self.rng.uniform(0, self.jitter) if self.jitter else self.latency
+        if delay > 0:
+            self.loop.call_later(delay, callback, *args)
+        else:
+            callback(*args)
+
+    def send(self, transport, data, address=None):
+        self.sent += 1
+        self.sent_bytes += len(data)
+        self.deliver(transport.sendto, data, address)
+
+    def receive(self, callback, data, address):
+        self.deliver(callback, data, address)
+
+
+def link_from_env():
+    return Link(float(os.environ.get("NET_LATENCY", 0)) / 1000, float(os.environ.get("NET_JITTER", 0)) / 1000,
+                float(os.environ.get("NET_LOSS", 0)))
+
+
+# -------Server---------
+class Peer:
+    '''A client as the server sees it.'''
+
+    def __init__(self, address, player, now):
+        self.address = address
+        self.player = player
+        self.frames = {}        # frame number -> its key codes, not applied yet
+        self.next_frame = 0
+        self.acked = None       # the newest state the client has
+        self.heard = now
+        self.sent_bytes = 0
+        self.states = 0
+        self.largest = 0
+
+
+class Server(asyncio.DatagramProtocol):
+    def __init__(self, world, link=None):
+        self.world = world
+        self.stepper = record(world)
+        self.lists = list(type(world).net_lists)
+        self.state_names = list(type(world).net_state)
+        self.state_struct = struct.Struct(f"<{len(self.state_names)}i")
+        # the game the clients need, a world made for testing may be a subclass of it
+        game = next(cls for cls in type(world).__mro__ if "net_lists" in vars(cls))
+        self.name = f"{game.__module__}.{game.__name__}".encode()
+        self.link = link or Link()
+        self.transport = None
+        self.clients = {}       # address -> Peer
+        self.history = {}       # tick -> state, the bases deltas can start from
+        self.next_id = 0
+        self.ids = weakref.WeakValueDictionary()    # net id -> the entity holding it, live or pooled
+        self.ticks = 0
+        self.step_seconds = 0.0
+        self.send_seconds = 0.0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.link.loop = asyncio.get_running_loop()
+
+    def datagram_received(self, data, address):
+        self.link.receive(self.handle, data, address)
+
+    def send(self, data, address):
+        self.link.send(self.transport, data, address)
+
+    def handle(self, data, address):
+        kind = data[:1]
+        client = self.clients.get(address)
+        if kind == HELLO:
+            if client is None:
+                taken = {other.player for other in self.clients.values()}
+                free = [n for n in range(self.world.player_count) if n not in taken]
+                if not free:
+                    self.send(FULL, address)
+                    return
+                client = self.clients[address] = Peer(address, free[0], time.monotonic())
+            self.send(WELCOME_HEADER.pack(WELCOME, client.player, self.world.player_count) + self.name, address)
+        elif client is None:
+            return
+        elif kind == INPUT:
+            self.read_input(client, data)
+        elif kind == BYE:
+            del self.clients[address]
+            return
+        client.heard = time.monotonic()
+
+    def read_input(self, client, data):
+        _, acked, frame, count = INPUT_HEADER.unpack_from(data)
+        if acked != NO_BASE and (client.acked is None or acked > client.acked):
+            client.acked = acked
+        # frames too old for the client to send again are lost, don't wait for them
+        client.next_frame = max(client.next_frame, frame)
+        offset = INPUT_HEADER.size
+        for i in range(count):
+            length = data[offset]
+            if frame >= client.next_frame:
+                client.frames[frame] = data[offset + 1:offset + 1 + length]
+            offset += 1 + length
+            frame += 1
+
+    def inputs(self):
+        inputs = []
+        for client in self.clients.values():
+            codes = client.frames.pop(client.next_frame, None)
+            if codes is None:
+                continue    # not here yet, the player keeps doing what it was doing
+            client.next_frame += 1
+            if len(client.frames) > 2:
+                # it fell behind after a gap, catch up a frame
+                codes += client.frames.pop(client.next_frame, b"")
+                client.next_frame += 1
+            for code in codes:
+                inputs.append(("release" if code & RELEASE else "press", KEYS[code & ~RELEASE], client.player))
+        return inputs
+
+    def capture(self):
+        '''The world as it goes out: net id -> quantized entity.'''
+        state = {}
+        for kind, name in enumerate(self.lists):
+            entity_list = getattr(self.world, name, None)
+            if entity_list is None:
+                continue
+            for entity in entity_list:
+                net_id = getattr(entity, "net_id", None)
+                if net_id is None:
+                    # pooled entities keep theirs when they come back
+                    net_id = self.new_id(entity)
+                state[net_id] = quantize(entity, kind)
+        return state
+
+    def new_id(self, entity):
+        # after wrapping around, skip the ids entities still hold
+        net_id = self.next_id
+        while net_id in self.ids:
+            net_id = (net_id + 1) % NO_PLAYER
+        self.next_id = (net_id + 1) % NO_PLAYER
+        entity.net_id = net_id
+        self.ids[net_id] = entity
+        return net_id
+
+    def player_id(self, client):
+        players = self.world.players
+        if client.player < len(players) and players[client.player].alive:
+            return getattr(players[client.player], "net_id", NO_PLAYER)
+        return NO_PLAYER
+
+    def tick(self):
+        start = time.perf_counter()
+        sounds = self.stepper.step(TICK, self.inputs())
+        middle = time.perf_counter()
+
+        tick = self.world.tick
+        state = self.capture()
+        self.history[tick] = state
+        self.history.pop(tick - HISTORY, None)
+        values = self.state_struct.pack(*(int(getattr(self.world, name)) for name in self.state_names))
+        codes = bytes(SOUNDS.index(sound) for sound in sounds if sound in SOUNDS)
+        bodies = {}     # base tick -> the delta from it, clients with the same base share it
+        for client in self.clients.values():
+            base_tick = client.acked if client.acked in self.history else NO_BASE
+            body = bodies.get(base_tick)
+            if body is None:
+                base = self.history[base_tick] if base_tick != NO_BASE else {}
+                count, entries, removed = encode_delta(state, base, tick - base_tick)
+                body = bodies[base_tick] = b"".join((
+                    values, bytes((len(codes),)), codes,
+                    COUNT.pack(len(removed)), struct.pack(f"<{len(removed)}H", *removed),
+                    COUNT.pack(count), entries))
+            packet = STATE_HEADER.pack(STATE, tick, base_tick, client.next_frame - 1, self.player_id(client)) + body
+            self.send(packet, client.address)
+            client.sent_bytes += len(packet)
+            client.states += 1
+            client.largest = max(client.largest, len(packet))
+
+        self.ticks += 1
+        self.step_seconds += middle - start
+        self.send_seconds += time.perf_counter() - middle
+
+    def forget_silent(self):
+        now = time.monotonic()
+        for address, client in list(self.clients.items()):
+            if now - client.heard > TIMEOUT:
+                del self.clients[address]
+
+    async def run(self, ticks=None, period=TICK):
+        '''Step the world every period seconds (0: as fast as it goes), for ever or ticks times.'''
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        n = 0
+        while ticks is None or n < ticks:
+            self.tick()
+            n += 1
+            if n % 60 == 0:
+                self.forget_silent()
+            await asyncio.sleep(max(0.0, start + n * period - loop.time()))
+
+
+# -------Client---------
+class Client(asyncio.DatagramProtocol):
+    '''
+    Stands in for the world of a window that plays on a server. It has the
+    lists and state the window draws, as the server last sent them, and its own
+    player where the client predicts it to be.
+    '''
+
+    def __init__(self, world_class, link=None):
+        self.world_class = world_class
+        self.lists = list(world_class.net_lists)
+        self.classes = list(world_class.net_lists.values())
+        self.state_names = list(world_class.net_state)
+        self.state_struct = struct.Struct(f"<{len(self.state_names)}i")
+        self.link = link or Link()
+        self.transport = None
+        self.loop = None        # the event loop step() runs, when the client has one of its own
+        for name in self.lists:
+            setattr(self, name, EntityList())
+        for name, kind in world_class.net_state.items():
+            setattr(self, name, kind())
+
+        self.player = None      # our number on the server
+        self.players = 0
+        self.error = None
+        self.own = make_entity(world_class.net_lists["player_list"])
+        self.own_id = NO_PLAYER
+        setattr(self, world_class.net_player, self.own)
+        self.entities = {}      # net id -> Entity
+        self.states = {}        # tick -> state, the ones the server can build on
+        self.server_tick = None
+        self.received = []
+
+        self.frame = 0
+        self.frames = []        # (frame, key codes) the server hasn't applied yet
+        self.tick = 0
+        self.sounds = []
+        self.profiler = None
+        self.corrections = []   # how far the own player was off when a state came in, in pixels
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.link.loop = asyncio.get_running_loop()
+
+    def datagram_received(self, data, address):
+        self.link.receive(self.handle, data, address)
+
+    def handle(self, data, address):
+        kind = data[:1]
+        if kind == STATE:
+            self.received.append(data)
+        elif kind == WELCOME and self.player is None:
+            _, self.player, self.players = WELCOME_HEADER.unpack_from(data)
+            name = data[WELCOME_HEADER.size:].decode()
+            if name != f"{self.world_class.__module__}.{self.world_class.__name__}":
+                self.error = f"the server plays {name}"
+        elif kind == FULL:
+            self.error = "the server has all its players"
+
+    async def join(self, timeout=5.0):
+        loop = asyncio.get_running_loop()
+        until = loop.time() + timeout
+        while self.player is None and self.error is None:
+            if loop.time() > until:
+                raise ConnectionError("no answer from the server")
+            self.link.send(self.transport, HELLO)
+            await asyncio.sleep(0.2)
+        if self.error is not None:
+            raise ConnectionError(self.error)
+
+    def pump(self):
+        '''Handle what arrived and what is due without waiting, on the client's own loop.'''
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+
+    def close(self):
+        self.link.send(self.transport, BYE)
+        if self.loop is not None:
+            self.pump()
+        self.transport.close()
+
+    def step(self, dt, inputs=()):
+        if self.loop is not None:
+            self.pump()
+        self.sounds = []
+
+        codes = bytes(KEYS.index(key) | (RELEASE if action == "release" else 0)
+                      for action, key, *rest in inputs if action != "click" and key in KEYS)
+        self.frames.append((self.frame, codes))
+        del self.frames[:-MAX_FRAMES]
+        self.send_input()
+
+        # everything moves on as it was, the own player by its keys
+        self.predict(codes)
+        for entity in self.entities.values():
+            vx, vy = entity.net_velocity
+            entity.center_x += vx
+            entity.center_y += vy
+
+        own_id = self.own_id
+        state = self.read_states()
+        if state is not None:
+            x, y = self.own.center_x, self.own.center_y
+            self.apply(state)
+            if self.own_id in state:
+                # from where the server has it, through the frames it hasn't seen
+                for frame, codes in self.frames:
+                    self.predict(codes)
+                if self.own_id == own_id:
+                    self.corrections.append(math.hypot(self.own.center_x - x, self.own.center_y - y))
+
+        self.frame += 1
+        self.tick += 1
+        return self.sounds
+
+    def send_input(self):
+        parts = [INPUT_HEADER.pack(INPUT, NO_BASE if self.server_tick is None else self.server_tick,
+                                   self.frames[0][0], len(self.frames))]
+        for frame, codes in self.frames:
+            parts.append(bytes((len(codes),)))
+            parts.append(codes)
+        self.link.send(self.transport, b"".join(parts))
+
+    def predict(self, codes):
+        if self.own_id == NO_PLAYER:
+            return
+        for code in codes:
+            # steer() only needs the state the server sends, so the client stands in for the world
+            self.world_class.steer(self, self.own, "release" if code & RELEASE else "press", KEYS[code & ~RELEASE])
+        self.own.update(1)
+
+    def read_states(self):
+        '''Decode the states that came in. Returns the newest, or None without a new one.'''
+        newest = None
+        for data in self.received:
+            tick, base_tick, last_frame, own_id = STATE_HEADER.unpack_from(data)[1:]
+            if self.server_tick is not None and tick <= self.server_tick:
+                continue    # late, a newer one is here already
+            if base_tick == NO_BASE:
+                base = {}
+            elif base_tick in self.states:
+                base = self.states[base_tick]
+            else:
+                continue
+            offset = STATE_HEADER.size
+            values = self.state_struct.unpack_from(data, offset)
+            offset += self.state_struct.size
+            sounds = data[offset + 1:offset + 1 + data[offset]]
+            offset += 1 + len(sounds)
+            removed_count, = COUNT.unpack_from(data, offset)
+            removed = struct.unpack_from(f"<{removed_count}H", data, offset + 2)
+            offset += 2 + 2 * removed_count
+            count, = COUNT.unpack_from(data, offset)
+            newest = decode_delta(base, tick - base_tick, count, data, offset + 2, removed)
+
+            self.states[tick] = newest
+            # ticks that never came in leave gaps, so drop everything too old and not just one tick
+            for old in [old for old in self.states if old <= tick - HISTORY]:
+                del self.states[old]
+            self.server_tick = tick
+            self.own_id = own_id
+            self.frames = [(frame, codes) for frame, codes in self.frames if frame > last_frame]
+            for (name, kind), value in zip(self.world_class.net_state.items(), values):
+                setattr(self, name, kind(value))
+            self.sounds.extend(SOUNDS[code] for code in sounds)
+        self.received = []
+        return newest
+
+    def apply(self, state):
+        '''Bring the entities and lists up to date with a state.'''
+        members = [[] for name in self.lists]
+        entities = {}
+        for net_id, q in state.items():
+            cls = self.classes[q[0]]
+            if net_id == self.own_id:
+                entity = self.own
+            else:
+                entity = self.entities.get(net_id)
+                if entity is None or type(entity) is not cls:
+                    entity = make_entity(cls)
+                entities[net_id] = entity
+            entity.center_x = q[1] / POSITION
+            entity.center_y = q[2] / POSITION
+            entity.angle = q[3] / ANGLE
+            entity.net_velocity = (q[4] / POSITION, q[5] / POSITION)
+            if hasattr(entity, "current_texture"):
+                entity.current_texture = q[6]
+            entity.speed = q[7] / RATE
+            entity.change_x = q[8] / RATE
+            entity.change_angle = q[9] / RATE
+            members[q[0]].append(entity)
+        for entity in self.entities.values():
+            entity.lists = []
+        self.own.lists = []
+        self.entities = entities
+        for name, kept in zip(self.lists, members):
+            entity_list = getattr(self, name)
+            entity_list.entities = kept
+            for entity in kept:
+                entity.lists = [entity_list]
+
+
+def make_entity(cls):
+    '''An entity to draw, without what the class's own __init__ needs from a world.'''
+    entity = cls.__new__(cls)
+    Entity.__init__(entity)
+    return entity
+
+
+def join(address, world_class, link=None, timeout=5.0):
+    '''A Client for a window, connected to the server at "host:port" and running its own event loop.'''
+    host, port = address.rsplit(":", 1)
+    loop = asyncio.new_event_loop()
+    transport, client = loop.run_until_complete(loop.create_datagram_endpoint(
+        lambda: Client(world_class, link or link_from_env()), remote_addr=(host, int(port))))
+    loop.run_until_complete(client.join(timeout))
+    client.loop = loop
+    return client
+
+
+# -------Running a Server---------
+async def serve(world, port, link):
+    loop = asyncio.get_running_loop()
+    server = Server(world, link)
+    transport, _ = await loop.create_datagram_endpoint(lambda: server, local_addr=("0.0.0.0", port))
+    print(f"{type(world).__name__} for {world.player_count} players on port {port}")
+    try:
+        await server.run()
+    finally:
+        transport.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a game for players on other machines.")
+    parser.add_argument("game", choices=sorted(GAMES))
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--latency", type=float, default=0, help="ms added to every packet")
+    parser.add_argument("--jitter", type=float, default=0, help="ms of random extra delay")
+    parser.add_argument("--loss", type=float, default=0, help="fraction of packets lost")
+    args = parser.parse_args()
+    world = GAMES[args.game](seed=args.seed, players=args.players)
+    link = Link(args.latency / 1000, args.jitter / 1000, args.loss)
+    try:
+        asyncio.run(serve(world, args.port, link))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
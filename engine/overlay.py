@@ -0,0 +1,81 @@
+'''
+Performance Overlay
+-------------------
+Draws what a Profiler measured in the corner of the window: a graph of the
+last few seconds of frame times with a line at the 60 fps budget, the average
+ms of each phase, and how many entities each list holds. The text only
+changes a few times a second so the overlay doesn't cost much itself.
+'''
+
+import arcade
+
+from engine.hud import Hud
+
+WIDTH = 240
+GRAPH_HEIGHT = 60
+GRAPH_MS = 33.3         # frame time at the top of the graph
+BUDGET_MS = 1000 / 60
+REFRESH = 15            # frames between text updates
+LINE = 14
+
+
+class PerfOverlay:
+    def __init__(self, profiler, x=10, y=10):
+        self.profiler = profiler
+        self.x = x
+        self.y = y
+        self.visible = False
+        self.hud = Hud()
+        self.rows = 0
+        self.frames = 0
+        self.height = 0
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def lines(self):
+        frames = self.profiler.frames
+        if not frames:
+            return []
+        frame_ms = sum(record["frame_ms"] for record in frames) / len(frames)
+        lines = [f"frame {frame_ms:.2f} ms ({1000 / frame_ms:.0f} fps)"]
+        for name, ms in self.profiler.averages().items():     # in the order they ran
+            lines.append(f"  {name} {ms:.2f} ms")
+        for name, count in sorted(frames[-1].get("counts", {}).items()):
+            lines.append(f"  {name} {count}")
+        return lines
+
+    def refresh(self):
+        lines = self.lines()
+        while self.rows < len(lines):
+            self.hud.add(self.rows, "", 0, 0, arcade.color.WHITE, 9)
+            self.rows += 1
+        top = self.y + GRAPH_HEIGHT + 6 + LINE * len(lines)
+        for row in range(self.rows):
+            line = self.hud.lines[row]
+            line.set(lines[row] if row < len(lines) else "")
+            line.label.x = self.x + 4
+            line.label.y = top - LINE * (row + 1)
+        self.height = GRAPH_HEIGHT + 10 + LINE * len(lines)
+
+    def draw(self):
+        if not self.visible:
+            return
+        if self.frames % REFRESH == 0:
+            self.refresh()
+        self.frames += 1
+
+        x, y = self.x, self.y
+        arcade.draw_lrtb_rectangle_filled(x, x + WIDTH, y + self.height, y, (0, 0, 0, 170))
+
+        # frame times, newest on the right
+        frames = self.profiler.frames
+        step = WIDTH / frames.maxlen
+        points = [(x + i * step, y + min(record["frame_ms"] / GRAPH_MS, 1) * GRAPH_HEIGHT)
+                  for i, record in enumerate(frames)]
+        budget = y + BUDGET_MS / GRAPH_MS * GRAPH_HEIGHT
+        arcade.draw_line(x, budget, x + WIDTH, budget, arcade.color.RED)
+        if len(points) > 1:
+            arcade.draw_line_strip(points, arcade.color.GREEN)
+
+        self.hud.draw()
@@ -0,0 +1,40 @@
+'''
+Object Pools
+------------
+Bullets, enemy bullets and explosions only live for a second or so. Instead of
+making a new one every time and throwing it away on kill(), a pool keeps the
+killed ones and hands them out again after calling their reset(). Each time
+one is handed out again its generation goes up, so what holds on to it by
+identity (the sprites in engine.render) can tell it is not the same one.
+'''
+
+
+class Pool:
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+
+    def acquire(self, *args):
+        '''A ready to use object; args go to the factory or to reset().'''
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            obj.generation += 1
+            self.reused += 1
+        else:
+            obj = self.factory(*args)
+            self.created += 1
+        obj.pool = self
+        return obj
+
+    def release(self, obj):
+        self.free.append(obj)
+        self.released += 1
+
+    def stats(self):
+        return {"created": self.created, "reused": self.reused, "released": self.released,
+                "free": len(self.free), "live": self.created - len(self.free)}
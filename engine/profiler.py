@@ -0,0 +1,95 @@
+'''
+Frame Profiler
+--------------
+Adds up how long each phase of a frame takes: moving the entities, the
+collision checks, the enemy fire, playing sounds, drawing ... The windows and
+worlds wrap their phases in profiler.phase(name) (worlds through
+world.phase(name), which does nothing unless a profiler is attached) and the
+window calls end_frame() once per frame.
+
+The last few seconds of frames are kept for the overlay (engine.overlay). To
+write every frame to a file as one JSON object per line, set TRACE before
+starting a game:
+
+    TRACE=frames.jsonl python 18.0_Levels.py
+'''
+
+import atexit
+import json
+import os
+import time
+from collections import deque
+
+TRACE = os.environ.get("TRACE")
+HISTORY = 240   # frames
+
+
+class Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+
+
+class Profiler:
+    def __init__(self, history=HISTORY, trace=TRACE):
+        self.phases = {}
+        self.current = {}           # name -> seconds so far this frame
+        self.frames = deque(maxlen=history)
+        self.frame = 0
+        self.last_end = time.perf_counter()
+        self.trace = None
+        if trace:
+            self.trace = open(trace, "w")
+            atexit.register(self.trace.close)
+
+    def phase(self, name):
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = self.phases[name] = Phase(self, name)
+        return phase
+
+    def end_frame(self, counts=None):
+        '''Close the frame: keep its phase times in ms, and the entity counts if given.'''
+        now = time.perf_counter()
+        record = {"frame": self.frame, "frame_ms": (now - self.last_end) * 1000,
+                  "phases": {name: seconds * 1000 for name, seconds in self.current.items()}}
+        if counts is not None:
+            record["counts"] = counts
+        self.frames.append(record)
+        if self.trace is not None:
+            self.trace.write(json.dumps(record) + "\n")
+        self.current = {}
+        self.last_end = now
+        self.frame += 1
+
+    def averages(self):
+        '''Mean ms of each phase over the frames kept.'''
+        totals = {}
+        for record in self.frames:
+            for name, ms in record["phases"].items():
+                totals[name] = totals.get(name, 0.0) + ms
+        return {name: total / len(self.frames) for name, total in totals.items()}
+
+
+def entity_counts(world):
+    '''How many entities are in each list of a world.'''
+    return {name: len(value) for name, value in vars(world).items() if hasattr(value, "entities")}
+
+
+def pool_counts(world):
+    '''What each Pool of a world made, handed out again and holds now.'''
+    counts = {}
+    for name, value in vars(world).items():
+        if hasattr(value, "acquire"):
+            stats = value.stats()
+            for key in ("created", "reused", "free"):
+                counts[f"{name} {key}"] = stats[key]
+    return counts
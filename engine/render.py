@@ -0,0 +1,312 @@
+'''
+Drawing a World
+---------------
+The only part of the engine that needs arcade. The MyGame windows turn key
+events into names the worlds understand and keep one sprite per entity,
+drawn in one batch (SpriteSync). A DrawCounter shows what a frame costs the GPU.
+'''
+
+import arcade
+from arcade.gl import Geometry
+from pyglet.graphics.vertexdomain import IndexedVertexDomain
+
+from engine import atlas
+from engine.assets import assets, texture_size
+from engine.core import Explosion
+from engine.loader import LoadingList
+from engine.mixer import MAX_VOICES, Mixer
+
+# arcade key codes -> the key names used by the worlds
+KEY_NAMES = {
+    arcade.key.LEFT: "LEFT",
+    arcade.key.RIGHT: "RIGHT",
+    arcade.key.UP: "UP",
+    arcade.key.DOWN: "DOWN",
+    arcade.key.SPACE: "SPACE",
+    arcade.key.A: "A",
+    arcade.key.D: "D",
+    arcade.key.W: "W",
+    arcade.key.S: "S",
+    arcade.key.P: "P",
+    arcade.key.I: "I",
+    arcade.key.R: "R",
+    arcade.key.KEY_1: "1",
+    arcade.key.KEY_2: "2",
+    arcade.key.KEY_3: "3",
+}
+
+
+# sprites that move further than this in one step are not interpolated
+SNAP_DISTANCE = 100
+
+# textures skip arcade's own cache so the asset cache decides what stays in memory
+assets.register("texture", lambda path: arcade.load_texture(path, can_cache=False), texture_size)
+# static sounds are decoded to PCM once here, playing one never decodes the mp3 again
+assets.register("sound", lambda path: arcade.load_sound(path, streaming=False))
+
+
+def draw_loading_bar(progress, y=10):
+    '''A thin bar along the bottom of the window while assets load in the background.'''
+    window = arcade.get_window()
+    arcade.draw_lrtb_rectangle_filled(0, window.width, y + 6, y, arcade.color.DARK_GRAY)
+    arcade.draw_lrtb_rectangle_filled(0, window.width * progress, y + 6, y, arcade.color.GREEN)
+
+
+def load_frames(prefetcher, paths, cache_path):
+    '''
+    A LoadingList with the frames of an animation. If the atlas cache is up to
+    date the frames are cut from the mapped sheet right away; if not, the PNGs
+    are decoded by the prefetcher and, once they all are, the same frames are
+    packed into the cache for next time.
+    '''
+    sheet = atlas.read(cache_path, paths)
+    if sheet is not None:
+        for i, path in enumerate(paths):
+            if ("texture", path) not in assets:
+                texture = arcade.Texture(path, image=sheet.frame(i), hit_box_algorithm="None")
+                assets.put("texture", path, texture)
+        return LoadingList(prefetcher, "texture", paths)
+
+    frames = LoadingList(prefetcher, "texture", paths)
+    frames.when_done(lambda textures: prefetcher.executor.submit(
+        atlas.pack, [texture.image for texture in textures], paths, cache_path))
+    return frames
+
+
+def preload_sprites(*entity_classes):
+    '''Decode the textures of entity_classes now and keep them, instead of when each first shows up.'''
+    assets.preload("texture", sorted({cls.image for cls in entity_classes}))
+
+
+def make_mixer(paths, max_voices=MAX_VOICES):
+    '''A Mixer playing through arcade, paths maps sound names to files. The sounds are kept in the cache.'''
+    assets.preload("sound", sorted(set(paths.values())))
+    sounds = {name: assets.sound(path) for name, path in paths.items()}
+    return Mixer(sounds, arcade.play_sound, arcade.stop_sound, lambda player: player.playing, max_voices)
+
+
+# -------Sprite Sync---------
+class SpriteSync:
+    '''
+    Keeps the sprites of a world's EntityLists in one SpriteList. Sprites of
+    killed entities are kept and reused for the next entity with the same image.
+
+    Each sprite has a layer: the background is at the bottom, then each entity
+    list in the order they are given to draw(), then the HUD panels. The list
+    is sorted by layer only when sprites came or went, and since every sprite
+    is in the one list (and on arcade's one texture atlas) the whole scene is
+    a single draw call.
+
+    Sprites are drawn alpha of the way from where their entity was one
+    simulation step ago to where it is now (see engine.timestep).
+    '''
+
+    def __init__(self, explosion_texture_list):
+        self.explosion_texture_list = explosion_texture_list
+        self.sprites = {}
+        self.sprite_list = arcade.SpriteList()
+        self.layers = {}    # entity list -> its sprites
+        self.free = {}      # (image, scale) -> unused sprites
+        self.background = None
+        self.panels = {}    # (left, right, top, bottom, color) -> sprite
+        self.sorted = True
+        self.created = 0
+        self.reused = 0
+
+    def make_sprite(self, entity):
+        free = self.free.get((entity.image, entity.scale))
+        if free:
+            self.reused += 1
+            return free.pop()
+        self.created += 1
+        sprite = arcade.Sprite(scale=entity.scale, texture=assets.texture(entity.image))
+        if isinstance(entity, Explosion):
+            sprite.textures = self.explosion_texture_list
+        return sprite
+
+    def add(self, sprite, layer):
+        sprite.layer = layer
+        self.sprite_list.append(sprite)
+        self.sorted = False
+
+    def release(self, sprite):
+        self.sprite_list.remove(sprite)
+        if self.sprites.get(sprite.entity) is sprite:
+            del self.sprites[sprite.entity]
+        self.free.setdefault((sprite.entity.image, sprite.entity.scale), []).append(sprite)
+
+    def sync(self, entity_list, layer, tick=0, alpha=1.0):
+        sprites = self.layers.setdefault(entity_list, [])
+
+        for entity in entity_list:
+            x = entity.center_x
+            y = entity.center_y
+            sprite = self.sprites.get(entity)
+            if sprite is None:
+                sprite = self.make_sprite(entity)
+                sprite.entity = entity
+                sprite.generation = entity.generation
+                sprite.tick = tick
+                sprite.prev_x = sprite.sim_x = x
+                sprite.prev_y = sprite.sim_y = y
+                self.sprites[entity] = sprite
+                self.add(sprite, layer)
+                sprites.append(sprite)
+            elif sprite.generation != entity.generation:
+                # died and came back from its pool since the last frame, don't slide from where it died
+                sprite.generation = entity.generation
+                sprite.tick = tick
+                sprite.prev_x = sprite.sim_x = x
+                sprite.prev_y = sprite.sim_y = y
+            elif sprite.tick != tick:
+                # the world stepped since the last frame
+                sprite.tick = tick
+                sprite.prev_x, sprite.prev_y = sprite.sim_x, sprite.sim_y
+                sprite.sim_x, sprite.sim_y = x, y
+                if abs(x - sprite.prev_x) > SNAP_DISTANCE or abs(y - sprite.prev_y) > SNAP_DISTANCE:
+                    # respawned or wrapped around, don't slide across the screen
+                    sprite.prev_x, sprite.prev_y = x, y
+            sprite.center_x = sprite.prev_x + (sprite.sim_x - sprite.prev_x) * alpha
+            sprite.center_y = sprite.prev_y + (sprite.sim_y - sprite.prev_y) * alpha
+            sprite.angle = entity.angle
+            if isinstance(entity, Explosion) and int(entity.current_texture) < len(sprite.textures):
+                # frames still loading in the background are skipped
+                sprite.set_texture(int(entity.current_texture))
+
+        if sprites and sprites[0].layer != layer:
+            # the same list drawn in another place
+            for sprite in sprites:
+                sprite.layer = layer
+            self.sorted = False
+
+        kept = []
+        for sprite in sprites:
+            if entity_list not in sprite.entity.lists or self.sprites.get(sprite.entity) is not sprite:
+                self.release(sprite)
+            else:
+                kept.append(sprite)
+        self.layers[entity_list] = kept
+
+    def set_background(self, texture):
+        if self.background is not None and self.background.texture is not texture:
+            self.sprite_list.remove(self.background)
+            self.background = None
+        if texture is not None and self.background is None:
+            window = arcade.get_window()
+            self.background = arcade.Sprite(texture=texture, center_x=window.width / 2, center_y=window.height / 2)
+            self.background.width = window.width
+            self.background.height = window.height
+            self.add(self.background, 0)
+
+    def set_panels(self, panels, layer):
+        for panel in list(self.panels):
+            if panel not in panels:
+                self.sprite_list.remove(self.panels.pop(panel))
+        for panel in panels:
+            if panel not in self.panels:
+                left, right, top, bottom, color = panel
+                sprite = arcade.SpriteSolidColor(int(right - left), int(top - bottom), color)
+                sprite.center_x = (left + right) / 2
+                sprite.center_y = (top + bottom) / 2
+                self.panels[panel] = sprite
+                self.add(sprite, layer)
+            elif self.panels[panel].layer != layer:
+                self.panels[panel].layer = layer
+                self.sorted = False
+
+    def draw(self, *entity_lists, tick=0, alpha=1.0, background=None, panels=()):
+        '''
+        Draw the entity lists, each over the ones before it, over the background
+        texture filling the window. panels are filled rectangles on top, given
+        like draw_lrtb_rectangle_filled: (left, right, top, bottom, color).
+        '''
+        # lists that are not drawn anymore belong to a world that was set up again
+        for old in list(self.layers):
+            if old not in entity_lists:
+                for sprite in self.layers.pop(old):
+                    self.release(sprite)
+
+        self.set_background(background)
+        for layer, entity_list in enumerate(entity_lists, 1):
+            self.sync(entity_list, layer, tick, alpha)
+        self.set_panels(panels, len(entity_lists) + 1)
+
+        if not self.sorted:
+            # a stable sort, the sprites of a layer stay in the order they came
+            self.sprite_list.sort(key=sprite_layer)
+            self.sorted = True
+        self.sprite_list.draw()
+
+
+def sprite_layer(sprite):
+    return sprite.layer
+
+
+# -------Draw Counter---------
+class DrawCounter:
+    '''
+    Counts the draw calls of a frame and the vertices they send: arcade's
+    (sprites and shapes) and pyglet's (text). Call start() when a frame begins
+    and counts() at its end.
+
+    Counting wraps the functions every arcade and pyglet draw goes through, so
+    nothing is counted (or wrapped) until install(); uninstall() puts the
+    originals back. The windows only count while the F3 overlay is showing.
+    '''
+
+    def __init__(self):
+        self.calls = 0
+        self.vertices = 0
+        self.originals = None
+
+    def install(self):
+        if self.originals is not None:
+            return
+        render = Geometry.render
+        domain_draw = IndexedVertexDomain.draw
+        domain_draw_subset = IndexedVertexDomain.draw_subset
+        self.originals = render, domain_draw, domain_draw_subset
+
+        def counted_render(geometry, *args, **kwargs):
+            vertices = kwargs.get("vertices") or geometry.num_vertices
+            self.add(vertices * kwargs.get("instances", 1))
+            render(geometry, *args, **kwargs)
+
+        def counted_draw(domain, mode):
+            sizes = domain.index_allocator.get_allocated_regions()[1]
+            if sizes:
+                self.add(sum(sizes))
+            domain_draw(domain, mode)
+
+        def counted_draw_subset(domain, mode, vertex_list):
+            self.add(vertex_list.index_count)
+            domain_draw_subset(domain, mode, vertex_list)
+
+        Geometry.render = counted_render
+        IndexedVertexDomain.draw = counted_draw
+        IndexedVertexDomain.draw_subset = counted_draw_subset
+
+    def uninstall(self):
+        if self.originals is None:
+            return
+        Geometry.render, IndexedVertexDomain.draw, IndexedVertexDomain.draw_subset = self.originals
+        self.originals = None
+
+    def enable(self, on):
+        if on:
+            self.install()
+        else:
+            self.uninstall()
+
+    def start(self):
+        self.calls = 0
+        self.vertices = 0
+
+    def add(self, vertices):
+        self.calls += 1
+        self.vertices += vertices
+
+    def counts(self):
+        if self.originals is None:
+            return {}
+        return {"draw calls": self.calls, "vertices": self.vertices}
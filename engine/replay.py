@@ -0,0 +1,135 @@
+'''
+Recording and Replay
+--------------------
+A world only changes through step(dt, inputs) and draws all its random numbers
+from its own seeded rng, so the seed plus the keys of every step is enough to
+play a session again exactly. A Recorder stands in for the world in front of
+the FixedTimestep and writes that down; replay() runs it again without a
+window as fast as it goes and checks the end state against the recorded hash.
+
+Record a session by setting RECORD before starting a game, then replay it:
+
+    RECORD=slow.replay python 15.0_Jedi_Training.py
+    python -m engine.replay slow.replay
+
+The file is text: a header line with the world and seed, one line for each
+step that had key events or a different dt than the step before
+("tick dt keys", "-" for an unchanged dt, keys like "+SPACE" or "-LEFT",
+"+SPACE:1" for the second player of a networked game, clicks like "@120,45"),
+and an end line with the number of steps and the state hash.
+'''
+
+import atexit
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+
+RECORD = os.environ.get("RECORD")
+
+
+def state_hash(world):
+    '''A hash of everything on screen: the score and where each entity is.'''
+    state = [world.tick, world.score]
+    for name, value in sorted(vars(world).items()):
+        if hasattr(value, "entities"):
+            state.append((name, [(round(float(e.center_x), 6), round(float(e.center_y), 6),
+                                  round(float(e.angle), 6)) for e in value]))
+    return hashlib.sha1(repr(state).encode()).hexdigest()
+
+
+def encode(action, key, player=0):
+    if action == "click":
+        return f"@{key[0]},{key[1]}"
+    return ("+" if action == "press" else "-") + key + (f":{player}" if player else "")
+
+
+def decode(text):
+    if text[0] == "@":
+        x, y = text[1:].split(",")
+        return "click", (float(x), float(y))
+    action = "press" if text[0] == "+" else "release"
+    if ":" in text:
+        key, player = text[1:].split(":")
+        return action, key, int(player)
+    return action, text[1:]
+
+
+class Recorder:
+    '''Passes steps on to the world and remembers the keys of each one.'''
+
+    def __init__(self, world, path=None):
+        self.world = world
+        self.path = path
+        self.lines = []
+        self.dt = None
+
+    def step(self, dt, inputs=()):
+        keys = " ".join(encode(*event) for event in inputs)
+        if keys or dt != self.dt:
+            self.lines.append(f"{self.world.tick} {'-' if dt == self.dt else repr(dt)} {keys}".rstrip())
+            self.dt = dt
+        return self.world.step(dt, inputs)
+
+    def save(self, path=None):
+        world = self.world
+        header = {"world": f"{type(world).__module__}.{type(world).__name__}",
+                  "seed": world.seed, "arrays": world.arrays}
+        if getattr(world, "player_count", 1) != 1:
+            header["players"] = world.player_count
+        with open(path or self.path, "w") as f:
+            f.write(json.dumps(header) + "\n")
+            for line in self.lines:
+                f.write(line + "\n")
+            f.write(f"end {world.tick} {state_hash(world)}\n")
+
+
+def record(world):
+    '''The world itself, or a Recorder saving to $RECORD when the program exits.'''
+    if not RECORD:
+        return world
+    recorder = Recorder(world, RECORD)
+    atexit.register(recorder.save)
+    return recorder
+
+
+def load(path):
+    '''The world a replay file starts from, its steps as {tick: (dt, inputs)}, its length and hash.'''
+    with open(path) as f:
+        header = json.loads(f.readline())
+        module, name = header["world"].rsplit(".", 1)
+        players = {"players": header["players"]} if "players" in header else {}
+        world = getattr(importlib.import_module(module), name)(seed=header["seed"], arrays=header["arrays"], **players)
+
+        steps = {}
+        for line in f:
+            parts = line.split()
+            if parts[0] == "end":
+                return world, steps, int(parts[1]), parts[2]
+            dt = None if parts[1] == "-" else float(parts[1])
+            inputs = [decode(key) for key in parts[2:]]
+            steps[int(parts[0])] = (dt, inputs)
+    raise ValueError(f"{path} has no end line")
+
+
+def replay(path):
+    '''Run a recording headless. Returns the world, whether its hash matched and the seconds it took.'''
+    world, steps, ticks, expected = load(path)
+    dt = None
+    start = time.perf_counter()
+    for tick in range(ticks):
+        step_dt, inputs = steps.get(tick, (None, ()))
+        if step_dt is not None:
+            dt = step_dt
+        world.step(dt, inputs)
+    seconds = time.perf_counter() - start
+    return world, state_hash(world) == expected, seconds
+
+
+if __name__ == "__main__":
+    world, ok, seconds = replay(sys.argv[1])
+    print(f"{world.tick} steps in {seconds:.3f} s ({world.tick / seconds:.0f} steps/s), "
+          f"state hash {'matches' if ok else 'DOES NOT MATCH'}")
+    sys.exit(0 if ok else 1)
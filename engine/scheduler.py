@@ -0,0 +1,53 @@
+'''
+Scheduler
+---------
+A priority queue of things that should happen at a certain world time. Instead
+of rolling a die for every trooper every tick, each trooper gets its next shot
+time drawn once and the world only does work when a shot is actually due. It
+works for anything else on a timer too: respawns, waves of enemies, resetting
+the game after 30 seconds ...
+'''
+
+import heapq
+import itertools
+
+
+class Event:
+    def __init__(self, time, callback, args):
+        self.time = time
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+
+class Scheduler:
+    def __init__(self):
+        self.queue = []
+        self.counter = itertools.count()    # keeps events at the same time in order
+
+    def schedule(self, time, callback, *args):
+        '''Call callback(*args) once the world time reaches time.'''
+        event = Event(time, callback, args)
+        heapq.heappush(self.queue, (time, next(self.counter), event))
+        return event
+
+    def cancel(self, event):
+        # left in the queue and skipped when it comes up
+        event.cancelled = True
+
+    def run(self, now):
+        '''Call everything that is due by now, earliest first. Returns how many ran.'''
+        ran = 0
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            event = heapq.heappop(queue)[2]
+            if not event.cancelled:
+                event.callback(*event.args)
+                ran += 1
+        return ran
+
+    def clear(self):
+        self.queue = []
+
+    def __len__(self):
+        return len(self.queue)
@@ -0,0 +1,255 @@
+'''
+High Scores
+-----------
+All-time leaderboards kept in one append-only file, scores.log, shared by
+every game, level, player and session on the machine.
+
+Scores are written in batches: a header (entry count, CRC32 of the entries)
+followed by fixed-size entries, each batch in one write and fsync. A batch is
+written when it is full, FLUSH_SECONDS after its first score, or when the
+store is closed, so a crash loses at most the scores of that last stretch and
+never garbles the rest.
+
+Opening the file checks every batch and cuts off a last one that is incomplete
+or doesn't match its CRC (the game stopped in the middle of writing it). Other
+sessions may be writing to the same file: they hold a shared lock while they
+do, and the cut is only made under an exclusive one, so a batch that is still
+on its way is never taken for a broken one. Without fcntl (Windows) nothing is
+locked.
+
+The file is only read when a store is opened (and by refresh()). After that a
+board (game, level) is a sorted array of all its scores, for the rank of any
+score, plus its TOP_KEPT best entries for the leaderboard; level ALL is every
+level of a game together.
+'''
+
+import bisect
+import getpass
+import os
+import struct
+import time
+import zlib
+from array import array
+from collections import namedtuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SCORES_PATH = "scores.log"
+BATCH = struct.Struct("<II")            # entries, CRC32 of the entries
+ENTRY = struct.Struct("<d8sHi16s")      # time, game, level, score, player
+BATCH_SIZE = 64                         # entries buffered before they are written
+FLUSH_SECONDS = 60                      # or how long the first of them waits at most
+TOP_KEPT = 100
+BULK = 1000                             # entries read at once that are sorted in instead of inserted
+ALL = 0                                 # the level of the board with every level of a game
+
+Entry = namedtuple("Entry", "score player level time")
+
+
+def make_entry(when, level, score, player):
+    return Entry(score, player.rstrip(b"\0").decode(errors="replace"), level, when)
+
+
+def default_player():
+    try:
+        return os.environ.get("PLAYER") or getpass.getuser()
+    except (KeyError, OSError):
+        return "player"
+
+
+class Board:
+    def __init__(self):
+        self.scores = array("i")    # every score, lowest first
+        self.top = []               # the best entries, best first (older first on a tie)
+
+    def add(self, entry):
+        bisect.insort_right(self.scores, entry.score)
+        if len(self.top) < TOP_KEPT or entry.score > self.top[-1].score:
+            # after every entry with the same score, they were there first
+            scores = [-e.score for e in self.top]
+            self.top.insert(bisect.bisect_right(scores, -entry.score), entry)
+            del self.top[TOP_KEPT:]
+
+    def merge(self, scores, entries):
+        '''Add many at once: scores sorted lowest first, entries at least all that could make the top.'''
+        if len(self.scores):
+            scores = sorted(self.scores.tolist() + scores)
+        self.scores = array("i", scores)
+        entries = self.top + entries
+        entries.sort(key=lambda e: (-e.score, e.time))
+        self.top = entries[:TOP_KEPT]
+
+    def rank(self, score):
+        '''1 for the best score; a tie shares the rank of the first with that score.'''
+        return len(self.scores) - bisect.bisect_right(self.scores, score) + 1
+
+
+class ScoreStore:
+    def __init__(self, path=SCORES_PATH, batch_size=BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.boards = {}
+        self.pending = []
+        self.pending_since = 0.0
+        self.offset = 0         # how much of the file is in the boards
+        self.written = set()    # where our batches start that are past the offset, in the boards already
+        self.recovered = 0      # bytes cut off a broken last batch when opening
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self.recovered = self.refresh(repair=True)
+
+    # -------Reading---------
+    def refresh(self, repair=False):
+        '''
+        Index the batches written since the last look, by other sessions too.
+        With repair, cut off a broken last batch. Returns the bytes it cut off.
+        '''
+        size = os.fstat(self.fd).st_size
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        offset = 0
+        entries = []
+        while offset + BATCH.size <= len(data):
+            count, crc = BATCH.unpack_from(data, offset)
+            start = offset + BATCH.size
+            end = start + count * ENTRY.size
+            if end > len(data) or zlib.crc32(data[start:end]) != crc:
+                break
+            if self.offset + offset in self.written:
+                # one of ours, added when it was recorded
+                self.written.discard(self.offset + offset)
+            else:
+                entries.extend(ENTRY.iter_unpack(data[start:end]))
+            offset = end
+        self.index(entries)
+        self.offset += offset
+        if repair and offset < len(data):
+            return self.repair(size)
+        return 0
+
+    def repair(self, size):
+        # the broken tail may be a batch another session is writing right now:
+        # only cut it off when nobody is writing and nothing was added since
+        if not self.lock(exclusive=True, wait=False):
+            return 0
+        try:
+            if os.fstat(self.fd).st_size != size:
+                return 0
+            os.ftruncate(self.fd, self.offset)
+            return size - self.offset
+        finally:
+            self.unlock()
+
+    def lock(self, exclusive=False, wait=True):
+        '''flock the file, True if it got the lock.'''
+        if fcntl is None:
+            return True
+        mode = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | (0 if wait else fcntl.LOCK_NB)
+        try:
+            fcntl.flock(self.fd, mode)
+        except BlockingIOError:
+            return False
+        return True
+
+    def unlock(self):
+        if fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def index(self, entries):
+        if len(entries) < BULK:
+            for when, game, level, score, player in entries:
+                self.add_entry(game.rstrip(b"\0").decode(), level, make_entry(when, level, score, player))
+            return
+        # loading a whole file: each board is sorted once instead of inserting every score
+        groups = {}
+        for entry in entries:
+            groups.setdefault((entry[1], entry[2]), []).append(entry)
+        everything = {}     # game -> the new scores and best entries of all its levels
+        for (game, level), rows in groups.items():
+            game = game.rstrip(b"\0").decode()
+            scores = [row[3] for row in rows]
+            scores.sort()
+            # only entries at least as good as the TOP_KEPT-th best can make the top
+            least = scores[-TOP_KEPT] if len(scores) >= TOP_KEPT else scores[0]
+            best = [make_entry(row[0], level, row[3], row[4]) for row in rows if row[3] >= least]
+            self.board(game, level).merge(scores, best)
+            every = everything.setdefault(game, ([], []))
+            every[0].extend(scores)
+            every[1].extend(best)
+        for game, (scores, best) in everything.items():
+            scores.sort()   # runs that are sorted already, merged quickly
+            self.board(game, ALL).merge(scores, best)
+
+    def board(self, game, level=ALL):
+        board = self.boards.get((game, level))
+        if board is None:
+            board = self.boards[(game, level)] = Board()
+        return board
+
+    def add_entry(self, game, level, entry):
+        self.board(game, level).add(entry)
+        if level != ALL:
+            self.board(game, ALL).add(entry)
+
+    # -------Queries---------
+    def top(self, game, level=ALL, n=10):
+        return self.board(game, level).top[:n]
+
+    def best(self, game, level=ALL):
+        top = self.board(game, level).top
+        return top[0] if top else None
+
+    def rank(self, game, level, score):
+        return self.board(game, level).rank(score)
+
+    def count(self, game, level=ALL):
+        return len(self.board(game, level).scores)
+
+    # -------Writing---------
+    def add(self, game, level, score, player=None, when=None):
+        '''Record a finished game. Returns its rank on the board of its level.'''
+        entry = Entry(score, player or default_player(), level, time.time() if when is None else when)
+        self.add_entry(game, level, entry)
+        if not self.pending:
+            self.pending_since = time.monotonic()
+        self.pending.append(ENTRY.pack(entry.time, game.encode()[:8], level, score, entry.player.encode()[:16]))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        return self.rank(game, level, score)
+
+    def flush_if_due(self, now=None):
+        '''Write the batch if its first score has waited FLUSH_SECONDS. Cheap to call every frame.'''
+        if self.pending and (time.monotonic() if now is None else now) - self.pending_since >= FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # whatever other sessions wrote goes into the boards before ours is appended
+        self.refresh()
+        entries = b"".join(self.pending)
+        self.pending = []
+        batch = BATCH.pack(len(entries) // ENTRY.size, zlib.crc32(entries)) + entries
+        # shared: other sessions may write too, but none may cut the file meanwhile
+        self.lock()
+        try:
+            os.write(self.fd, batch)
+            # appending leaves the file position at the end of what was written, even
+            # when another session wrote after our refresh(), so this is where ours starts
+            start = os.lseek(self.fd, 0, os.SEEK_CUR) - len(batch)
+            os.fsync(self.fd)
+        finally:
+            self.unlock()
+        if start == self.offset:
+            # nobody wrote in between, so the file is all in the boards again
+            self.offset += len(batch)
+        else:
+            # the next refresh() reads theirs and skips ours
+            self.written.add(start)
+
+    def close(self):
+        self.flush()
+        os.close(self.fd)
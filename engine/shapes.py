@@ -0,0 +1,238 @@
+'''
+Collision Shapes
+----------------
+What an entity's collision test looks at, set per class with its shape
+attribute:
+    "aabb"     the box around the (rotated) image, the cheapest
+    "circle"   a circle as big as that outline (but inside the box), turns
+               with the image for free
+    "polygon"  the convex outline of the image's opaque pixels, like arcade's
+               hit boxes, the most exact and the most expensive
+
+check_for_collision() in engine.core always tests the boxes first, every shape
+lies inside its box. Two boxes stop there, circles and boxes are a few
+multiplications, anything with a polygon goes through the separating axis test
+here.
+
+The players, troopers and planes are irregular, circles and boxes miss too
+many of their real hits, so they are polygons like arcade's hit boxes were.
+
+Something fast can also be swept (sweep()): the path its center took through
+the tick is tested, so it can't jump over what it should hit.
+'''
+
+import math
+
+from engine.assets import assets
+
+MAX_POINTS = 8      # corners kept of an image's outline, each one costs every test
+
+_radii = {}
+
+
+def convex_hull(points):
+    '''The convex outline of points, counter-clockwise (monotone chain).'''
+    points = sorted(set(points))
+    if len(points) < 3:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
+
+
+def area(points):
+    return sum(points[i - 1][0] * points[i][1] - points[i][0] * points[i - 1][1] for i in range(len(points))) / 2
+
+
+def simplify(points, max_points=MAX_POINTS):
+    '''Drop the corners that add the least area until max_points are left.'''
+    points = list(points)
+    while len(points) > max_points:
+        smallest = min(range(len(points)),
+                       key=lambda i: abs(area([points[i - 1], points[i], points[(i + 1) % len(points)]])))
+        del points[smallest]
+    return points
+
+
+def read_hull(path):
+    '''
+    The outline of the opaque pixels of an image around its center, y up,
+    in at most MAX_POINTS corners.
+    None when the image can't be read (or PIL isn't there), the box is used then.
+    '''
+    try:
+        from PIL import Image
+        with Image.open(path) as image:
+            alpha = image.convert("RGBA").getchannel("A")
+            w, h = alpha.size
+            data = alpha.tobytes()
+    except (ImportError, OSError):
+        return None
+
+    # the first and last opaque pixel of every row is enough for a convex outline
+    points = []
+    for y in range(h):
+        row = data[y * w:(y + 1) * w]
+        right = len(row.rstrip(b"\0"))
+        if right:
+            left = w - len(row.lstrip(b"\0"))
+            points += [(left, y), (right, y), (left, y + 1), (right, y + 1)]
+    if not points:
+        points = [(0, 0), (w, 0), (0, h), (w, h)]
+    # turning y up mirrors it, reversed it goes counter-clockwise again
+    return [(x - w / 2, h / 2 - y) for x, y in reversed(simplify(convex_hull(points)))]
+
+
+# outlines go through the asset cache, (x, y) corners
+assets.register("hull", read_hull, lambda path: 16 * MAX_POINTS)
+
+
+def preload_hull(path):
+    '''Read the outline of an image into the cache for good, every collision of its class needs it.'''
+    assets.preload("hull", [path])
+
+
+def image_hull(path):
+    return assets.hull(path)
+
+
+def radius(entity):
+    '''A circle as big as the outline, but never bigger than the box it is tested in.'''
+    r = _radii.get(entity.image)
+    if r is None:
+        hull = image_hull(entity.image)
+        r = _radii[entity.image] = math.sqrt(abs(area(hull)) / math.pi) if hull else math.inf
+    return min(r * entity.scale, entity.width / 2, entity.height / 2)
+
+
+def polygon(entity):
+    '''The corners of entity's shape on screen.'''
+    x = entity.center_x
+    y = entity.center_y
+    hull = None if entity.shape == "aabb" else image_hull(entity.image)
+    if hull is None:
+        half_w, half_h = entity.half_extents()
+        return [(x - half_w, y - half_h), (x + half_w, y - half_h), (x + half_w, y + half_h), (x - half_w, y + half_h)]
+
+    if entity._polygon_angle != entity.angle:
+        rad = math.radians(entity.angle)
+        c = math.cos(rad) * entity.scale
+        s = math.sin(rad) * entity.scale
+        entity._polygon = [(px * c - py * s, px * s + py * c) for px, py in hull]
+        entity._polygon_angle = entity.angle
+    return [(x + px, y + py) for px, py in entity._polygon]
+
+
+def separated(points_a, points_b):
+    # separating axis test, enough for two convex polygons
+    for points in (points_a, points_b):
+        for i in range(len(points)):
+            x0, y0 = points[i - 1]
+            x1, y1 = points[i]
+            nx = y0 - y1
+            ny = x1 - x0
+            a = [px * nx + py * ny for px, py in points_a]
+            b = [px * nx + py * ny for px, py in points_b]
+            if max(a) < min(b) or max(b) < min(a):
+                return True
+    return False
+
+
+def circle_touches_polygon(cx, cy, r, points):
+    inside = True
+    for i in range(len(points)):
+        x0, y0 = points[i - 1]
+        x1, y1 = points[i]
+        dx = x1 - x0
+        dy = y1 - y0
+        if dx * (cy - y0) - dy * (cx - x0) < 0:
+            inside = False
+        # closest point of this edge to the center
+        length = dx * dx + dy * dy
+        t = 0 if length == 0 else max(0, min(1, ((cx - x0) * dx + (cy - y0) * dy) / length))
+        ex = x0 + t * dx - cx
+        ey = y0 + t * dy - cy
+        if ex * ex + ey * ey < r * r:
+            return True
+    return inside
+
+
+def overlap(a, b):
+    '''Whether the shapes of a and b overlap, once their boxes are known to.'''
+    if a.shape == "circle" and b.shape == "circle":
+        dx = a.center_x - b.center_x
+        dy = a.center_y - b.center_y
+        r = radius(a) + radius(b)
+        return dx * dx + dy * dy < r * r
+
+    if b.shape == "circle":
+        a, b = b, a
+    if a.shape == "circle":
+        r = radius(a)
+        if b.shape == "aabb":
+            half_w, half_h = b.half_extents()
+            dx = max(abs(a.center_x - b.center_x) - half_w, 0)
+            dy = max(abs(a.center_y - b.center_y) - half_h, 0)
+            return dx * dx + dy * dy < r * r
+        return circle_touches_polygon(a.center_x, a.center_y, r, polygon(b))
+
+    return not separated(polygon(a), polygon(b))
+
+
+def sweep(a, b, dx, dy):
+    '''
+    Where a, having moved dx, dy relative to b this tick, first touched b: the
+    fraction of the move from 0 to 1, or None if it didn't. a is its center with
+    radius(a) around it, b is its shape (a polygon with its edges pushed out by
+    that radius, so the corners stick out up to 0.42 of it further than they should).
+    '''
+    r = radius(a)
+    sx = a.center_x - dx
+    sy = a.center_y - dy
+    if b.shape == "circle":
+        fx = sx - b.center_x
+        fy = sy - b.center_y
+        reach = r + radius(b)
+        far = fx * fx + fy * fy - reach * reach
+        if far <= 0:
+            return 0.0
+        toward = fx * dx + fy * dy
+        length = dx * dx + dy * dy
+        if toward >= 0 or toward * toward < length * far:
+            return None
+        t = (-toward - math.sqrt(toward * toward - length * far)) / length
+        return t if t <= 1 else None
+
+    # clip the path against every edge of the convex outline (Cyrus-Beck)
+    points = polygon(b)
+    enter = 0.0
+    leave = 1.0
+    for i in range(len(points)):
+        x0, y0 = points[i - 1]
+        x1, y1 = points[i]
+        nx = y1 - y0    # points out of a counter-clockwise outline
+        ny = x0 - x1
+        outside = nx * (sx - x0) + ny * (sy - y0) - r * math.hypot(nx, ny)
+        closing = nx * dx + ny * dy
+        if closing == 0:
+            if outside > 0:
+                return None
+        elif closing < 0:
+            enter = max(enter, -outside / closing)
+        else:
+            leave = min(leave, -outside / closing)
+        if enter > leave:
+            return None
+    return enter
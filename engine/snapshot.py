@@ -0,0 +1,155 @@
+'''
+Snapshots
+---------
+Saves and restores the progress of an Escape Room session. A world hands over
+its state as sections (name -> bytes, see EscapeWorld.sections()) and keeps a
+set of the sections that changed since they were last saved.
+
+The binary format is MAGIC followed by records, one per section:
+
+    u16 name length, u32 data length, name, data
+
+Most sections are lists of strings, packed as UTF-8 with NUL between them.
+Reading keeps the last record of each name and stops at a record that is cut
+off, so a save file can simply be appended to. dumps()/loads() make and read a
+whole snapshot in memory (the "retry" rewinds). An AutoSaver appends only the
+changed sections to a file on its own thread, so the game never waits for the
+disk. It is given the sections the world was restored from (None for a new
+world), never what happens to be in the file: its first save writes the file
+again from scratch with those and the world's own, and so does a save once the
+file holds too many old records.
+'''
+
+import os
+import queue
+import struct
+import threading
+
+MAGIC = b"ESCSAVE1"
+RECORD = struct.Struct("<HI")
+COMPACT_RECORDS = 256   # rewrite the file when it holds this many records (and 4x the sections)
+
+
+# -------Packing---------
+def pack_strings(strings):
+    # split again in one go by unpack_strings(), no string can hold a NUL
+    return "\0".join(strings).encode()
+
+
+def unpack_strings(data):
+    return data.decode().split("\0") if data else []
+
+
+def pack_records(sections):
+    parts = []
+    for name, data in sections.items():
+        key = name.encode()
+        parts.append(RECORD.pack(len(key), len(data)))
+        parts.append(key)
+        parts.append(data)
+    return b"".join(parts)
+
+
+def unpack_records(data):
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a snapshot")
+    sections = {}
+    offset = len(MAGIC)
+    while offset + RECORD.size <= len(data):
+        key_length, length = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        end = start + key_length + length
+        if end > len(data):
+            break       # cut off while it was written
+        sections[data[start:start + key_length].decode()] = data[start + key_length:end]
+        offset = end
+    return sections
+
+
+# -------Snapshots---------
+def dumps(world):
+    return MAGIC + pack_records(world.sections())
+
+
+def loads(world, data):
+    world.restore_sections(unpack_records(data))
+
+
+def load(path, required=()):
+    '''The sections saved in a file, or None if there is no usable file or it lacks a required section.'''
+    try:
+        with open(path, "rb") as f:
+            sections = unpack_records(f.read())
+    except (OSError, ValueError):
+        return None
+    if any(name not in sections for name in required):
+        return None
+    return sections
+
+
+# -------Autosave---------
+class AutoSaver:
+    def __init__(self, path, restored=None, compact_records=COMPACT_RECORDS):
+        self.path = path
+        self.compact_records = compact_records
+        # what the file holds, only touched by the thread; a world that was not
+        # restored from it replaces it instead of being mixed into it
+        self.saved = dict(restored or {})
+        self.records = len(self.saved)
+        self.fresh = False      # the file was written from scratch by us
+        self.queue = queue.Queue()
+        self.saves = 0
+        self.writes = 0
+        self.rewrites = 0
+        self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def save(self, world):
+        '''Queue the sections of world that changed. Costs the game only their packing.'''
+        if not world.dirty:
+            return
+        sections = world.sections(world.dirty)
+        world.dirty = set()
+        self.saves += 1
+        self.queue.put(sections)
+
+    def run(self):
+        while True:
+            sections = self.queue.get()
+            if sections is None:
+                return
+            self.write(sections)
+            self.queue.task_done()
+
+    def write(self, sections):
+        self.saved.update(sections)
+        self.records += len(sections)
+        if not self.fresh or self.records > max(self.compact_records, 4 * len(self.saved)):
+            # everything in a new file, swapped in when it is complete
+            temp = self.path + ".tmp"
+            with open(temp, "wb") as f:
+                f.write(MAGIC + pack_records(self.saved))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp, self.path)
+            self.records = len(self.saved)
+            self.fresh = True
+            self.rewrites += 1
+        else:
+            with open(self.path, "ab") as f:
+                f.write(pack_records(sections))
+                f.flush()
+                os.fsync(f.fileno())
+        self.writes += 1
+
+    def flush(self):
+        '''Wait until everything queued is on disk.'''
+        self.queue.join()
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def stats(self):
+        return {"saves": self.saves, "writes": self.writes, "rewrites": self.rewrites,
+                "waiting": self.queue.qsize(), "records": self.records}
@@ -0,0 +1,174 @@
+'''
+Spatial Hash
+------------
+Splits the screen into square cells and remembers which entities touch each
+cell, so a collision check only has to look at the entities near the one being
+tested instead of the whole list.
+
+Given the frames of the tick, entities that moved further than their radius
+are hashed by the whole box they swept through (from where velocity() says
+they were), which check_for_sweep() needs to find what something fast passed
+on its way. Slower ones are hashed by their box, and when nothing involved in
+a check moved that far check_for_sweep() is just check_for_collision(), as
+it is at 60 ticks a second for everything but the bullets.
+'''
+
+from engine import shapes
+from engine.core import check_for_collision
+
+CELL_SIZE = 64
+
+
+def moved(entity, frames):
+    '''
+    How far entity moved in the last frames, from velocity(). (0, 0) when that is
+    not further than its radius (half the short side of its box), where its box
+    already covers its way.
+    '''
+    if not frames:
+        return 0, 0
+    vx, vy = entity.velocity()
+    dx = vx * frames
+    dy = vy * frames
+    half_w, half_h = entity.half_extents()
+    reach = half_w if half_w < half_h else half_h
+    if dx * dx + dy * dy > reach * reach:
+        return dx, dy
+    return 0, 0
+
+
+class SpatialHash:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}
+        self.swept = False      # something hashed moved further than its radius
+
+    def clear(self):
+        self.cells = {}
+        self.order = {}
+        self.swept = False
+
+    def cell_keys(self, entity, dx=0, dy=0):
+        '''The cells of entity's box, stretched back over a move of dx, dy.'''
+        size = self.cell_size
+        half_w, half_h = entity.half_extents()
+        left = right = entity.center_x
+        bottom = top = entity.center_y
+        if dx or dy:
+            left = min(left, left - dx)
+            right = max(right, right - dx)
+            bottom = min(bottom, bottom - dy)
+            top = max(top, top - dy)
+        x0 = int((left - half_w) // size)
+        x1 = int((right + half_w) // size)
+        y0 = int((bottom - half_h) // size)
+        y1 = int((top + half_h) // size)
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def insert(self, entity, frames=0):
+        self.order[entity] = len(self.order)
+        cells = self.cells
+        dx, dy = moved(entity, frames)
+        if dx or dy:
+            self.swept = True
+        for key in self.cell_keys(entity, dx, dy):
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [entity]
+            else:
+                cell.append(entity)
+
+    def build(self, entities, frames=0):
+        '''Throw away the old cells and hash every entity again (once per tick).'''
+        self.clear()
+        # insert() and cell_keys() written out, this runs for every entity every tick
+        cells = self.cells
+        order = self.order
+        size = self.cell_size
+        for entity in entities:
+            order[entity] = len(order)
+            half_w, half_h = entity.half_extents()
+            left = right = entity.center_x
+            bottom = top = entity.center_y
+            if frames:
+                vx, vy = entity.velocity()
+                dx = vx * frames
+                dy = vy * frames
+                reach = half_w if half_w < half_h else half_h
+                if dx * dx + dy * dy > reach * reach:
+                    self.swept = True
+                    left = min(left, left - dx)
+                    right = max(right, right - dx)
+                    bottom = min(bottom, bottom - dy)
+                    top = max(top, top - dy)
+            y0 = int((bottom - half_h) // size)
+            y1 = int((top + half_h) // size) + 1
+            for x in range(int((left - half_w) // size), int((right + half_w) // size) + 1):
+                for y in range(y0, y1):
+                    cell = cells.get((x, y))
+                    if cell is None:
+                        cells[(x, y)] = [entity]
+                    else:
+                        cell.append(entity)
+
+    def query(self, entity, dx=0, dy=0):
+        '''Entities sharing a cell with entity (stretched back over a move of dx, dy), in the order they were inserted.'''
+        found = set()
+        cells = self.cells
+        for key in self.cell_keys(entity, dx, dy):
+            cell = cells.get(key)
+            if cell is not None:
+                found.update(cell)
+        found.discard(entity)
+        if len(found) < 2:
+            return list(found)
+        return sorted(found, key=self.order.__getitem__)
+
+    def at(self, x, y):
+        '''Entities whose box touches the cell of the point x, y, in the order they were inserted.'''
+        return self.cells.get((int(x // self.cell_size), int(y // self.cell_size)), [])
+
+    def check_for_collision(self, entity):
+        '''Same result as check_for_collision_with_list() against the hashed list.'''
+        return [other for other in self.query(entity) if other.alive and check_for_collision(entity, other)]
+
+    def check_for_sweep(self, entity, frames, through=False):
+        '''
+        check_for_collision() for fast things. When entity touches nothing where it
+        is, the first entity it went through during the last frames, if any. With
+        through (bullets that keep going) everything it touched on the way, in the
+        order it got to them.
+        '''
+        dx, dy = moved(entity, frames)
+        if not (self.swept or dx or dy):
+            # nothing went further than its radius, the boxes where they are cover it
+            return self.check_for_collision(entity)
+        # one look at the cells it swept through serves both tests
+        nearby = self.query(entity, dx, dy)
+        if not nearby:
+            return nearby
+        hits = [other for other in nearby if other.alive and check_for_collision(entity, other)]
+        if hits and not through:
+            return hits
+        vx, vy = entity.velocity()
+        reach = shapes.radius(entity)
+        times = {}
+        for other in nearby:
+            if not other.alive:
+                continue
+            ox, oy = other.velocity()
+            dx = (vx - ox) * frames
+            dy = (vy - oy) * frames
+            # moving less than its radius the test above already covered the way
+            if dx * dx + dy * dy <= reach * reach:
+                t = None
+            else:
+                t = shapes.sweep(entity, other, dx, dy)
+            if t is not None:
+                times[other] = t
+            elif other in hits:
+                times[other] = 1
+        if not through:
+            return [min(times, key=times.__getitem__)] if times else []
+        return sorted(times, key=times.__getitem__)
@@ -0,0 +1,70 @@
+'''
+Fixed Timestep
+--------------
+Runs a world at a steady simulation rate no matter how often the window
+draws. on_update() hands over the real time that passed; the stepper saves it
+up and runs whole steps of 1/hz seconds, carrying the leftover into the next
+frame. alpha is how far the leftover is into the next step, for drawing sprites
+between their last two positions.
+
+When the machine cannot keep up (a frame needs more than max_steps steps) the
+stepper halves its rate, down to min_hz. Motion is scaled by the step length,
+so fewer, longer steps keep the game at the same speed. Once frames fit in a
+single step again for a while it goes back up towards hz.
+'''
+
+SIM_HZ = 60
+MIN_HZ = 15
+MAX_STEPS = 5
+RECOVER_FRAMES = 120    # frames in a row with spare time before raising the rate again
+
+
+class FixedTimestep:
+    def __init__(self, world, hz=SIM_HZ, min_hz=MIN_HZ, max_steps=MAX_STEPS):
+        self.world = world
+        self.target_hz = hz
+        self.min_hz = min_hz
+        self.max_steps = max_steps
+        self.hz = hz
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.inputs = []
+        self.spare_frames = 0
+
+        self.steps = 0
+        self.dropped_time = 0.0
+
+    @property
+    def step_dt(self):
+        return 1 / self.hz
+
+    def advance(self, dt, inputs=()):
+        '''Run as many steps as dt covers. Returns the sounds those steps made.'''
+        self.inputs.extend(inputs)
+        self.accumulator += dt
+        sounds = []
+        steps = 0
+        while self.accumulator >= self.step_dt and steps < self.max_steps:
+            # keys pressed since the last step all go to the next one
+            sounds.extend(self.world.step(self.step_dt, self.inputs))
+            self.inputs = []
+            self.accumulator -= self.step_dt
+            steps += 1
+        self.steps += steps
+
+        if self.accumulator >= self.step_dt:
+            # still behind after max_steps: forget the time we cannot catch up
+            # on (all but one step at the rate it was) and run slower steps
+            # from now on
+            self.dropped_time += self.accumulator - self.step_dt
+            self.accumulator = self.step_dt
+            self.hz = max(self.min_hz, self.hz / 2)
+            self.spare_frames = 0
+        elif steps <= 1 and self.hz < self.target_hz:
+            self.spare_frames += 1
+            if self.spare_frames >= RECOVER_FRAMES:
+                self.hz = min(self.target_hz, self.hz * 2)
+                self.spare_frames = 0
+
+        self.alpha = min(self.accumulator / self.step_dt, 1.0)
+        return sounds
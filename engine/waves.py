@@ -0,0 +1,74 @@
+'''
+Enemy Waves
+-----------
+A level is a list of waves instead of a fixed number of enemies made in
+setup(). Each wave sends count enemies, one every interval seconds, from the
+screen edges it lists in turn. The spawner only keeps a position in the list
+and puts the next spawn on the world's scheduler, so a level of ten thousand
+enemies costs no more memory than a level of ten. When max_live enemies are on
+screen it waits until some are gone.
+'''
+
+EDGES = ("bottom", "top", "left", "right")
+MAX_LIVE = 100
+RETRY = 0.25    # seconds to wait when too many are alive
+
+
+class Wave:
+    def __init__(self, count, interval=0.0, edges=EDGES, delay=0.0):
+        '''count enemies, interval seconds apart, from edges in turn, after waiting delay seconds.'''
+        self.count = count
+        self.interval = interval
+        self.edges = edges
+        self.delay = delay
+
+
+class WaveSpawner:
+    def __init__(self, world, waves, spawn, live, max_live=MAX_LIVE):
+        '''spawn(edge) makes one enemy coming in from that edge, live() says how many are alive.'''
+        self.world = world
+        self.waves = waves
+        self.spawn = spawn
+        self.live = live
+        self.max_live = max_live
+        self.wave = 0
+        self.count = 0          # spawned so far in this wave
+        self.spawned = 0
+        self.next_time = 0.0
+
+    def start(self):
+        # anything due right away is made now, the rest is left to the scheduler
+        self.next_time = self.world.time
+        self.skip_empty()
+        if not self.done():
+            self.next_time += self.waves[self.wave].delay
+            self.run()
+
+    def done(self):
+        return self.wave >= len(self.waves)
+
+    def skip_empty(self):
+        while not self.done() and self.count >= self.waves[self.wave].count:
+            self.wave += 1
+            self.count = 0
+
+    def run(self):
+        while not self.done() and self.next_time <= self.world.time:
+            if self.live() >= self.max_live:
+                # counted from now, not from when it was due, so the wave does not bunch up
+                self.next_time = self.world.time + RETRY
+                break
+            wave = self.waves[self.wave]
+            self.spawn(wave.edges[self.count % len(wave.edges)])
+            self.count += 1
+            self.spawned += 1
+            if self.count < wave.count:
+                self.next_time += wave.interval
+            else:
+                self.wave += 1
+                self.count = 0
+                self.skip_empty()
+                if not self.done():
+                    self.next_time += self.waves[self.wave].delay
+        if not self.done():
+            self.world.scheduler.schedule(self.next_time, self.run)